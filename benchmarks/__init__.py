@@ -0,0 +1,6 @@
+"""Micro-benchmarks for Coqpit hot paths.
+
+Each module can be run on its own, e.g. ``python -m benchmarks.deserialization``.
+``python -m benchmarks.suite`` (or ``make bench``) times the main operations on a
+synthetic config and saves the results as JSON, to compare them between commits.
+"""
@@ -0,0 +1,58 @@
+"""Synthetic Coqpit classes of controlled depth, width and list size, for the benchmark suite."""
+
+from __future__ import annotations
+
+import functools
+from dataclasses import field, make_dataclass
+from typing import TYPE_CHECKING, Any, Literal
+
+from coqpit import Coqpit
+
+if TYPE_CHECKING:
+    from collections.abc import Callable
+
+# field types cycled through by the scalar fields of every level, with a default value
+_SCALARS: tuple[tuple[Any, Callable[[int], Any]], ...] = (
+    (int, lambda idx: idx),
+    (float, lambda idx: idx / 3),
+    (str, lambda idx: f"value{idx}"),
+    (bool, lambda idx: idx % 2 == 0),
+    (str | None, lambda _: None),
+    (Literal["a", "b", "c"], lambda _: "b"),
+)
+
+
+def _pair(config_class: type[Coqpit]) -> list[Coqpit]:
+    return [config_class(), config_class()]
+
+
+def make_config_class(depth: int, width: int, list_size: int) -> type[Coqpit]:
+    """Return a Coqpit class whose configs are `depth` levels deep.
+
+    Every level has `width` scalar fields ``f0``, ``f1``... cycling through int,
+    float, str, bool, Optional and Literal fields, and a `list[float]` and
+    `list[str]` of `list_size` items. Every level except the last one also holds
+    the next level as ``child`` and a list of two of them as ``children``, so a
+    config holds ``3 ** (depth - 1)`` configs of the last level.
+    """
+    child: type[Coqpit] | None = None
+    for level in reversed(range(depth)):
+        specs: list[tuple[str, Any, Any]] = []
+        for idx in range(width):
+            field_type, default = _SCALARS[idx % len(_SCALARS)]
+            specs.append((f"f{idx}", field_type, field(default=default(idx))))
+        specs.append(("values", list[float], field(default_factory=lambda: [i / 7 for i in range(list_size)])))
+        specs.append(("names", list[str], field(default_factory=lambda: [f"name{i}" for i in range(list_size)])))
+        if child is not None:
+            specs.append(("child", child, field(default_factory=child)))
+            specs.append(("children", list[child], field(default_factory=functools.partial(_pair, child))))  # type: ignore[valid-type]
+        child = make_dataclass(f"Level{level}Config", specs, bases=(Coqpit,))
+    if child is None:
+        msg = f"depth must be at least 1, got {depth}"
+        raise ValueError(msg)
+    return child
+
+
+def field_names(config_class: type[Coqpit]) -> tuple[str, ...]:
+    """Return the names of the top-level fields of `config_class`."""
+    return tuple(config_class.__dataclass_fields__)
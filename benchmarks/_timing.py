@@ -0,0 +1,27 @@
+"""Small timing helpers shared by the benchmarks."""
+
+from __future__ import annotations
+
+import timeit
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from collections.abc import Callable
+
+
+def best_time(func: Callable[[], object], *, repeat: int = 5) -> float:
+    """Return the best time of a single call to `func`, in seconds.
+
+    The number of calls per measurement is calibrated with ``timeit.Timer.autorange()``.
+    """
+    timer = timeit.Timer(func)
+    number, _ = timer.autorange()
+    return min(timer.repeat(repeat=repeat, number=number)) / number
+
+
+def report(name: str, seconds: float, baseline: float | None = None) -> None:
+    """Print a single benchmark result, with the speedup relative to `baseline`."""
+    line = f"{name:<40} {seconds * 1e6:12.2f} us"
+    if baseline is not None:
+        line += f"   x{baseline / seconds:.2f}"
+    print(line)
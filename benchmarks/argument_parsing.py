@@ -0,0 +1,53 @@
+"""Compare `Coqpit.init_argparse` with building the parser from scratch.
+
+Also compare `Coqpit.parse_known_args` with `Coqpit.parse_overrides`.
+
+Run with ``python -m benchmarks.argument_parsing``.
+"""
+
+from dataclasses import dataclass, field
+
+from benchmarks._timing import best_time, report
+from coqpit import Coqpit
+from coqpit.coqpit import _ArgumentTemplateParser
+
+
+@dataclass
+class LayerConfig(Coqpit):
+    name: str = "layer"
+    size: int = 256
+    dropout: float = 0.1
+    use_bias: bool = True
+    kernel_sizes: list[int] = field(default_factory=lambda: [3, 5, 7])
+    options: dict[str, int] = field(default_factory=lambda: {"groups": 1})
+
+
+@dataclass
+class ModelConfig(Coqpit):
+    run_name: str = "run"
+    epochs: int = 1000
+    lr: float = 1e-3
+    encoder: LayerConfig = field(default_factory=LayerConfig)
+    layers: list[LayerConfig] = field(default_factory=lambda: [LayerConfig() for _ in range(50)])
+
+
+def main() -> None:
+    """Run the benchmark."""
+    config = ModelConfig()
+    args = ["--coqpit.lr", "0.5", "--coqpit.layers.3.size", "128"]
+
+    baseline = best_time(lambda: ModelConfig.init_argparse(parser=_ArgumentTemplateParser()))
+    report("init_argparse (uncached)", baseline)
+    report("init_argparse", best_time(ModelConfig.init_argparse), baseline)
+
+    baseline = best_time(lambda: ModelConfig.init_argparse(instance=config, parser=_ArgumentTemplateParser()))
+    report("init_argparse instance (uncached)", baseline)
+    report("init_argparse instance", best_time(lambda: ModelConfig.init_argparse(instance=config)), baseline)
+
+    baseline = best_time(lambda: config.parse_known_args(args))
+    report("parse_known_args", baseline)
+    report("parse_overrides", best_time(lambda: config.parse_overrides(args)), baseline)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,53 @@
+"""Compare numeric list fields decoded into lists and into `array.array` storage.
+
+Run with ``python -m benchmarks.arrays``.
+"""
+
+import sys
+from dataclasses import dataclass, field
+
+from benchmarks._timing import best_time, report
+from coqpit import Coqpit
+
+
+@dataclass
+class ListConfig(Coqpit):
+    weights: list[float] = field(default_factory=list)
+    ids: list[int] = field(default_factory=list)
+
+
+@dataclass
+class ArrayConfig(Coqpit):
+    weights: list[float] = field(default_factory=list, metadata={"array": True})
+    ids: list[int] = field(default_factory=list, metadata={"array": True})
+
+
+def _size(config: Coqpit) -> int:
+    values = (config.weights, config.ids)  # type: ignore[attr-defined]
+    # the items of lists are separate objects, the ones of arrays are stored inline
+    items = (xi for x in values if isinstance(x, list) for xi in x)
+    return sum(map(sys.getsizeof, values)) + sum(map(sys.getsizeof, items))
+
+
+def main() -> None:
+    """Run the benchmark."""
+    data = {"weights": [i / 7 for i in range(100_000)], "ids": list(range(1000, 101_000))}
+    lists = ListConfig.new_from_dict(data)
+    arrays = ArrayConfig.new_from_dict(data)
+    assert arrays.to_dict() == lists.to_dict() == data
+
+    baseline = best_time(lambda: ListConfig.new_from_dict(data))
+    report("new_from_dict (list)", baseline)
+    report("new_from_dict (array)", best_time(lambda: ArrayConfig.new_from_dict(data)), baseline)
+    baseline = best_time(lists.to_dict)
+    report("to_dict (list)", baseline)
+    report("to_dict (array)", best_time(arrays.to_dict), baseline)
+    baseline = best_time(lists.to_binary)
+    report("to_binary (list)", baseline)
+    report("to_binary (array)", best_time(arrays.to_binary), baseline)
+    print(f"{'memory (list)':<40} {_size(lists) / 1e6:12.2f} MB")
+    print(f"{'memory (array)':<40} {_size(arrays) / 1e6:12.2f} MB")
+
+
+if __name__ == "__main__":
+    main()
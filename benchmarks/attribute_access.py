@@ -0,0 +1,63 @@
+"""Attribute-read throughput of Coqpit fields and methods, per MISSING check mode.
+
+``missing_check="access"`` checks every attribute read for the MISSING value,
+the default ``missing_check="assign"`` only checks when fields are assigned.
+
+Run with ``python -m benchmarks.attribute_access``.
+"""
+
+import functools
+from dataclasses import dataclass
+
+from benchmarks._timing import best_time, report
+from coqpit import MISSING, Coqpit
+
+READS = 1000
+
+
+@dataclass
+class AssignChecked(Coqpit):
+    lr: float = 1e-3
+    epochs: int = 1000
+    run_name: str = "run"
+    val_k: int = MISSING
+
+
+@dataclass
+class AccessChecked(Coqpit, missing_check="access"):
+    lr: float = 1e-3
+    epochs: int = 1000
+    run_name: str = "run"
+    val_k: int = MISSING
+
+
+def _read_fields(config: AssignChecked | AccessChecked) -> None:
+    for _ in range(READS):
+        _ = config.lr
+        _ = config.epochs
+
+
+def _read_methods(config: AssignChecked | AccessChecked) -> None:
+    for _ in range(READS):
+        _ = config.to_dict
+
+
+def _construct(config_class: type[AssignChecked | AccessChecked]) -> None:
+    config_class(val_k=1)
+
+
+def main() -> None:
+    """Run the benchmark."""
+    access_checked = AccessChecked(val_k=1)
+    assign_checked = AssignChecked(val_k=1)
+    for name, func in (("field reads", _read_fields), ("method lookups", _read_methods)):
+        baseline = best_time(functools.partial(func, access_checked))
+        report(f"{name} x{READS} (check on access)", baseline)
+        report(f"{name} x{READS} (check on assign)", best_time(functools.partial(func, assign_checked)), baseline)
+    baseline = best_time(functools.partial(_construct, AccessChecked))
+    report("construction (check on access)", baseline)
+    report("construction (check on assign)", best_time(functools.partial(_construct, AssignChecked)), baseline)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+"""Throughput of `Coqpit.new_from_dicts` for a growing number of workers.
+
+Also compare `Coqpit.load_json_files` with calling `Coqpit.load_json` on every file.
+
+Run with ``python -m benchmarks.batch``.
+"""
+
+import os
+import tempfile
+import time
+from pathlib import Path
+from typing import Literal
+
+from benchmarks.deserialization import TrainConfig
+
+NUM_CONFIGS = 4000
+NUM_FILES = 500
+
+
+def _throughput(data: list[dict[str, object]], workers: int, executor: Literal["thread", "process"]) -> float:
+    """Return the best number of configs per second over 3 runs."""
+    best = float("inf")
+    for _ in range(3):
+        start = time.perf_counter()
+        TrainConfig.new_from_dicts(data, workers=workers, executor=executor)
+        best = min(best, time.perf_counter() - start)
+    return len(data) / best
+
+
+def main() -> None:
+    """Run the benchmark."""
+    data = [TrainConfig(epochs=i).to_dict() for i in range(NUM_CONFIGS)]
+    cpu_count = os.cpu_count() or 1
+    worker_counts = sorted({2, 4, cpu_count} - {1})
+    baseline = _throughput(data, 1, "thread")
+    print(f"{NUM_CONFIGS} configs, {cpu_count} cores")
+    print(f"{'workers=1':<40} {baseline:12.0f} configs/s")
+    for executor in ("thread", "process"):
+        for workers in worker_counts:
+            throughput = _throughput(data, workers, executor)
+            name = f"workers={workers} ({executor})"
+            print(f"{name:<40} {throughput:12.0f} configs/s   x{throughput / baseline:.2f}")
+
+    with tempfile.TemporaryDirectory() as directory:
+        paths = [Path(directory) / f"run_{i}" / "config.json" for i in range(NUM_FILES)]
+        for path in paths:
+            path.parent.mkdir()
+            TrainConfig().save_json(path)
+        start = time.perf_counter()
+        for path in paths:
+            TrainConfig().load_json(path)
+        baseline = NUM_FILES / (time.perf_counter() - start)
+        print(f"{NUM_FILES} files")
+        print(f"{'load_json':<40} {baseline:12.0f} files/s")
+        for workers in sorted({1, cpu_count}):
+            start = time.perf_counter()
+            TrainConfig.load_json_files(directory, workers=workers, executor="process")
+            throughput = NUM_FILES / (time.perf_counter() - start)
+            name = f"load_json_files workers={workers}"
+            print(f"{name:<40} {throughput:12.0f} files/s   x{throughput / baseline:.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,39 @@
+"""Compare binary snapshots with JSON for a config holding large lists and dicts.
+
+Run with ``python -m benchmarks.binary``.
+"""
+
+import json
+from dataclasses import dataclass, field
+
+from benchmarks._timing import best_time, report
+from coqpit import Coqpit
+
+
+@dataclass
+class CharactersConfig(Coqpit):
+    characters: list[str] = field(default_factory=lambda: [f"token_{i}" for i in range(20000)])
+    speakers: dict[str, int] = field(default_factory=lambda: {f"speaker_{i}": i for i in range(2000)})
+    loss_weights: list[float] = field(default_factory=lambda: [i / 7 for i in range(50000)])
+    layer_sizes: list[int] = field(default_factory=lambda: list(range(0, 100000, 3)))
+
+
+def main() -> None:
+    """Run the benchmark."""
+    config = CharactersConfig()
+    text = json.dumps(config.to_dict())
+    data = config.to_binary()
+    assert CharactersConfig.new_from_binary(data) == config
+    print(f"size: json {len(text.encode('utf8'))} bytes, binary {len(data)} bytes")
+
+    baseline = best_time(lambda: json.dumps(config.to_dict()))
+    report("save json", baseline)
+    report("save binary", best_time(config.to_binary), baseline)
+
+    baseline = best_time(lambda: CharactersConfig.new_from_dict(json.loads(text)))
+    report("load json", baseline)
+    report("load binary", best_time(lambda: CharactersConfig.new_from_binary(data)), baseline)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+"""Compare declarative field constraints with ``check_argument()`` calls in ``check_values()``.
+
+Run with ``python -m benchmarks.constraints``.
+"""
+
+from dataclasses import dataclass, field
+
+from benchmarks._timing import best_time, report
+from coqpit import Coqpit, check_argument
+
+
+@dataclass
+class ManualAudioConfig(Coqpit):
+    sample_rate: int = 22050
+    fft_size: int = 1024
+    hop_length: int = 256
+    win_length: int = 1024
+    num_mels: int = 80
+    mel_fmin: float = 0.0
+    preemphasis: float = 0.0
+    mode: str = "mel"
+
+    def check_values(self) -> None:
+        """Check config fields."""
+        check_argument("sample_rate", self, restricted=True, min_val=512, max_val=100000)
+        check_argument("fft_size", self, restricted=True, min_val=128, max_val=4058)
+        check_argument("hop_length", self, restricted=True, min_val=1, max_val=4058)
+        check_argument("win_length", self, restricted=True, min_val=1, max_val=4058)
+        check_argument("num_mels", self, restricted=True, min_val=10, max_val=2056)
+        check_argument("mel_fmin", self, restricted=True, min_val=0.0, max_val=1000)
+        check_argument("preemphasis", self, restricted=True, min_val=0, max_val=1.0)
+        check_argument("mode", self, restricted=True, enum_list=["mel", "linear"])
+
+
+@dataclass
+class DeclarativeAudioConfig(Coqpit):
+    sample_rate: int = field(default=22050, metadata={"min_val": 512, "max_val": 100000})
+    fft_size: int = field(default=1024, metadata={"min_val": 128, "max_val": 4058})
+    hop_length: int = field(default=256, metadata={"min_val": 1, "max_val": 4058})
+    win_length: int = field(default=1024, metadata={"min_val": 1, "max_val": 4058})
+    num_mels: int = field(default=80, metadata={"min_val": 10, "max_val": 2056})
+    mel_fmin: float = field(default=0.0, metadata={"min_val": 0.0, "max_val": 1000})
+    preemphasis: float = field(default=0.0, metadata={"min_val": 0, "max_val": 1.0})
+    mode: str = field(default="mel", metadata={"enum_list": ["mel", "linear"]})
+
+
+def main() -> None:
+    """Run the benchmark."""
+    manual = ManualAudioConfig()
+    declarative = DeclarativeAudioConfig()
+
+    baseline = best_time(manual.check_values)
+    report("check_argument() calls", baseline)
+    report("declarative constraints", best_time(declarative.check_constraints), baseline)
+    baseline = best_time(ManualAudioConfig)
+    report("construction (check_argument)", baseline)
+    report("construction (declarative)", best_time(DeclarativeAudioConfig), baseline)
+
+
+if __name__ == "__main__":
+    main()
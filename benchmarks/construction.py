@@ -0,0 +1,86 @@
+"""Compare construction of deep and wide `Serializable` trees with per-field checks in ``__post_init__``.
+
+Run with ``python -m benchmarks.construction``.
+"""
+
+from __future__ import annotations
+
+from dataclasses import field, fields, make_dataclass
+from typing import Any
+
+from benchmarks._timing import best_time, report
+from coqpit.coqpit import Serializable, _is_optional_field, no_default
+
+WIDTH = 50
+DEPTH = 20
+
+
+def _reference_post_init(self: Any) -> None:
+    """``Serializable.__post_init__()`` before the checks were precomputed per class."""
+    for f in fields(self):
+        value = getattr(self, f.name)
+        if value is None and not _is_optional_field(f.type):
+            msg = f"{f.name} is not optional"
+            raise TypeError(msg)
+        contract = f.metadata.get("contract", None)
+        if contract is not None and value is not None and not contract(value):
+            msg = f"break the contract for {f.name}, {self.__class__.__name__}"
+            raise ValueError(msg)
+    for key, value in self.__dict__.items():
+        if value is no_default:
+            msg = f"__init__ missing 1 required argument: '{key}'"
+            raise TypeError(msg)
+
+
+def _is_positive(x: int) -> bool:
+    return x > 0
+
+
+def _wide_class(namespace: dict[str, Any]) -> type:
+    """Return a class with `WIDTH` fields of various kinds."""
+    specs: list[tuple[str, Any, Any]] = []
+    for idx in range(WIDTH):
+        if idx % 3 == 0:
+            specs.append((f"f{idx}", int, field(default=idx + 1, metadata={"contract": _is_positive})))
+        elif idx % 3 == 1:
+            specs.append((f"f{idx}", str, field(default="a")))
+        else:
+            specs.append((f"f{idx}", float | None, field(default=None)))
+    return make_dataclass("WideConfig", specs, bases=(Serializable,), namespace=namespace)
+
+
+def _deep_classes(namespace: dict[str, Any]) -> list[type]:
+    """Return `DEPTH` classes, each holding the next one."""
+    classes = [make_dataclass("Level0", [("value", int, 0)], bases=(Serializable,), namespace=namespace)]
+    for idx in range(1, DEPTH):
+        specs = [("value", int, idx), ("child", classes[-1], field(default_factory=classes[-1]))]
+        classes.append(make_dataclass(f"Level{idx}", specs, bases=(Serializable,), namespace=namespace))
+    return classes
+
+
+def main() -> None:
+    """Run the benchmark."""
+    reference = {"__post_init__": _reference_post_init}
+    wide, reference_wide = _wide_class({}), _wide_class(reference)
+    deep, reference_deep = _deep_classes({})[-1], _deep_classes(reference)[-1]
+
+    baseline = best_time(reference_wide)
+    report(f"wide, {WIDTH} fields (reference)", baseline)
+    report(f"wide, {WIDTH} fields (precomputed)", best_time(wide), baseline)
+    baseline = best_time(reference_deep)
+    report(f"deep, {DEPTH} levels (reference)", baseline)
+    report(f"deep, {DEPTH} levels (precomputed)", best_time(deep), baseline)
+
+    def build_many() -> None:
+        [wide() for _ in range(100)]
+
+    def build_many_reference() -> None:
+        [reference_wide() for _ in range(100)]
+
+    baseline = best_time(build_many_reference)
+    report("100 wide configs (reference)", baseline)
+    report("100 wide configs (precomputed)", best_time(build_many), baseline)
+
+
+if __name__ == "__main__":
+    main()
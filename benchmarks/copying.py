@@ -0,0 +1,59 @@
+"""Compare copy-on-write copies with `copy.deepcopy` for many variants of a config.
+
+Run with ``python -m benchmarks.copying``.
+"""
+
+import copy
+import functools
+import tracemalloc
+from collections.abc import Callable
+
+from benchmarks._timing import best_time, report
+from benchmarks.deserialization import TrainConfig
+
+
+def _variant(config: TrainConfig, copy_config: Callable[[TrainConfig], TrainConfig], idx: int) -> TrainConfig:
+    """Copy `config` and change a few fields, like a hyperparameter search."""
+    variant = copy_config(config)
+    variant.lr = idx * 1e-4
+    variant.audio.num_mels = 80 + idx
+    variant.datasets[0].language = "de"
+    return variant
+
+
+def _variants(config: TrainConfig, copy_config: Callable[[TrainConfig], TrainConfig], n: int) -> list[TrainConfig]:
+    """Return `n` variants of `config`."""
+    return [_variant(config, copy_config, idx) for idx in range(n)]
+
+
+def _memory(make: Callable[[], object]) -> int:
+    """Return the memory allocated by `make()` and still in use, in bytes."""
+    tracemalloc.start()
+    kept = make()
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del kept
+    return size
+
+
+def main() -> None:
+    """Run the benchmark."""
+    config = TrainConfig()
+    copiers: dict[str, Callable[[TrainConfig], TrainConfig]] = {
+        "deepcopy": copy.deepcopy,
+        "copy_on_write": lambda c: c.copy(copy_on_write=True),
+    }
+    assert copiers["copy_on_write"](config).to_dict() == config.to_dict()
+
+    baseline = None
+    for name, copy_config in copiers.items():
+        seconds = best_time(functools.partial(_variant, config, copy_config, 1))
+        baseline = baseline or seconds
+        report(f"copy and set 3 fields ({name})", seconds, baseline)
+    for name, copy_config in copiers.items():
+        size = _memory(functools.partial(_variants, config, copy_config, 1000))
+        print(f"{'memory of 1000 variants (' + name + ')':<40} {size / 1e6:12.2f} MB")
+
+
+if __name__ == "__main__":
+    main()
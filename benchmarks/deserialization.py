@@ -0,0 +1,137 @@
+"""Compare `Coqpit.new_from_dict` with and without the per-class deserialization plans.
+
+The reference implementation below is the generic field-by-field deserialization
+that re-inspects the field types for every value.
+
+Run with ``python -m benchmarks.deserialization``.
+"""
+
+from dataclasses import MISSING as _MISSING
+from dataclasses import dataclass, field, fields
+from pathlib import Path
+from typing import Any, Literal
+
+from benchmarks._timing import best_time, report
+from coqpit.coqpit import (
+    MISSING,
+    Coqpit,
+    FieldType,
+    Serializable,
+    _default_value,
+    _deserialize_dict,
+    _deserialize_literal,
+    _deserialize_path,
+    _deserialize_primitive_types,
+    _drop_none_type,
+    _is_dict,
+    _is_list,
+    _is_literal_type,
+    _is_primitive_type,
+    _is_union,
+    _is_union_and_not_simple_optional,
+)
+
+
+@dataclass
+class AudioConfig(Coqpit):
+    sample_rate: int = 22050
+    fft_size: int = 1024
+    hop_length: int = 256
+    win_length: int = 1024
+    num_mels: int = 80
+    mel_fmin: float = 0.0
+    mel_fmax: float | None = None
+    preemphasis: float = 0.0
+    ref_level_db: int = 20
+    do_trim_silence: bool = True
+    resample: bool = False
+    signal_norm: bool = True
+    stats_path: Path | None = None
+    mode: Literal["stft", "mel"] = "mel"
+
+
+@dataclass
+class DatasetConfig(Coqpit):
+    formatter: str = "ljspeech"
+    path: Path = Path("data")
+    meta_file_train: str = "metadata.csv"
+    language: str = "en"
+    ignored_speakers: list[str] | None = None
+    weights: list[float] = field(default_factory=lambda: [1.0] * 32)
+
+
+@dataclass
+class TrainConfig(Coqpit):
+    run_name: str = "run"
+    epochs: int = 1000
+    batch_size: int = 32
+    lr: float = 1e-3
+    audio: AudioConfig = field(default_factory=AudioConfig)
+    datasets: list[DatasetConfig] = field(default_factory=lambda: [DatasetConfig() for _ in range(8)])
+    characters: dict[str, Any] = field(default_factory=lambda: {"pad": "<PAD>", "eos": "<EOS>", "chars": "abc"})
+    test_sentences: list[str] = field(default_factory=lambda: ["It took me quite a long time."] * 16)
+
+
+def _reference_deserialize(x: Any, field_type: FieldType) -> Any:  # noqa: PLR0911
+    """Generic deserialization, inspecting the field type for every value."""
+    base_type = _drop_none_type(field_type)
+    if _is_dict(base_type):
+        return _deserialize_dict(x)
+    if _is_list(base_type):
+        item_type = base_type.__args__[0]  # type: ignore[attr-defined]
+        return [_reference_deserialize(xi, item_type) for xi in x]
+    if _is_union_and_not_simple_optional(field_type):
+        for arg in field_type.__args__:
+            try:
+                return _reference_deserialize(x, arg)
+            except (TypeError, ValueError):  # noqa: PERF203
+                pass
+        return x
+    if not _is_union(base_type) and isinstance(base_type, type) and issubclass(base_type, Serializable):
+        return _reference_deserialize_immutable(base_type, x)
+    if base_type is Path:
+        return _deserialize_path(x, field_type)
+    if _is_primitive_type(base_type):
+        return _deserialize_primitive_types(x, field_type)
+    if _is_literal_type(field_type):
+        return _deserialize_literal(x, field_type)
+    raise TypeError
+
+
+def _reference_deserialize_immutable(cls: type[Serializable], data: dict[str, Any]) -> Serializable:
+    init_kwargs = {}
+    for f in fields(cls):
+        if f.name not in data:
+            if f.name in vars(cls):
+                init_kwargs[f.name] = vars(cls)[f.name]
+                continue
+            default_value = _default_value(f)
+            if default_value not in (MISSING, _MISSING):
+                init_kwargs[f.name] = default_value
+                continue
+            raise ValueError
+        value = data[f.name]
+        if value is not None:
+            value = _reference_deserialize(value, f.type)
+        init_kwargs[f.name] = value
+    return cls(**init_kwargs)
+
+
+def main() -> None:
+    """Run the benchmark."""
+    data = TrainConfig().to_dict()
+    assert _reference_deserialize_immutable(TrainConfig, data) == TrainConfig.new_from_dict(data)
+
+    baseline = best_time(lambda: _reference_deserialize_immutable(TrainConfig, data))
+    report("new_from_dict (reference)", baseline)
+    report("new_from_dict (compiled plan)", best_time(lambda: TrainConfig.new_from_dict(data)), baseline)
+
+    def cold() -> None:
+        TrainConfig.invalidate_plan()
+        TrainConfig.new_from_dict(data)
+
+    report("new_from_dict (plan rebuilt every call)", best_time(cold), baseline)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,35 @@
+"""Compare `Coqpit.fingerprint` with hashing the sorted JSON of ``to_dict()``.
+
+Run with ``python -m benchmarks.fingerprint``.
+"""
+
+import hashlib
+import json
+
+from benchmarks._timing import best_time, report
+from benchmarks.deserialization import TrainConfig
+
+
+def _reference_fingerprint(config: TrainConfig) -> str:
+    """Hash the whole config on every call."""
+    return hashlib.sha256(json.dumps(config.to_dict(), sort_keys=True).encode()).hexdigest()
+
+
+def main() -> None:
+    """Run the benchmark."""
+    config = TrainConfig()
+    config.fingerprint()
+
+    def set_nested_field() -> str:
+        config.datasets[3].language = "de"
+        return config.fingerprint()
+
+    baseline = best_time(lambda: _reference_fingerprint(config))
+    report("sha256 of sorted to_json", baseline)
+    report("fingerprint (unchanged)", best_time(config.fingerprint), baseline)
+    report("fingerprint (nested field set)", best_time(set_nested_field), baseline)
+    report("fingerprint (new config)", best_time(lambda: TrainConfig().fingerprint()), baseline)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+"""Memory per instance and attribute-read latency of frozen configs.
+
+Compares many small per-speaker configs kept as mutable Coqpits with their frozen
+``__slots__`` twins, see ``Coqpit.freeze()``.
+
+Run with ``python -m benchmarks.frozen``.
+"""
+
+import tracemalloc
+from collections.abc import Callable
+from dataclasses import dataclass, field
+from typing import Any
+
+from benchmarks._timing import best_time, report
+from coqpit import Coqpit
+
+INSTANCES = 10000
+READS = 1000
+
+
+@dataclass
+class SpeakerConfig(Coqpit):
+    name: str = "speaker"
+    gender: str = "f"
+    language: str = "en"
+    pitch_mean: float = 180.0
+    pitch_std: float = 30.0
+    num_utterances: int = 500
+    embedding: list[float] = field(default_factory=lambda: [0.0] * 8)
+
+
+def _memory_per_instance(make: Callable[[int], Any]) -> float:
+    """Return the memory allocated per instance created by `make`, in bytes."""
+    tracemalloc.start()
+    kept = [make(idx) for idx in range(INSTANCES)]
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del kept
+    return size / INSTANCES
+
+
+def _read_fields(config: Any) -> None:
+    for _ in range(READS):
+        _ = config.name
+        _ = config.pitch_mean
+        _ = config.embedding
+
+
+def main() -> None:
+    """Run the benchmark."""
+    config = SpeakerConfig()
+    frozen = config.freeze()
+    assert frozen.to_dict() == config.to_dict()
+
+    mutable_size = _memory_per_instance(lambda idx: SpeakerConfig(name=str(idx)))
+    frozen_size = _memory_per_instance(lambda idx: SpeakerConfig(name=str(idx)).freeze())
+    print(f"{'memory per instance (mutable)':<40} {mutable_size:12.0f} B")
+    print(f"{'memory per instance (frozen)':<40} {frozen_size:12.0f} B   x{mutable_size / frozen_size:.2f}")
+
+    baseline = best_time(lambda: _read_fields(config))
+    report(f"{3 * READS} attribute reads (mutable)", baseline)
+    report(f"{3 * READS} attribute reads (frozen)", best_time(lambda: _read_fields(frozen)), baseline)
+    report("freeze()", best_time(config.freeze))
+
+
+if __name__ == "__main__":
+    main()
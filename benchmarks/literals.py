@@ -0,0 +1,45 @@
+"""Compare Literal decoding with tuple scans and set lookups, and time Enum decoding.
+
+Run with ``python -m benchmarks.literals``.
+"""
+
+import enum
+from typing import Any, Literal
+
+from benchmarks._timing import best_time, report
+from coqpit.coqpit import Decoder, _compile_decoder, _deserialize_literal
+
+PHONEMES = tuple(f"p{idx}" for idx in range(300))
+Phoneme = Literal[PHONEMES]  # type: ignore[valid-type]
+PhonemeEnum = enum.Enum("PhonemeEnum", {f"P{idx}": value for idx, value in enumerate(PHONEMES)})  # type: ignore[misc]
+
+
+def _reference_literal_decoder(field_type: Any) -> Decoder:
+    values = field_type.__args__
+
+    def decode_literal(x: Any) -> Any:
+        if x in values:
+            return x
+        return _deserialize_literal(x, field_type)
+
+    return decode_literal
+
+
+def main() -> None:
+    """Run the benchmark."""
+    data = [PHONEMES[(idx * 7) % len(PHONEMES)] for idx in range(5000)]
+    decode_item = _reference_literal_decoder(Phoneme)
+    decode = _compile_decoder(list[Phoneme])
+    assert decode(data) == [decode_item(x) for x in data]
+
+    baseline = best_time(lambda: [decode_item(x) for x in data])
+    report("list[Literal] (tuple scan)", baseline)
+    report("list[Literal] (set lookup)", best_time(lambda: decode(data)), baseline)
+    decode_enum = _compile_decoder(list[PhonemeEnum])
+    names = [PhonemeEnum(x).name for x in data]
+    report("list[Enum] (by value)", best_time(lambda: decode_enum(data)), baseline)
+    report("list[Enum] (by name)", best_time(lambda: decode_enum(names)), baseline)
+
+
+if __name__ == "__main__":
+    main()
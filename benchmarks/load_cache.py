@@ -0,0 +1,37 @@
+"""Compare `Coqpit.load_json` with and without the load cache.
+
+Run with ``python -m benchmarks.load_cache``.
+"""
+
+import tempfile
+from pathlib import Path
+
+from benchmarks._timing import best_time, report
+from benchmarks.binary import CharactersConfig
+from benchmarks.deserialization import TrainConfig
+from coqpit import Coqpit
+
+
+def _bench(name: str, config: Coqpit, directory: Path) -> None:
+    file_path = directory / f"{name}.json"
+    config.save_json(file_path)
+    config_class = type(config)
+
+    def load(*, cache: bool) -> None:
+        config_class().load_json(file_path, cache=cache)
+
+    load(cache=True)
+    baseline = best_time(lambda: load(cache=False))
+    report(f"{name} load_json", baseline)
+    report(f"{name} load_json (cached)", best_time(lambda: load(cache=True)), baseline)
+
+
+def main() -> None:
+    """Run the benchmark."""
+    with tempfile.TemporaryDirectory() as directory:
+        _bench("train", TrainConfig(), Path(directory))
+        _bench("characters", CharactersConfig(), Path(directory))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+"""Compare NumPy array fields with nested list fields of the same values.
+
+Run with ``python -m benchmarks.ndarrays``, NumPy is required.
+"""
+
+import json
+import pickle
+from dataclasses import dataclass, field
+
+import numpy as np
+import numpy.typing as npt
+
+from benchmarks._timing import best_time, report
+from coqpit import Coqpit
+
+
+@dataclass
+class ListConfig(Coqpit):
+    embeddings: list[list[float]] = field(default_factory=list)
+
+
+@dataclass
+class ArrayConfig(Coqpit):
+    embeddings: npt.NDArray[np.float32] = field(default_factory=lambda: np.zeros((0, 0), dtype=np.float32))
+
+
+def main() -> None:
+    """Run the benchmark."""
+    embeddings = np.random.default_rng(0).random((512, 256), dtype=np.float32)
+    lists = ListConfig(embeddings=embeddings.tolist())
+    arrays = ArrayConfig(embeddings=embeddings)
+    list_text = lists.to_json()
+    array_text = arrays.to_json()
+    assert np.array_equal(ArrayConfig.new_from_dict(json.loads(array_text)).embeddings, embeddings)
+
+    baseline = best_time(lists.to_json, repeat=3)
+    report("to_json (nested lists)", baseline)
+    report("to_json (ndarray)", best_time(arrays.to_json, repeat=3), baseline)
+    list_data = json.loads(list_text)
+    array_data = json.loads(array_text)
+    baseline = best_time(lambda: ListConfig.new_from_dict(list_data), repeat=3)
+    report("new_from_dict (nested lists)", baseline)
+    report("new_from_dict (ndarray)", best_time(lambda: ArrayConfig.new_from_dict(array_data), repeat=3), baseline)
+    list_binary = lists.to_binary()
+    array_binary = arrays.to_binary()
+    baseline = best_time(lambda: ListConfig.new_from_binary(list_binary), repeat=3)
+    report("new_from_binary (nested lists)", baseline)
+    report("new_from_binary (ndarray)", best_time(lambda: ArrayConfig.new_from_binary(array_binary)), baseline)
+    baseline = best_time(lambda: pickle.loads(pickle.dumps(lists)), repeat=3)  # noqa: S301
+    report("pickle round trip (nested lists)", baseline)
+    report("pickle round trip (ndarray)", best_time(lambda: pickle.loads(pickle.dumps(arrays))), baseline)  # noqa: S301
+    print(f"{'JSON size (nested lists)':<40} {len(list_text) / 1e6:12.2f} MB")
+    print(f"{'JSON size (ndarray)':<40} {len(array_text) / 1e6:12.2f} MB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,36 @@
+"""Compare `Coqpit.to_dict` with the generic field-by-field serialization.
+
+Run with ``python -m benchmarks.serialization``.
+"""
+
+from dataclasses import fields
+from typing import Any
+
+from benchmarks._timing import best_time, report
+from benchmarks.deserialization import TrainConfig
+from coqpit.coqpit import Serializable, _serialize
+
+
+def _reference_serialize(x: Any) -> Any:
+    """Generic serialization, checking the type of every value."""
+    if isinstance(x, dict):
+        return {k: _reference_serialize(v) for k, v in x.items()}
+    if isinstance(x, list):
+        return [_reference_serialize(xi) for xi in x]
+    if isinstance(x, Serializable):
+        return {f.name: _reference_serialize(getattr(x, f.name)) for f in fields(x)}
+    return _serialize(x)
+
+
+def main() -> None:
+    """Run the benchmark."""
+    config = TrainConfig()
+    assert _reference_serialize(config) == config.to_dict()
+
+    baseline = best_time(lambda: _reference_serialize(config))
+    report("to_dict (reference)", baseline)
+    report("to_dict (generated serializer)", best_time(config.to_dict), baseline)
+
+
+if __name__ == "__main__":
+    main()
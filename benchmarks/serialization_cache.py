@@ -0,0 +1,47 @@
+"""Compare serializing a config with and without ``cache_serialized=True``.
+
+Run with ``python -m benchmarks.serialization_cache``.
+"""
+
+import json
+from collections.abc import Callable
+from dataclasses import dataclass
+
+from benchmarks._timing import best_time, report
+from benchmarks.deserialization import TrainConfig
+
+
+@dataclass
+class CachedTrainConfig(TrainConfig, cache_serialized=True):
+    pass
+
+
+def main() -> None:
+    """Run the benchmark."""
+    config = TrainConfig()
+    cached = CachedTrainConfig()
+    assert cached.to_dict() == config.to_dict()
+    assert cached.to_json() == config.to_json()
+
+    for name in ("to_dict", "to_json"):
+        serialize = getattr(cached, name)
+
+        def set_nested_field(serialize: Callable[[], object] = serialize) -> object:
+            cached.datasets[3].language = "de"
+            return serialize()
+
+        def change_list(serialize: Callable[[], object] = serialize) -> object:
+            cached.test_sentences.append("One more.")
+            cached.test_sentences.pop()
+            return serialize()
+
+        baseline = best_time(getattr(config, name))
+        report(name, baseline)
+        report(f"{name} (cached, unchanged)", best_time(serialize), baseline)
+        report(f"{name} (cached, nested field set)", best_time(set_nested_field), baseline)
+        report(f"{name} (cached, list changed)", best_time(change_list), baseline)
+    assert json.loads(cached.to_json()) == cached.serialize()
+
+
+if __name__ == "__main__":
+    main()
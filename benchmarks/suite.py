@@ -0,0 +1,92 @@
+"""Time the main Coqpit operations on a synthetic config and save the results as JSON.
+
+Run with ``python -m benchmarks.suite`` or ``make bench``. The shape of the config
+is set with ``--depth``, ``--width`` and ``--list-size``, see `make_config_class()`.
+Results written with ``--output`` can be compared with a later run by passing
+them to ``--compare``, e.g. before and after a commit.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import operator
+import platform
+import tempfile
+from pathlib import Path
+from typing import TYPE_CHECKING, Any
+
+from benchmarks._synthetic import field_names, make_config_class
+from benchmarks._timing import best_time, report
+
+if TYPE_CHECKING:
+    from collections.abc import Callable
+
+    from coqpit import Coqpit
+
+
+def _operations(config_class: type[Coqpit], tmp_dir: Path) -> dict[str, Callable[[], object]]:
+    """Return the timed operations, by name."""
+    config = config_class()
+    data = config.to_dict()
+    json_path = tmp_dir / "config.json"
+    config.save_json(json_path)
+    names = field_names(config_class)
+    read_fields = operator.attrgetter(*names)
+    # a scalar of each level and an item of a list of each kind
+    args = ["--coqpit.f0", "1", "--coqpit.values.0", "0.5", "--coqpit.children.1.f0", "2"]
+    return {
+        "construction": config_class,
+        "new_from_dict": lambda: config_class.new_from_dict(data),
+        "to_dict": config.to_dict,
+        "to_json": config.to_json,
+        "load_json": lambda: config_class().load_json(json_path),
+        "init_from_argparse": lambda: config_class.init_from_argparse(args),
+        "parse_known_args": lambda: config.parse_known_args(args),
+        "copy": config.copy,
+        "copy (copy on write)": lambda: config.copy(copy_on_write=True),
+        f"`in` x{len(names)}": lambda: [name in config for name in names],
+        f"attribute reads x{len(names)}": lambda: read_fields(config),
+    }
+
+
+def run(depth: int, width: int, list_size: int, *, repeat: int = 5) -> dict[str, Any]:
+    """Time every operation on a config of the given shape and return the results."""
+    config_class = make_config_class(depth, width, list_size)
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        operations = _operations(config_class, Path(tmp_dir))
+        seconds = {name: best_time(func, repeat=repeat) for name, func in operations.items()}
+    return {
+        "python": platform.python_version(),
+        "shape": {"depth": depth, "width": width, "list_size": list_size},
+        "seconds": seconds,
+    }
+
+
+def main(argv: list[str] | None = None) -> None:
+    """Run the benchmark suite."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--depth", type=int, default=3, help="number of nested config levels")
+    parser.add_argument("--width", type=int, default=20, help="number of scalar fields per level")
+    parser.add_argument("--list-size", type=int, default=100, help="number of items of the list fields")
+    parser.add_argument("--repeat", type=int, default=5, help="number of measurements per operation")
+    parser.add_argument("--output", type=Path, help="JSON file to write the results to")
+    parser.add_argument("--compare", type=Path, help="JSON results of a previous run to compare with")
+    args = parser.parse_args(argv)
+
+    results = run(args.depth, args.width, args.list_size, repeat=args.repeat)
+    baseline: dict[str, float] = {}
+    if args.compare is not None:
+        previous = json.loads(args.compare.read_text())
+        if previous["shape"] != results["shape"]:
+            print(f"warning: comparing with results for a different shape {previous['shape']}")
+        baseline = previous["seconds"]
+    print(", ".join(f"{key}={value}" for key, value in results["shape"].items()))
+    for name, seconds in results["seconds"].items():
+        report(name, seconds, baseline.get(name))
+    if args.output is not None:
+        args.output.write_text(json.dumps(results, indent=4) + "\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+"""Compare Union decoding by trying every member with discriminators and member filters.
+
+The reference decoder below tries the members in order, catching the errors of the
+failed attempts, like Union decoders did before discriminators.
+
+Run with ``python -m benchmarks.unions``.
+"""
+
+from dataclasses import dataclass, field
+from typing import Any, Literal
+
+from benchmarks._timing import best_time, report
+from coqpit.coqpit import Coqpit, Decoder, _compile_decoder
+
+
+@dataclass
+class GlowConfig(Coqpit):
+    model: Literal["glow"] = "glow"
+    num_flows: int = 12
+    hidden_channels: int = 192
+    kernel_size: int = 5
+    dilation_rate: int = 1
+    num_blocks: int = 12
+    dropout: float = 0.05
+
+
+@dataclass
+class TacotronConfig(Coqpit):
+    model: Literal["tacotron"] = "tacotron"
+    r: int = 2
+    prenet_dropout: bool = True
+    attention_type: str = "original"
+    stopnet: bool = True
+    separate_stopnet: bool = True
+
+
+@dataclass
+class VitsConfig(Coqpit):
+    model: Literal["vits"] = "vits"
+    hidden_channels: int = 192
+    kernel_size: int = 3
+    num_layers_text_encoder: int = 10
+    resblock_kernel_sizes: list[int] = field(default_factory=lambda: [3, 7, 11])
+    upsample_rates: list[int] = field(default_factory=lambda: [8, 8, 2, 2])
+
+
+ModelConfig = GlowConfig | TacotronConfig | VitsConfig
+
+
+def _reference_union_decoder(field_type: Any) -> Decoder:
+    decoders = [_compile_decoder(arg) for arg in field_type.__args__]
+
+    def decode_union(x: Any) -> Any:
+        for decode in decoders:
+            try:
+                return decode(x)
+            except (TypeError, ValueError):  # noqa: PERF203
+                pass
+        return x
+
+    return decode_union
+
+
+def main() -> None:
+    """Run the benchmark."""
+    data = VitsConfig().to_dict()
+    reference = _reference_union_decoder(ModelConfig)
+    inferred = _compile_decoder(ModelConfig)
+    assert reference(data) == inferred(data) == VitsConfig()
+    baseline = best_time(lambda: reference(data))
+    report("last member (reference)", baseline)
+    report("last member (discriminator)", best_time(lambda: inferred(data)), baseline)
+
+    values = [1, "a", [1, 2]]
+    reference = _reference_union_decoder(VitsConfig | list[int] | str | int)
+    untagged = _compile_decoder(VitsConfig | list[int] | str | int)
+
+    def decode_reference() -> None:
+        for value in values:
+            reference(value)
+
+    def decode_untagged() -> None:
+        for value in values:
+            untagged(value)
+
+    baseline = best_time(decode_reference)
+    report("untagged (reference)", baseline)
+    report("untagged (member filters)", best_time(decode_untagged), baseline)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,21 @@
+"""Compare the full round trip of ``Serializable.validate()`` with its single-pass mode.
+
+Run with ``python -m benchmarks.validate``.
+"""
+
+import functools
+
+from benchmarks._timing import best_time, report
+from benchmarks.deserialization import TrainConfig
+
+
+def main() -> None:
+    """Run the benchmark."""
+    config = TrainConfig()
+    baseline = best_time(config.validate)
+    report("validate (round trip)", baseline)
+    report("validate (single pass)", best_time(functools.partial(config.validate, single_pass=True)), baseline)
+
+
+if __name__ == "__main__":
+    main()
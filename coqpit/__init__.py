@@ -1,7 +1,7 @@
 import importlib.metadata
 
-from coqpit.coqpit import MISSING, Coqpit, check_argument
+from coqpit.coqpit import MISSING, Coqpit, FrozenCoqpit, check_argument
 
-__all__ = ["MISSING", "Coqpit", "check_argument"]
+__all__ = ["MISSING", "Coqpit", "FrozenCoqpit", "check_argument"]
 
 __version__ = importlib.metadata.version("coqpit-config")
@@ -3,24 +3,41 @@
 from __future__ import annotations
 
 import argparse
+import array
+import base64
 import contextlib
+import copy
+import dataclasses
+import enum
 import functools
+import glob
+import hashlib
+import importlib
 import json
+import math
 import operator
+import os
+import pickle
+import re
+import struct
+import sys
+import tempfile
+import time
 import typing
 import warnings
-from collections.abc import Callable, ItemsView, Iterable, Iterator, MutableMapping
+import weakref
+from collections.abc import Callable, Collection, ItemsView, Iterable, Iterator, Mapping, MutableMapping
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 from dataclasses import MISSING as _MISSING
-from dataclasses import Field, asdict, dataclass, fields, is_dataclass, replace
+from dataclasses import Field, asdict, dataclass, fields, is_dataclass, make_dataclass, replace
 from pathlib import Path
 from pprint import pprint
 from types import UnionType
-from typing import TYPE_CHECKING, Any, Generic, Literal, TypeAlias, TypeGuard, TypeVar, Union, overload
+from typing import TYPE_CHECKING, Any, ClassVar, Generic, Literal, TypeAlias, TypeGuard, TypeVar, Union, overload
 
 from typing_extensions import Self, TypeIs
 
 if TYPE_CHECKING:  # pragma: no cover
-    import os
     from dataclasses import _MISSING_TYPE
 
     from _typeshed import SupportsKeysAndGetItem
@@ -56,6 +73,49 @@ def _is_literal_type(field_type: FieldType) -> TypeGuard[type]:
     return typing.get_origin(field_type) is Literal
 
 
+def _is_enum_type(field_type: FieldType) -> TypeGuard[type[enum.Enum]]:
+    """Check if the input type is an `enum.Enum` subclass."""
+    return isinstance(field_type, type) and issubclass(field_type, enum.Enum)
+
+
+def _ndarray_type() -> type | None:
+    """Return `numpy.ndarray` if NumPy has been imported, without importing it.
+
+    NumPy is optional: arrays and array types can only exist once it is imported.
+    """
+    numpy = sys.modules.get("numpy")
+    return None if numpy is None else typing.cast("type", numpy.ndarray)
+
+
+def _is_ndarray_type(field_type: FieldType) -> bool:
+    """Check if the input type is `numpy.ndarray` or a parametrized alias like ``numpy.typing.NDArray[np.float32]``."""
+    ndarray = _ndarray_type()
+    return ndarray is not None and (field_type is ndarray or typing.get_origin(field_type) is ndarray)
+
+
+def _is_ndarray(x: Any) -> bool:
+    """Check if `x` is a NumPy array."""
+    ndarray = _ndarray_type()
+    return ndarray is not None and isinstance(x, ndarray)
+
+
+def _literal_lookup(field_type: FieldType) -> Collection[Any]:
+    """Return the values of a typing.Literal type as a frozenset, or a tuple if some are unhashable."""
+    values = typing.get_args(field_type)
+    try:
+        return frozenset(values)
+    except TypeError:
+        return values
+
+
+def _in_lookup(values: Collection[Any], x: Any) -> bool:
+    """Check if `x` is in the result of `_literal_lookup()`, False for unhashable values."""
+    try:
+        return x in values
+    except TypeError:
+        return False
+
+
 def _is_list(field_type: FieldType) -> TypeGuard[type]:
     """Check if the input type is `list`.
 
@@ -178,7 +238,14 @@ def _drop_none_type(field_type: FieldType) -> FieldType:
     return typing.cast("UnionType", functools.reduce(lambda a, b: a | b, args))
 
 
-def _serialize(x: Any) -> Any:
+_PRIMITIVE_VALUE_TYPES = frozenset({int, float, str, bool, type(None)})
+
+# NumPy arrays with fewer items are serialized as nested lists if NumPy infers their
+# dtype back from the lists, see `_serialize_ndarray()`.
+_NDARRAY_LIST_MAX_SIZE = 256
+
+
+def _serialize(x: Any) -> Any:  # noqa: PLR0911
     """Pick the right serialization for the datatype of the given input.
 
     Args:
@@ -187,19 +254,47 @@ def _serialize(x: Any) -> Any:
     Returns:
         object: serialized object.
     """
+    if x.__class__ in _PRIMITIVE_VALUE_TYPES:
+        return x
     if isinstance(x, Path):
         return str(x)
+    if isinstance(x, enum.Enum):
+        return _serialize(x.value)
     if isinstance(x, dict):
         return {k: _serialize(v) for k, v in x.items()}
     if isinstance(x, list):
         return [_serialize(xi) for xi in x]
+    if isinstance(x, array.array):
+        return x.tolist()
     if isinstance(x, Serializable) or issubclass(type(x), Serializable):
         return x.serialize()
     if isinstance(x, type) and issubclass(x, Serializable):
         return x.serialize(x())
+    if _is_ndarray(x):
+        return _serialize_ndarray(x)
     return x
 
 
+def _serialize_ndarray(x: Any) -> Any:
+    """Serialize a NumPy array to nested lists, or to its raw bytes with its dtype and shape.
+
+    Small arrays of the default bool, int and float dtypes are serialized as nested
+    lists, which keeps them readable, unless they hold NaN or infinite values. Other
+    numeric arrays are serialized as ``{"dtype": "<f4", "shape": [2, 3], "base64": "..."}``,
+    the base64 encoded bytes of the array in C order, which preserves the dtype and is
+    much faster to encode and decode. Arrays of other dtypes are serialized as nested lists.
+    """
+    numpy = sys.modules["numpy"]
+    if x.dtype.kind not in "biufc" or (
+        0 < x.size < _NDARRAY_LIST_MAX_SIZE
+        and x.dtype in (numpy.dtype(bool), numpy.dtype(int), numpy.dtype(float))
+        and (x.dtype.kind != "f" or numpy.isfinite(x).all())
+    ):
+        return x.tolist()
+    data = x if x.flags.c_contiguous else numpy.ascontiguousarray(x)
+    return {"dtype": x.dtype.str, "shape": list(x.shape), "base64": base64.b64encode(data).decode("ascii")}
+
+
 def _deserialize_dict(x: dict[Any, Any]) -> dict[Any, Any]:
     """Deserialize dict.
 
@@ -327,7 +422,7 @@ def _deserialize_path(x: Any, field_type: FieldType) -> Path | None:
     return Path(x)
 
 
-def _deserialize(x: Any, field_type: FieldType) -> Any:  # noqa: PLR0911
+def _deserialize(x: Any, field_type: FieldType) -> Any:  # noqa: C901, PLR0911
     """Pick the right deserialization for the given object and the corresponding field type.
 
     Args:
@@ -350,6 +445,10 @@ def _deserialize(x: Any, field_type: FieldType) -> Any:  # noqa: PLR0911
         return _deserialize_union(x, field_type)
     if not _is_union(base_type) and isinstance(base_type, type) and issubclass(base_type, Serializable):
         return base_type.deserialize_immutable(x)
+    if _is_enum_type(base_type):
+        return _compile_enum_decoder(field_type, base_type)(x)
+    if _is_ndarray_type(base_type):
+        return _compile_ndarray_decoder(field_type, base_type)(x)
     if base_type is Path:
         return _deserialize_path(x, field_type)
     if _is_primitive_type(base_type):
@@ -360,281 +459,2379 @@ def _deserialize(x: Any, field_type: FieldType) -> Any:  # noqa: PLR0911
     raise TypeError(msg)
 
 
-CoqpitType: TypeAlias = MutableMapping[str, "CoqpitNestedValue"]
-CoqpitNestedValue: TypeAlias = Union["CoqpitValue", CoqpitType]
-CoqpitValue: TypeAlias = str | int | float | bool | None
+# ---------------------------------------------------------------------------- #
+#                          Compiled deserialization plans                      #
+# ---------------------------------------------------------------------------- #
 
+Decoder: TypeAlias = Callable[[Any], Any]
 
-# TODO: It should be possible to get rid of the next 3 `type: ignore`. At
-# nested levels, the key can be `str | int` as well, not just `str`.
-def _rsetattr(obj: CoqpitType, keys: str, val: CoqpitValue) -> None:
-    """Recursive setattr (supports dotted key names)."""
-    pre, _, post = keys.rpartition(".")
-    target = _rgetattr(obj, pre) if pre else obj
-    if post.isnumeric():
-        operator.setitem(target, int(post), val)  # type: ignore[misc]
-    else:
-        setattr(target, post, val)
+_DECODERS: dict[Any, Decoder] = {}
 
 
-def _rgetattr(obj: CoqpitType, keys: str) -> CoqpitType:
-    """Recursive getattr (supports dotted key names)."""
-    v = obj
-    for k in keys.split("."):
-        v = operator.getitem(v, int(k)) if k.isnumeric() else getattr(v, k)  # type: ignore[arg-type]
-    return v
+def _compile_decoder(field_type: FieldType) -> Decoder:
+    """Return a decoder equivalent to ``functools.partial(_deserialize, field_type=field_type)``.
 
+    All the type introspection of `_deserialize` is done once here, so that the
+    returned function only has to look at the value. Decoders are cached per type,
+    except for types using `Serializable` classes, see `_uses_serializable()`.
+    """
+    if _uses_serializable(field_type):
+        return _build_decoder(field_type)
+    try:
+        return _DECODERS[field_type]
+    except KeyError:
+        decoder = _DECODERS[field_type] = _build_decoder(field_type)
+        return decoder
+    except TypeError:
+        # unhashable type hint, e.g. Literal with unhashable values
+        return _build_decoder(field_type)
 
-def _rsetitem(obj: CoqpitType, keys: str, value: CoqpitValue) -> None:
-    """Recursive setitem (supports dotted key names).
 
-    _rsetitem(a, "b.c", 1) => a["b"]["c"] = 1
-    """
-    pre, _, post = keys.rpartition(".")
-    operator.setitem(_rgetitem(obj, pre) if pre else obj, post, value)
+def _type_classes(field_type: Any) -> Iterator[type]:
+    """Yield the classes used by a type hint, e.g. ``A`` and ``B`` for ``list[A] | B``."""
+    if isinstance(field_type, type) and not typing.get_args(field_type):
+        yield field_type
+    for arg in typing.get_args(field_type):
+        yield from _type_classes(arg)
 
 
-def _rgetitem(obj: CoqpitType, keys: str) -> CoqpitType:
-    """Recursive getitem (supports dotted key names).
+def _uses_serializable(field_type: FieldType) -> bool:
+    """Check if a type hint uses `Serializable` classes.
 
-    _rgetitem(a, "b.c") => a["b"]["c"]
+    The decoders and checkers of such types are not cached globally but only kept
+    by the plans of the classes with fields of that type: they capture the fields
+    of the `Serializable` classes, which must be freed and invalidated with them.
     """
-    v = obj
-    for k in keys.split("."):
-        v = operator.getitem(v, int(k) if k.isnumeric() else k)  # type: ignore[arg-type]
-    return v
+    return any(issubclass(cls, Serializable) for cls in _type_classes(field_type))
 
 
-@dataclass
-class Serializable:
-    """Gives serialization ability to any inheriting dataclass."""
+def _build_decoder(field_type: FieldType) -> Decoder:  # noqa: C901, PLR0911
+    """Build the decoder for `_compile_decoder`, following the dispatch order of `_deserialize`."""
+    if isinstance(field_type, str):
+        return functools.partial(_deserialize, field_type=field_type)
+    base_type = _drop_none_type(field_type)
+    if _is_dict(base_type):
+        return _deserialize_dict
+    if _is_list(base_type):
+        return _compile_list_decoder(base_type)
+    if _is_union_and_not_simple_optional(field_type):
+        return _compile_union_decoder(field_type)
+    if not _is_union(base_type) and isinstance(base_type, type) and issubclass(base_type, Serializable):
+        return base_type.deserialize_immutable
+    if _is_enum_type(base_type):
+        return _compile_enum_decoder(field_type, base_type)
+    if _is_ndarray_type(base_type):
+        return _compile_ndarray_decoder(field_type, base_type)
+    if base_type is Path:
+        return functools.partial(_deserialize_path, field_type=field_type)
+    if _is_primitive_type(base_type):
+        return _compile_primitive_decoder(field_type, base_type)
+    if _is_literal_type(field_type):
+        return _compile_literal_decoder(field_type)
+    return functools.partial(_deserialize, field_type=field_type)
 
-    def __post_init__(self) -> None:
-        """Validate contracts and check required arguments are specified."""
-        self._validate_contracts()
-        for key, value in self.__dict__.items():
-            if value is no_default:
-                msg = f"__init__ missing 1 required argument: '{key}'"
-                raise TypeError(msg)
 
-    def _validate_contracts(self) -> None:
-        """Validate contracts specified in the dataclass."""
-        dataclass_fields = fields(self)
+def _compile_list_decoder(field_type: FieldType, decode_item: Decoder | None = None) -> Decoder:
+    """Compile the decoder of a `list[_T]` type, decoding items with `decode_item` if given."""
+    field_args = typing.get_args(field_type)
+    if len(field_args) != 1 or isinstance(field_args[0], TypeVar):
+        return functools.partial(_deserialize_list, field_type=field_type)
+    if decode_item is None:
+        decode_item = _compile_decoder(field_args[0])
+
+    def decode_list(x: Any) -> list[Any]:
+        if not isinstance(x, list):
+            return _deserialize_list(x, field_type)
+        return [decode_item(xi) for xi in x]
 
-        for field in dataclass_fields:
-            value = getattr(self, field.name)
+    return decode_list
 
-            if value is None and not _is_optional_field(field.type):
-                msg = f"{field.name} is not optional"
+
+def _compile_union_decoder(field_type: UnionType, discriminator: str | None = None) -> Decoder:
+    """Compile the decoder of a Union type.
+
+    Dicts are decoded by the `Serializable` member selected by their discriminator
+    value, see `_union_tags()`. With an explicit `discriminator`, dicts with a
+    missing or unknown tag are rejected. Other values, and dicts without a known tag
+    of an inferred discriminator, are decoded by trying the members in order like
+    `_deserialize_union`, skipping the members rejected by `_union_member_filter()`.
+    """
+    members = typing.get_args(field_type)
+    decode_union = _compile_untagged_union_decoder(members)
+    union_tags = _union_tags(members, discriminator)
+    if union_tags is None:
+        return decode_union
+    key, tags = union_tags
+    strict = discriminator is not None
+
+    def decode_tagged_union(x: Any) -> Any:
+        if isinstance(x, dict):
+            try:
+                cls = tags.get(x.get(key))
+            except TypeError:
+                # unhashable tag
+                cls = None
+            if cls is not None:
+                return cls.deserialize_immutable(x)
+            if strict:
+                msg = f"Value `{x}` has no valid discriminator `{key}` for field type `{field_type}`"
                 raise TypeError(msg)
+        return decode_union(x)
 
-            contract = field.metadata.get("contract", None)
+    return decode_tagged_union
 
-            if contract is not None and value is not None and not contract(value):
-                msg = f"break the contract for {field.name}, {self.__class__.__name__}"
-                raise ValueError(msg)
 
-    def validate(self) -> None:
-        """Validate if object can serialize / deserialize correctly."""
-        self._validate_contracts()
-        if self != self.__class__().deserialize(json.loads(json.dumps(self.serialize()))):
-            msg = "could not be deserialized with same value"
-            raise ValueError(msg)
+def _compile_untagged_union_decoder(members: tuple[Any, ...]) -> Decoder:
+    """Compile a decoder trying the Union `members` in order, skipping those rejected by their filter."""
+    candidates = tuple((_compile_decoder(arg), _union_member_filter(arg)) for arg in members)
 
-    def to_dict(self) -> dict[str, Any]:
-        """Transform serializable object to dict."""
-        cls_fields = fields(self)
-        o = {}
-        for cls_field in cls_fields:
-            o[cls_field.name] = getattr(self, cls_field.name)
-        return o
+    def decode_union(x: Any) -> Any:
+        for decode, accepts in candidates:
+            if accepts is not None and not accepts(x):
+                continue
+            # stop after first matching type in Union
+            try:
+                return decode(x)
+            except (TypeError, ValueError):
+                pass
+        return x
 
-    def serialize(self) -> dict[str, Any]:
-        """Serialize object to be json serializable representation."""
-        if not is_dataclass(self):
-            msg = "need to be decorated as dataclass"
-            raise TypeError(msg)
+    return decode_union
 
-        dataclass_fields = fields(self)
 
-        o = {}
+# accepted typecodes of array fields, the first one is the default
+_ARRAY_TYPECODES: dict[type, tuple[str, ...]] = {float: ("d", "f"), int: tuple("qbBhHiIlLQ")}
 
-        for field in dataclass_fields:
-            value = getattr(self, field.name)
-            value = _serialize(value)
-            o[field.name] = value
-        return o
 
-    def deserialize(self, data: dict[str, Any]) -> Self:
-        """Parse input dictionary and deserialize its fields to a dataclass.
+def _compile_field_decoder(field: Field[Any]) -> Decoder:
+    """Return the decoder of a field, following the ``discriminator`` and ``array`` keys of its metadata.
 
-        Returns:
-            self: deserialized `self`.
-        """
-        if not isinstance(data, dict):
-            raise TypeError
-        data = data.copy()
-        init_kwargs = {}
-        for field in fields(self):
-            # if field.name == 'dataset_config':
-            if field.name not in data:
-                if field.name in vars(self):
-                    init_kwargs[field.name] = vars(self)[field.name]
-                    continue
-                msg = f' [!] Missing required field "{field.name}"'
-                raise ValueError(msg)
-            value = data.get(field.name, _default_value(field))
-            if value is None:
-                init_kwargs[field.name] = value
-                continue
-            if value == MISSING:
-                msg = f"deserialized with unknown value for {field.name} in {self.__class__.__name__}"
-                raise ValueError(msg)
-            try:
-                value = _deserialize(value, field.type)
-            except TypeError as e:
-                warnings.warn(
-                    (
-                        f"Type mismatch in {type(self).__name__}\n"
-                        f"Failed to deserialize field: {field.name} ({field.type}) = {value}\n"
-                        f"{e}\n"
-                        f"Replaced it with field's default value: {_default_value(field)}"
-                    ),
-                    stacklevel=2,
-                )
-                value = _default_value(field)
-            init_kwargs[field.name] = value
-        for k, v in init_kwargs.items():
-            setattr(self, k, v)
-        return self
+    ``field(metadata={"discriminator": "name"})`` is supported on Union fields, possibly
+    Optional, and on lists of them, see `_compile_union_decoder()`.
+    ``field(metadata={"array": True})`` is supported on `list[float]` and `list[int]`
+    fields, possibly Optional, see `_compile_array_decoder()`.
+    """
+    discriminator = field.metadata.get("discriminator")
+    if discriminator is not None:
+        return _compile_tagged_decoder(field.type, discriminator)
+    storage = field.metadata.get("array")
+    if storage:
+        return _compile_array_decoder(field.type, storage)
+    return _compile_decoder(field.type)
 
-    @classmethod
-    def deserialize_immutable(cls, data: dict[str, Any]) -> Self:
-        """Parse input dictionary and deserialize its fields to a dataclass.
 
-        Returns:
-            Newly created deserialized object.
-        """
-        if not isinstance(data, dict):
-            raise TypeError
-        data = data.copy()
-        init_kwargs = {}
-        for field in fields(cls):
-            # if field.name == 'dataset_config':
-            if field.name not in data:
-                if field.name in vars(cls):
-                    init_kwargs[field.name] = vars(cls)[field.name]
-                    continue
-                # if not in cls and the default value is not Missing use it
-                default_value = _default_value(field)
-                if default_value not in (MISSING, _MISSING):
-                    init_kwargs[field.name] = default_value
-                    continue
-                msg = f' [!] Missing required field "{field.name}"'
-                raise ValueError(msg)
-            value = data.get(field.name, _default_value(field))
-            if value is None:
-                init_kwargs[field.name] = value
-                continue
-            if value == MISSING:
-                msg = f"Deserialized with unknown value for {field.name} in {cls.__name__}"
-                raise ValueError(msg)
-            value = _deserialize(value, field.type)
-            init_kwargs[field.name] = value
-        return cls(**init_kwargs)
+def _has_type_decoder(field: Field[Any]) -> bool:
+    """Check if the decoder of a field is the one of its type, see `_compile_field_decoder()`."""
+    return field.metadata.get("discriminator") is None and not field.metadata.get("array")
 
 
-# ---------------------------------------------------------------------------- #
-#                        Argument Parsing from `argparse`                      #
-# ---------------------------------------------------------------------------- #
+def _compile_array_decoder(field_type: FieldType, storage: object) -> Decoder:
+    """Compile the decoder of a numeric list field stored as an `array.array`.
 
+    The list is converted in a single call, which also checks that the items are
+    numbers that fit in the typecode `storage`. Integer typecodes only accept ints.
+    With a `storage` of True, floats are stored as doubles (``"d"``) and ints as
+    64-bit integers (``"q"``). Arrays are serialized back to lists. Lists assigned
+    to array fields, including defaults, are converted as well.
+    """
+    base_type = field_type if isinstance(field_type, str) else _drop_none_type(field_type)
+    item_types = typing.get_args(base_type) if _is_list(base_type) else ()
+    if item_types not in ((float,), (int,)):
+        msg = f"Array storage is only supported for list[float] and list[int] fields, not `{field_type}`"
+        raise TypeError(msg)
+    typecodes = _ARRAY_TYPECODES[item_types[0]]
+    typecode = typecodes[0] if storage is True else storage
+    if not isinstance(typecode, str) or typecode not in typecodes:
+        msg = f"Array typecode {typecode!r} does not match field type `{field_type}`"
+        raise TypeError(msg)
 
-def _get_help(field: Field[Any]) -> str:
-    try:
-        return str(field.metadata["help"])
-    except KeyError:
-        return ""
+    def decode_array(x: Any) -> array.array[Any]:
+        if x.__class__ is array.array and x.typecode == typecode:
+            return x  # type: ignore[no-any-return]
+        try:
+            return array.array(typecode, x)
+        except (TypeError, OverflowError) as e:
+            msg = f"Value `{x}` does not match field type `{field_type}`: {e}"
+            raise TypeError(msg) from e
 
+    return decode_array
 
-def _add_argument(  # noqa: C901, PLR0913, PLR0912, PLR0915
-    parser: argparse.ArgumentParser,
-    field_name: str,
-    field_type: FieldType,
-    field_default: Any,
-    field_default_factory: Callable[[], Any] | Literal[_MISSING_TYPE.MISSING],
-    field_help: str,
-    arg_prefix: str = "",
-    help_prefix: str = "",
-    *,
-    relaxed_parser: bool = False,
-) -> argparse.ArgumentParser:
-    """Add a new argument to the argparse parser, matching the given field."""
-    if isinstance(field_type, str):
-        msg = "Strings as type hints are not supported."
-        raise NotImplementedError(msg)
-    default = None
-    has_default = False
-    if field_default:
-        has_default = True
-        default = field_default
-    elif field_default_factory is not None and field_default_factory is not _MISSING:
-        has_default = True
-        default = field_default_factory()
 
-    if (
-        not has_default
-        and not _is_primitive_type(_drop_none_type(field_type))
-        and not _is_list(_drop_none_type(field_type))
-        and _parse_list_union(_drop_none_type(field_type)) is None
-    ):
-        # aggregate types (fields with a Coqpit subclass as type) are not
-        # supported without None
-        return parser
-    arg_prefix = field_name if arg_prefix == "" else f"{arg_prefix}.{field_name}"
-    help_prefix = field_help if help_prefix == "" else f"{help_prefix} - {field_help}"
-    if _is_dict(field_type):
-        # NOTE: accept any string in json format as input to dict field.
-        parser.add_argument(
-            f"--{arg_prefix}",
-            dest=arg_prefix,
-            default=json.dumps(field_default) if field_default else None,
-            type=json.loads,
-        )
-    elif _is_list(_drop_none_type(field_type)):
-        field_args = typing.get_args(_drop_none_type(field_type))
-        if len(field_args) > 1 and not relaxed_parser:
-            msg = "Coqpit does not support multi-type hinted 'List'"
-            raise ValueError(msg)
-        if len(field_args) == 0:
-            msg = "Coqpit does not support un-hinted 'List'"
+def _compile_tagged_decoder(field_type: FieldType, discriminator: str) -> Decoder:
+    """Compile the decoder of a Union type, or of a list of them, with an explicit discriminator."""
+    base_type = field_type if isinstance(field_type, str) else _drop_none_type(field_type)
+    if _is_list(base_type):
+        item_types = typing.get_args(base_type)
+        if len(item_types) == 1:
+            return _compile_list_decoder(base_type, _compile_tagged_decoder(item_types[0], discriminator))
+    elif _is_union(base_type) and _is_union(field_type):
+        return _compile_union_decoder(field_type, discriminator)
+    msg = f"Discriminator `{discriminator}` is only supported for Union fields, not `{field_type}`"
+    raise TypeError(msg)
+
+
+def _union_tags(
+    members: tuple[Any, ...],
+    discriminator: str | None,
+) -> tuple[str, dict[Any, type[Serializable]]] | None:
+    """Return the discriminator of a Union and the member class of each of its values.
+
+    With an explicit `discriminator`, every `Serializable` member must have a field
+    of that name, whose Literal values or default value are the tags of the member.
+    Otherwise, the discriminator is inferred when all the members but None are
+    `Serializable` and have a Literal field of the same name with distinct values.
+    Returns None if the Union has no discriminator.
+
+    Raises:
+        ValueError: if an explicit discriminator is missing from a member or its tags overlap.
+    """
+    classes = [arg for arg in members if isinstance(arg, type) and issubclass(arg, Serializable)]
+    if discriminator is not None:
+        member_tags = [_explicit_tags(cls, discriminator) for cls in classes]
+        tags = _tag_map(classes, member_tags)
+        if tags is None:
+            msg = f"Discriminator `{discriminator}` has the same value for several members of {members}"
             raise ValueError(msg)
-        list_field_type = field_args[0]
+        return discriminator, tags
+    if len(classes) < 2 or len(classes) != len([arg for arg in members if arg is not type(None)]):  # noqa: PLR2004
+        return None
+    literal_fields = [_literal_fields(cls) for cls in classes]
+    for name in literal_fields[0]:
+        if all(name in fields_ for fields_ in literal_fields):
+            tags = _tag_map(classes, [fields_[name] for fields_ in literal_fields])
+            if tags is not None:
+                return name, tags
+    return None
+
+
+def _explicit_tags(cls: type, discriminator: str) -> tuple[Any, ...]:
+    """Return the values of the `discriminator` field of `cls`: its Literal values or its default."""
+    for field in fields(cls):
+        if field.name != discriminator:
+            continue
+        if not isinstance(field.type, str) and _is_literal_type(field.type):
+            return typing.get_args(field.type)
+        if field.default is not _MISSING:
+            return (field.default,)
+        break
+    msg = f"{cls.__name__} has no Literal field or field with a default for discriminator `{discriminator}`"
+    raise ValueError(msg)
+
+
+def _tag_map(
+    classes: list[type[Serializable]],
+    member_tags: list[tuple[Any, ...]],
+) -> dict[Any, type[Serializable]] | None:
+    """Map each tag to its class, return None if the tags of different classes overlap or are unhashable."""
+    tags: dict[Any, type[Serializable]] = {}
+    try:
+        for cls, values in zip(classes, member_tags, strict=True):
+            for value in values:
+                if tags.setdefault(value, cls) is not cls:
+                    return None
+    except TypeError:
+        return None
+    return tags
 
-        # TODO: handle list of lists
-        if _is_list(list_field_type) and relaxed_parser:
-            return parser
 
-        if not has_default or default == []:
-            if not _is_primitive_type(list_field_type) and not relaxed_parser:
-                msg = " [!] Empty list with non primitive inner type is currently not supported."
-                raise NotImplementedError(msg)
+def _literal_fields(cls: type) -> dict[str, tuple[Any, ...]]:
+    """Return the values of the Literal fields of the dataclass `cls`, by field name."""
+    return {name: typing.get_args(field_type) for name, field_type in _literal_field_types(cls).items()}
 
-            # If the list's default value is None, the user can specify the entire list by passing multiple parameters
-            parser.add_argument(
-                f"--{arg_prefix}",
-                nargs="*",
-                default=default,
-                type=list_field_type,
-                help=f"Coqpit Field: {help_prefix}",
-            )
-        else:
-            # If a default value is defined, just enable editing the values from argparse
-            # TODO: allow inserting a new value/obj to the end of the list.
-            if not isinstance(default, list):
-                msg = f"Default value must be a list, got {default}"
-                raise TypeError(msg)
-            for idx, fv in enumerate(default):
-                parser = _add_argument(
+
+def _literal_field_types(cls: type) -> dict[str, Any]:
+    """Return the Literal types of the fields of the dataclass `cls`, by field name."""
+    return {
+        field.name: field.type
+        for field in fields(cls)
+        if not isinstance(field.type, str) and _is_literal_type(field.type)
+    }
+
+
+def _is_infinite(x: Any) -> bool:
+    """Check if `x` is an infinite float, which `_deserialize_primitive_types` accepts for all types."""
+    return isinstance(x, float) and math.isinf(x)
+
+
+_PRIMITIVE_MEMBER_FILTERS: dict[type, Callable[[Any], bool]] = {
+    str: lambda x: isinstance(x, str) or _is_infinite(x),
+    bool: lambda x: isinstance(x, bool) or _is_infinite(x),
+    int: lambda x: isinstance(x, int | float) and not isinstance(x, bool),
+    float: lambda x: isinstance(x, int | float) and not isinstance(x, bool),
+}
+
+
+def _union_member_filter(member: Any) -> Callable[[Any], bool] | None:  # noqa: PLR0911
+    """Return a cheap test of the values that the decoder of a Union member may accept.
+
+    The test never rejects a value that the decoder would accept, so that skipping
+    the rejected members does not change the result of `_compile_union_decoder()`.
+    Returns None if there is no such test.
+    """
+    if isinstance(member, str) or _is_union(member):
+        return None
+    if member is type(None):
+        # None is not decoded, see `_deserialize()`
+        return lambda _: False
+    if _is_dict(member):
+        return lambda x: isinstance(x, dict)
+    if _is_list(member):
+        return lambda x: isinstance(x, list)
+    if _is_literal_type(member):
+        values = _literal_lookup(member)
+        return lambda x: _in_lookup(values, x)
+    if member in _PRIMITIVE_MEMBER_FILTERS:
+        return _PRIMITIVE_MEMBER_FILTERS[member]
+    if member is Path:
+        return lambda x: isinstance(x, str | os.PathLike)
+    if isinstance(member, type) and issubclass(member, Serializable):
+        return _serializable_member_filter(member)
+    return None
+
+
+def _serializable_member_filter(cls: type) -> Callable[[Any], bool]:
+    """Return a test rejecting dicts without the required fields of `cls` or with invalid Literal values."""
+    required = frozenset(
+        field.name
+        for field in fields(cls)
+        if field.default is _MISSING and field.default_factory is _MISSING and not _class_attribute(cls, field.name)[0]
+    )
+    literals = tuple((name, _literal_lookup(field_type)) for name, field_type in _literal_field_types(cls).items())
+
+    def accepts(x: Any) -> bool:
+        if not isinstance(x, dict) or not x.keys() >= required:
+            return False
+        for name, values in literals:
+            value = x.get(name)
+            if value is not None and not _in_lookup(values, value):
+                return False
+        return True
+
+    return accepts
+
+
+def _compile_primitive_decoder(field_type: FieldType, base_type: type) -> Decoder:
+    """Compile the decoder of a primitive type, possibly Optional.
+
+    Values that already have the exact expected type are returned directly, anything
+    else goes through `_deserialize_primitive_types`.
+    """
+    is_optional = _is_optional_field(field_type)
+
+    def decode_primitive(x: Any) -> Any:
+        if x.__class__ is base_type or (x is None and is_optional):
+            return x
+        return _deserialize_primitive_types(x, field_type)
+
+    return decode_primitive
+
+
+def _compile_literal_decoder(field_type: FieldType) -> Decoder:
+    """Compile the decoder of a typing.Literal type, looking values up in a set."""
+    values = _literal_lookup(field_type)
+
+    def decode_literal(x: Any) -> Any:
+        if _in_lookup(values, x):
+            return x
+        return _deserialize_literal(x, field_type)
+
+    return decode_literal
+
+
+def _compile_enum_decoder(field_type: FieldType, enum_type: type[enum.Enum]) -> Decoder:
+    """Compile the decoder of an `enum.Enum` type, possibly Optional.
+
+    Members are serialized as their value. They are looked up by value first, then by
+    name, in dicts built once per type.
+    """
+    is_optional = _is_optional_field(field_type)
+    by_value: dict[Any, enum.Enum] = {}
+    for member in enum_type:
+        with contextlib.suppress(TypeError):
+            by_value.setdefault(member.value, member)
+    by_name = dict(enum_type.__members__)
+
+    def decode_enum(x: Any) -> Any:
+        if x.__class__ is enum_type or (x is None and is_optional):
+            return x
+        try:
+            if x in by_value:
+                return by_value[x]
+            if x in by_name:
+                return by_name[x]
+        except TypeError:
+            # unhashable value
+            pass
+        msg = f"Value `{x}` is not a value or name of `{enum_type.__name__}`"
+        raise TypeError(msg)
+
+    return decode_enum
+
+
+def _compile_ndarray_decoder(field_type: FieldType, base_type: FieldType) -> Decoder:
+    """Compile the decoder of a NumPy array type.
+
+    Nested lists are converted with a single `numpy.asarray()` call and the raw bytes
+    written by `_serialize_ndarray()` are decoded without per-item work. Arrays are
+    kept as they are. Values are converted to the dtype of a ``numpy.typing.NDArray``
+    type if it is concrete, e.g. ``NDArray[np.float32]``.
+    """
+    numpy = sys.modules["numpy"]
+    dtype = _ndarray_dtype(base_type)
+
+    def decode_ndarray(x: Any) -> Any:
+        try:
+            if x.__class__ is dict:
+                data = bytearray(base64.b64decode(x["base64"], validate=True))
+                x = numpy.frombuffer(data, dtype=x["dtype"]).reshape(x["shape"])
+            return numpy.asarray(x, dtype=dtype)
+        except (KeyError, TypeError, ValueError) as e:
+            msg = f"Value `{x}` does not match field type `{field_type}`: {e}"
+            raise TypeError(msg) from e
+
+    return decode_ndarray
+
+
+def _ndarray_dtype(field_type: FieldType) -> Any:
+    """Return the dtype of a ``numpy.typing.NDArray[...]`` type, None if it is not a concrete scalar type."""
+    numpy = sys.modules["numpy"]
+    args = typing.get_args(field_type)
+    scalar_types = typing.get_args(args[1]) if len(args) == 2 else ()  # noqa: PLR2004
+    if len(scalar_types) != 1 or scalar_types[0] not in numpy.sctypeDict.values():
+        return None
+    return numpy.dtype(scalar_types[0])
+
+
+@dataclass(frozen=True)
+class _FieldPlan:
+    """Precomputed deserialization information for a single dataclass field."""
+
+    name: str
+    field: Field[Any]
+    decode: Decoder
+    has_class_value: bool
+    class_value: Any
+    # for fields that can be deserialized lazily: type of the serialized value and its decoder
+    lazy_type: type | None = None
+    lazy_decode: Decoder | None = None
+
+    def lazy_value(self, cls: type, value: Any) -> _LazyValue | None:
+        """Wrap `value` for lazy deserialization, return None if it must be deserialized now."""
+        if self.lazy_type is None or not isinstance(value, self.lazy_type):
+            return None
+        return _LazyValue(value, cls, self.name)
+
+
+class _ClassPlan:
+    """Per-class information derived from the dataclass fields.
+
+    It is built the first time a class is (de)serialized and reused afterwards,
+    see `_class_plan()`. Parts that are not needed by every code path are only
+    computed on first access.
+    """
+
+    def __init__(self, cls: type) -> None:
+        self.cls = cls
+        self.fields = fields(cls)
+
+    @functools.cached_property
+    def field_plans(self) -> tuple[_FieldPlan, ...]:
+        """Decoders and class-level values of all fields."""
+        plans = []
+        for field in self.fields:
+            has_class_value, class_value = _class_attribute(self.cls, field.name)
+            plans.append(
+                _FieldPlan(
+                    field.name,
+                    field,
+                    _compile_field_decoder(field),
+                    has_class_value,
+                    class_value,
+                    *_compile_lazy_decoder(field.type),
+                ),
+            )
+        return tuple(plans)
+
+    @functools.cached_property
+    def field_plans_by_name(self) -> dict[str, _FieldPlan]:
+        """Field plans, by field name."""
+        return {field_plan.name: field_plan for field_plan in self.field_plans}
+
+    @functools.cached_property
+    def array_decoders(self) -> dict[str, Decoder]:
+        """Decoders of the fields stored as `array.array`, by field name, see `_compile_array_decoder()`."""
+        return {plan.name: plan.decode for plan in self.field_plans if plan.field.metadata.get("array")}
+
+    @functools.cached_property
+    def names(self) -> tuple[str, ...]:
+        """Names of all fields, in definition order."""
+        return tuple(field.name for field in self.fields)
+
+    @functools.cached_property
+    def field_names(self) -> frozenset[str]:
+        """Names of all fields, for membership tests."""
+        return frozenset(self.names)
+
+    @functools.cached_property
+    def schema_fingerprint(self) -> str:
+        """Hash of the fields and field types of the class, see `_schema_fingerprint()`."""
+        return _schema_fingerprint(self.cls)
+
+    @functools.cached_property
+    def fingerprint_names(self) -> tuple[str, ...]:
+        """Names of the fields included in ``Coqpit.fingerprint()``, sorted."""
+        return tuple(sorted(field.name for field in self.fields if field.metadata.get("fingerprint", True)))
+
+    @functools.cached_property
+    def has_constraints(self) -> bool:
+        """Whether any field declares constraints, see `_build_constraint_checker()`."""
+        return any(key in field.metadata for field in self.fields for key in _CONSTRAINT_KEYS)
+
+    @functools.cached_property
+    def constraint_checker(self) -> Callable[[Any, str, list[str], bool], None]:
+        """Constraint checking function of the class, see `_build_constraint_checker()`."""
+        return _build_constraint_checker(self.cls, self.fields)
+
+    @functools.cached_property
+    def contract_checks(self) -> tuple[tuple[str, bool, Callable[[Any], bool] | None], ...]:
+        """Fields checked by ``Serializable._validate_contracts()``, see `_contract_checks()`."""
+        return _contract_checks(self.fields)
+
+    @functools.cached_property
+    def roundtrip_checkers(self) -> tuple[tuple[str, RoundTripChecker], ...]:
+        """Compared fields and their checkers for ``Serializable.validate(single_pass=True)``."""
+        return tuple(
+            (
+                plan.name,
+                # the decoder of fields with a discriminator or array storage is not the one of their type
+                _compile_roundtrip_checker(plan.field.type)
+                if _has_type_decoder(plan.field)
+                else _decoded_roundtrip_checker(plan.decode),
+            )
+            for plan in self.field_plans
+            if plan.field.compare
+        )
+
+    @functools.cached_property
+    def frozen_class(self) -> type[FrozenCoqpit]:
+        """Frozen twin of the class, see `_frozen_class()`."""
+        return _frozen_class(self.cls)
+
+    @functools.cached_property
+    def argparse_templates(self) -> dict[Any, _ArgparseTemplate]:
+        """Parsers built by ``Coqpit.init_argparse()``, see `_ArgparseTemplate`."""
+        return {}
+
+    @functools.cached_property
+    def cli_overrides(self) -> dict[str, _CliOverride]:
+        """Overridable fields by dotted path, see `_build_cli_override_index()`."""
+        return _build_cli_override_index(self.cls)
+
+    @functools.cached_property
+    def serializer(self) -> Callable[[Any], dict[str, Any]]:
+        """Serialization function of the class, see `_build_serializer()`."""
+        return _build_serializer(self.cls, self.fields)
+
+
+def _contract_checks(
+    dataclass_fields: tuple[Field[Any], ...],
+) -> tuple[tuple[str, bool, Callable[[Any], bool] | None], ...]:
+    """Return ``(name, optional, contract)`` for the fields that need a check at construction.
+
+    Fields that accept None and have no ``contract`` in their metadata are left
+    out, so most of the work of `Serializable.__post_init__()` is done once per class.
+    """
+    checks = []
+    for field in dataclass_fields:
+        optional = _is_optional_field(field.type)
+        contract = field.metadata.get("contract", None)
+        if not optional or contract is not None:
+            checks.append((field.name, optional, contract))
+    return tuple(checks)
+
+
+def _compile_lazy_decoder(field_type: FieldType) -> tuple[type | None, Decoder | None]:  # noqa: PLR0911
+    """Return the serialized type and decoder of fields that can be deserialized lazily.
+
+    These are fields holding a nested `Serializable` or a list of them. Nested Coqpits
+    are deserialized lazily as well. Returns ``(None, None)`` for all other fields.
+    """
+    if isinstance(field_type, str):
+        return None, None
+    base_type = _drop_none_type(field_type)
+    if _is_list(base_type):
+        item_types = typing.get_args(base_type)
+        if len(item_types) == 1 and isinstance(item_types[0], type) and issubclass(item_types[0], Serializable):
+            return list, _compile_decoder(base_type)
+        return None, None
+    if _is_union(base_type) or not isinstance(base_type, type):
+        return None, None
+    if issubclass(base_type, Coqpit):
+        return dict, functools.partial(base_type.deserialize_immutable, lazy=True)
+    if issubclass(base_type, Serializable):
+        return dict, base_type.deserialize_immutable
+    return None, None
+
+
+def _holds_only_primitives(field_type: FieldType) -> bool:
+    """Check if values of the given type are always `int, float, str, bool` or None."""
+    if _is_union(field_type):
+        return all(arg is type(None) or _holds_only_primitives(arg) for arg in typing.get_args(field_type))
+    if _is_literal_type(field_type):
+        return all(value.__class__ in _PRIMITIVE_VALUE_TYPES for value in typing.get_args(field_type))
+    return _is_primitive_type(field_type)
+
+
+def _build_serializer(cls: type, dataclass_fields: tuple[Field[Any], ...]) -> Callable[[Any], dict[str, Any]]:
+    """Generate the serialization function of a dataclass.
+
+    Like the methods generated by `dataclasses`, the function is specialised to the
+    fields of the class: values of fields annotated with primitive types are copied
+    directly, as long as they actually are primitives, and only the other fields go
+    through `_serialize()`.
+    """
+    lines = ["def serialize(obj):"]
+    if issubclass(cls, Coqpit):
+        lines.append(f"    deferred = obj.__dict__.get({_DEFERRED_FIELDS_KEY!r})")
+        lines.append("    if deferred:")
+        lines.append("        return _serialize_with_deferred(obj, deferred)")
+    items = []
+    for idx, field in enumerate(dataclass_fields):
+        lines.append(f"    v{idx} = obj.{field.name}")
+        if _holds_only_primitives(field.type):
+            items.append(f"{field.name!r}: v{idx} if v{idx}.__class__ in primitives else _serialize(v{idx})")
+        else:
+            items.append(f"{field.name!r}: _serialize(v{idx})")
+    lines.append(f"    return {{{', '.join(items)}}}")
+    namespace: dict[str, Any] = {
+        "_serialize": _serialize,
+        "_serialize_with_deferred": _serialize_with_deferred,
+        "primitives": _PRIMITIVE_VALUE_TYPES,
+    }
+    exec("\n".join(lines), namespace)  # noqa: S102
+    serialize: Callable[[Any], dict[str, Any]] = namespace["serialize"]
+    serialize.__qualname__ = f"{cls.__qualname__}.serialize"
+    return serialize
+
+
+# field metadata keys declaring constraints, named like the `check_argument()` arguments
+_CONSTRAINT_KEYS = (
+    "min_val",
+    "max_val",
+    "enum_list",
+    "is_path",
+    "prerequest",
+    "alternative",
+    "allow_none",
+    "restricted",
+)
+
+
+def _may_hold_coqpit(field_type: FieldType) -> bool:
+    """Check if values of the given type may be or contain a Coqpit."""
+    if field_type is Any or isinstance(field_type, str | TypeVar):
+        return True
+    if _is_literal_type(field_type):
+        return False
+    args = typing.get_args(field_type)
+    if args:
+        return any(_may_hold_coqpit(arg) for arg in args if arg is not Ellipsis)
+    if isinstance(field_type, type):
+        return issubclass(field_type, Coqpit | list | dict | tuple)
+    return True
+
+
+def _build_constraint_checker(
+    cls: type,
+    dataclass_fields: tuple[Field[Any], ...],
+) -> Callable[[Any, str, list[str], bool], None]:
+    """Generate the function checking the constraints declared in the metadata of the fields.
+
+    The constraints have the names of the ``check_argument()`` arguments, e.g.
+    ``field(default=1, metadata={"min_val": 0, "max_val": 10})``. The function is
+    called as ``check(obj, prefix, errors, recursive)`` and appends a message to
+    `errors` for every violation, with field names prefixed by `prefix`. Fields that
+    are not set yet, i.e. MISSING or lazy, are skipped. With `recursive`, MISSING
+    fields declared ``restricted`` are reported and nested Coqpits are checked too.
+    """
+    lines = ["def check(obj, prefix, errors, recursive):", "    values = obj.__dict__"]
+    namespace: dict[str, Any] = {
+        "Path": Path,
+        "_MISSING": _MISSING,
+        "_check_nested_constraints": _check_nested_constraints,
+        "_field_is_set": _field_is_set,
+        "_missing_fields": _missing_fields,
+    }
+    for idx, field in enumerate(dataclass_fields):
+        name = field.name
+        meta = field.metadata
+        v = f"v{idx}"
+        lines.append(f"    {v} = values.get({name!r}, _MISSING)")
+        value_checks = _value_constraint_checks(idx, field, namespace)
+        if value_checks:
+            lines.append(f"    if {v} is not None and {v} is not _MISSING:")
+            lines.extend(f"        {line}" for line in value_checks)
+        if not meta.get("allow_none", True):
+            lines.append(f"    if {v} is None:")
+            lines.append(f"        errors.append(f' [!] None value is not allowed for {{prefix}}{name}.')")
+        if meta.get("restricted"):
+            lines.append(f"    if recursive and {v} is _MISSING and {name!r} in _missing_fields(obj):")
+            lines.append(f"        errors.append(f' [!] MISSING field {{prefix}}{name} must be defined.')")
+        if _may_hold_coqpit(field.type):
+            lines.append(f"    if recursive and {v} is not _MISSING:")
+            lines.append(f"        _check_nested_constraints({v}, f'{{prefix}}{name}', errors)")
+    exec("\n".join(lines), namespace)  # noqa: S102
+    check: Callable[[Any, str, list[str], bool], None] = namespace["check"]
+    check.__qualname__ = f"{cls.__qualname__}.check_constraints"
+    return check
+
+
+def _value_constraint_checks(idx: int, field: Field[Any], namespace: dict[str, Any]) -> list[str]:
+    """Return the lines checking the value ``v{idx}`` of a field, when it is neither None nor MISSING."""
+    name = field.name
+    meta = field.metadata
+    v = f"v{idx}"
+    value_checks = []
+    if "min_val" in meta:
+        namespace[f"min_val{idx}"] = meta["min_val"]
+        value_checks += [
+            f"if {v} < min_val{idx}:",
+            f"    errors.append(f' [!] {{prefix}}{name} is smaller than min value {{min_val{idx}}}')",
+        ]
+    if "max_val" in meta:
+        namespace[f"max_val{idx}"] = meta["max_val"]
+        value_checks += [
+            f"if {v} > max_val{idx}:",
+            f"    errors.append(f' [!] {{prefix}}{name} is larger than max value {{max_val{idx}}}')",
+        ]
+    if "enum_list" in meta:
+        namespace[f"enum_list{idx}"] = frozenset(x.lower() if x.__class__ is str else x for x in meta["enum_list"])
+        value_checks += [
+            f"if ({v}.lower() if {v}.__class__ is str else {v}) not in enum_list{idx}:",
+            f"    errors.append(f' [!] {{prefix}}{name} is not a valid value: {{{v}!r}}')",
+        ]
+    if meta.get("alternative") and value_checks:
+        # the value constraints do not apply if the alternative field is set
+        value_checks = [f"if not _field_is_set(obj, {meta['alternative']!r}):"] + [
+            f"    {line}" for line in value_checks
+        ]
+    if meta.get("is_path"):
+        value_checks += [
+            f"if not Path({v}).exists():",
+            f"    errors.append(f' [!] path for {{prefix}}{name} (\"{{{v}}}\") does not exist.')",
+        ]
+    prerequest = meta.get("prerequest")
+    for other in [prerequest] if isinstance(prerequest, str) else prerequest or []:
+        value_checks += [
+            f"if not _field_is_set(obj, {other!r}):",
+            f"    errors.append(f' [!] prerequested field {{prefix}}{other} for {{prefix}}{name} is not defined.')",
+        ]
+    return value_checks
+
+
+def _check_nested_constraints(x: Any, path: str, errors: list[str]) -> None:
+    """Check the constraints of the Coqpits in `x`, see `_build_constraint_checker()`."""
+    if isinstance(x, Coqpit):
+        _class_plan(type(x)).constraint_checker(x, f"{path}.", errors, True)  # noqa: FBT003
+    elif isinstance(x, list | tuple):
+        for idx, xi in enumerate(x):
+            if xi.__class__ not in _PRIMITIVE_VALUE_TYPES:
+                _check_nested_constraints(xi, f"{path}.{idx}", errors)
+    elif isinstance(x, dict):
+        for key, value in x.items():
+            if value.__class__ not in _PRIMITIVE_VALUE_TYPES:
+                _check_nested_constraints(value, f"{path}.{key}", errors)
+
+
+def _field_is_set(obj: object, name: str) -> bool:
+    """Check if the field `name` of `obj` is neither None nor MISSING."""
+    value = vars(obj).get(name, _MISSING)
+    if value is _MISSING:
+        return _deferred_fields(obj).get(name, MISSING).__class__ is not str
+    return value is not None
+
+
+def _raise_constraint_errors(errors: list[str]) -> None:
+    """Raise a single error reporting all the constraint violations."""
+    if errors:
+        raise ValueError("\n".join(errors))
+
+
+# Plans refer to their class, so they are stored on the class itself to be freed with it.
+_PLAN_ATTRIBUTE = "_coqpit_plan"
+_PLANNED_CLASSES: weakref.WeakSet[type] = weakref.WeakSet()
+
+
+def _class_plan(cls: type) -> _ClassPlan:
+    """Return the plan of the given dataclass, building it on first use."""
+    plan: _ClassPlan | None = cls.__dict__.get(_PLAN_ATTRIBUTE)
+    if plan is None:
+        plan = _ClassPlan(cls)
+        setattr(cls, _PLAN_ATTRIBUTE, plan)
+        _PLANNED_CLASSES.add(cls)
+        if issubclass(cls, Coqpit):
+            _use_fields_equal(cls)
+    return plan
+
+
+def _drop_plan(cls: type) -> None:
+    """Drop the plan of `cls` and the ones of the classes using it in their fields, which may depend on it."""
+    if _PLAN_ATTRIBUTE in cls.__dict__:
+        delattr(cls, _PLAN_ATTRIBUTE)
+    _PLANNED_CLASSES.discard(cls)
+    for other in list(_PLANNED_CLASSES):
+        if any(cls in _type_classes(field.type) for field in _class_plan(other).fields):
+            _drop_plan(other)
+
+
+# ---------------------------------------------------------------------------- #
+#                                Deferred fields                               #
+# ---------------------------------------------------------------------------- #
+
+# Key in the instance `__dict__` of the fields that are not stored as attributes,
+# mapping their names to MISSING, a `_LazyValue` or a `_SharedValue`.
+_DEFERRED_FIELDS_KEY = "_coqpit_deferred"
+
+
+class _LazyValue:
+    """Serialized value of a field, deserialized the first time the field is read."""
+
+    __slots__ = ("cls", "name", "raw")
+
+    def __init__(self, raw: Any, cls: type, name: str) -> None:
+        self.raw = raw
+        # the decoder is looked up from the class, so that lazy values can be pickled
+        self.cls = cls
+        self.name = name
+
+    def decode(self) -> Any:
+        """Deserialize the value."""
+        decode = _class_plan(self.cls).field_plans_by_name[self.name].lazy_decode
+        if decode is None:
+            raise TypeError
+        return decode(self.raw)
+
+
+class _SharedValue:
+    """Value of a field shared by copy-on-write copies, see ``Coqpit.copy()``.
+
+    Reading the field stores a copy-on-write clone of the value in the Coqpit it
+    is read from, except for the last Coqpit sharing it, which takes the value
+    itself. The Coqpit the value was copied from keeps it and counts as an owner
+    that never reads it.
+    """
+
+    __slots__ = ("owners", "value")
+
+    def __init__(self, value: Any, owners: int) -> None:
+        self.value = value
+        # number of Coqpits sharing the value, including the one it was copied from
+        self.owners = owners
+
+
+class _FieldGuard:
+    """Class attribute handling reads of fields that are not in the instance `__dict__`.
+
+    Fields set to MISSING and fields whose deserialization is deferred are removed
+    from the instance `__dict__`, so that reading them falls back to the class
+    attribute, i.e. this guard. It raises for MISSING fields, deserializes lazy
+    ones and clones shared ones. Reading any other field is a plain instance attribute lookup without any
+    extra check. The guard behaves like the class attribute it replaces in all
+    other cases.
+    """
+
+    def __init__(self, cls: type, name: str) -> None:
+        self.name = name
+        self.has_own_value, self.own_value = _class_attribute(cls, name)
+        self.value: Any = _MISSING
+        for klass in cls.__mro__:
+            found, value = _class_attribute(klass, name)
+            if found:
+                self.value = value
+                break
+
+    def __get__(self, instance: object, owner: type | None = None) -> Any:
+        if instance is not None:
+            deferred = vars(instance).get(_DEFERRED_FIELDS_KEY)
+            if deferred is not None and self.name in deferred:
+                value = deferred[self.name]
+                if value.__class__ is _LazyValue:
+                    return _materialize(instance, self.name, value)
+                if value.__class__ is _SharedValue:
+                    return _unshare(instance, self.name, value)
+                msg = f" [!] MISSING field {self.name} must be defined."
+                raise AttributeError(msg)
+        if self.value is _MISSING:
+            owner_name = type(instance).__name__ if owner is None else owner.__name__
+            msg = f"'{owner_name}' object has no attribute '{self.name}'"
+            raise AttributeError(msg)
+        return self.value
+
+
+def _class_attribute(cls: type, name: str) -> tuple[bool, Any]:
+    """Return whether `name` is in `vars(cls)` and its value, looking through field guards."""
+    value = vars(cls).get(name, _MISSING)
+    if isinstance(value, _FieldGuard):
+        return value.has_own_value, value.own_value
+    return value is not _MISSING, value
+
+
+def _deferred_fields(obj: object) -> dict[str, Any]:
+    """Return the deferred fields of `obj`, mapped to MISSING, a `_LazyValue` or a `_SharedValue`."""
+    deferred: dict[str, Any] = vars(obj).get(_DEFERRED_FIELDS_KEY, {})
+    return deferred
+
+
+def _missing_fields(obj: object) -> list[str]:
+    """Return the names of the fields of `obj` that are set to MISSING."""
+    return [name for name, value in _deferred_fields(obj).items() if value.__class__ is str]
+
+
+def _raw_vars(obj: object) -> dict[str, Any]:
+    """Return `vars(obj)` as if deferred fields were stored like any other value.
+
+    Fields set to MISSING are included as MISSING, lazy fields are deserialized and
+    shared fields cloned.
+    For classes, field guards are replaced by the class attribute they shadow.
+    """
+    if isinstance(obj, type):
+        class_vars = {}
+        for name in vars(obj):
+            found, value = _class_attribute(obj, name)
+            if found:
+                class_vars[name] = value
+        return class_vars
+    deferred = _deferred_fields(obj)
+    if not deferred:
+        return vars(obj)
+    values = dict(vars(obj))
+    for name, value in list(deferred.items()):
+        values[name] = MISSING if value.__class__ is str else getattr(obj, name)
+    return values
+
+
+def _install_field_guard(cls: type, name: str) -> None:
+    """Make sure that reading the field `name` of `cls` instances handles deferred values."""
+    if not isinstance(vars(cls).get(name), _FieldGuard):
+        setattr(cls, name, _FieldGuard(cls, name))
+
+
+def _defer(obj: object, name: str, value: Any) -> None:
+    """Set the field `name` of `obj` to MISSING, a `_LazyValue` or a `_SharedValue`."""
+    _install_field_guard(type(obj), name)
+    instance_vars = vars(obj)
+    instance_vars.pop(name, None)
+    instance_vars.setdefault(_DEFERRED_FIELDS_KEY, {})[name] = value
+
+
+def _materialize(obj: object, name: str, value: _LazyValue) -> Any:
+    """Deserialize the lazy field `name` of `obj` and store the result.
+
+    Threads reading the field at the same time may all deserialize it, the first
+    stored result is kept.
+    """
+    decoded = value.decode()
+    instance_vars = vars(obj)
+    decoded = instance_vars.setdefault(name, decoded)
+    instance_vars[_DEFERRED_FIELDS_KEY].pop(name, None)
+    return decoded
+
+
+def _materialize_all(x: Any) -> None:
+    """Deserialize the lazy fields of `x` and of the Coqpits nested in its values, see ``Coqpit.materialize()``."""
+    if isinstance(x, Coqpit):
+        for name, value in list(_deferred_fields(x).items()):
+            if value.__class__ is _LazyValue:
+                _materialize(x, name, value)
+        instance_vars = vars(x)
+        deferred = _deferred_fields(x)
+        for name in _class_plan(type(x)).names:
+            shared = deferred.get(name)
+            _materialize_all(shared.value if isinstance(shared, _SharedValue) else instance_vars.get(name))
+    elif x.__class__ is list or x.__class__ is tuple:
+        for xi in x:
+            _materialize_all(xi)
+    elif x.__class__ is dict:
+        for xi in x.values():
+            _materialize_all(xi)
+
+
+def _unshare(obj: object, name: str, value: _SharedValue) -> Any:
+    """Store a clone of the shared field `name` of `obj`, or the value itself if no other Coqpit shares it."""
+    value.owners -= 1
+    unshared = value.value if value.owners <= 0 else _clone_shared(value.value)
+    instance_vars = vars(obj)
+    instance_vars[name] = unshared
+    del instance_vars[_DEFERRED_FIELDS_KEY][name]
+    cache = instance_vars.get(_SERIALIZED_CACHE_KEY)
+    if cache is not None:
+        cache.dirty.add(name)
+    return unshared
+
+
+def _is_immutable_value(x: Any) -> bool:
+    """Check if `x` is a primitive, a path or an enum member, which copies can share."""
+    return x.__class__ in _PRIMITIVE_VALUE_TYPES or isinstance(x, Path | enum.Enum)
+
+
+def _copy_on_write(obj: Coqpit) -> Coqpit:
+    """Return a copy of `obj` sharing its mutable field values, see ``Coqpit.copy()``.
+
+    `obj` itself is not modified: its values are shared with an extra owner that
+    never takes them back, so that the copy always reads a clone.
+    """
+    instance_vars = vars(obj)
+    copy_vars = {k: v for k, v in instance_vars.items() if k != _SERIALIZED_CACHE_KEY}
+    deferred = dict(instance_vars.get(_DEFERRED_FIELDS_KEY, {}))
+    for value in deferred.values():
+        if value.__class__ is _SharedValue:
+            value.owners += 1
+    cls = type(obj)
+    for name in _class_plan(cls).names:
+        value = instance_vars.get(name, _MISSING)
+        if value is _MISSING or _is_immutable_value(value):
+            continue
+        _install_field_guard(cls, name)
+        deferred[name] = _SharedValue(value, owners=2)
+        del copy_vars[name]
+    obj_copy = object.__new__(type(obj))
+    copy_vars[_DEFERRED_FIELDS_KEY] = deferred
+    vars(obj_copy).update(copy_vars)
+    return obj_copy
+
+
+def _clone_shared(x: Any) -> Any:
+    """Clone a shared value, nested Coqpits are copied with `_copy_on_write()`."""
+    if _is_immutable_value(x):
+        return x
+    if isinstance(x, Coqpit):
+        return _copy_on_write(x)
+    if x.__class__ is list:
+        if set(map(type, x)) <= _PRIMITIVE_VALUE_TYPES:
+            return x.copy()
+        return [_clone_shared(xi) for xi in x]
+    if x.__class__ is dict:
+        return {k: _clone_shared(v) for k, v in x.items()}
+    return copy.deepcopy(x)
+
+
+def _copy_serialized(x: Any) -> Any:
+    """Copy the dicts and lists of a serialized value."""
+    if isinstance(x, dict):
+        return {k: _copy_serialized(v) for k, v in x.items()}
+    if isinstance(x, list):
+        return [_copy_serialized(xi) for xi in x]
+    return x
+
+
+def _check_lazy_support(cls: type, *, lazy: bool) -> None:
+    """Raise if lazy deserialization is requested for a class that does not support it."""
+    if lazy and not issubclass(cls, Coqpit):
+        msg = f"Lazy deserialization is only supported by Coqpit classes, not {cls.__name__}"
+        raise TypeError(msg)
+
+
+def _serialize_with_deferred(obj: object, deferred: dict[str, Any]) -> dict[str, Any]:
+    """Serialize `obj`, without deserializing lazy fields or cloning shared ones."""
+    o = {}
+    for name in _class_plan(type(obj)).names:
+        value = deferred.get(name)
+        if isinstance(value, _LazyValue):
+            o[name] = _copy_serialized(value.raw)
+        elif isinstance(value, _SharedValue):
+            o[name] = _serialize(value.value)
+        else:
+            o[name] = _serialize(getattr(obj, name))
+    return o
+
+
+# ---------------------------------------------------------------------------- #
+#                              Serialization cache                             #
+# ---------------------------------------------------------------------------- #
+
+# Key in the instance `__dict__` of the `_SerializedCache` of Coqpits serialized
+# by a class created with ``cache_serialized=True``.
+_SERIALIZED_CACHE_KEY = "_coqpit_serialized"
+
+# How the cached serialized value of a field is checked before it is reused.
+_IMMUTABLE = 0  # primitive or path, only changed by assigning the field
+_CHILD = 1  # nested Coqpit, valid while it is the same object and its own cache is
+_CONTAINER = 2  # list or dict, valid while its items are the same objects
+_LAZY = 3  # lazy field, valid while it is not deserialized or reassigned
+_VOLATILE = 4  # anything else, serialized again every time
+
+
+class _SerializedField:
+    """Cached serialized value of a single field."""
+
+    __slots__ = ("canonical", "data", "json", "kind", "snapshot", "value", "version")
+
+    def __init__(self, kind: int, value: Any, data: Any, snapshot: Any = None, version: int = 0) -> None:
+        self.kind = kind
+        # the value that was serialized, checked by identity
+        self.value = value
+        self.data = data
+        # `_CONTAINER`: the `_ContainerSnapshot` of `value`
+        self.snapshot = snapshot
+        # `_CHILD`: the version of the cache of `value`
+        self.version = version
+        self.json: str | None = None
+        self.canonical: str | None = None
+
+
+class _ContainerSnapshot:
+    """Items of a serialized list or dict, used to detect in-place modifications.
+
+    `items` is a shallow copy of the container. Nested containers and Coqpits are
+    checked recursively through `nested`, which maps their index or key to their own
+    snapshot or to the version of their cache. `flat` is True if the container holds
+    only primitives, so that `items` is also its serialized value.
+    """
+
+    __slots__ = ("flat", "items", "nested")
+
+    def __init__(self, items: Any, nested: list[tuple[Any, Any]], *, flat: bool) -> None:
+        self.items = items
+        self.nested = nested
+        self.flat = flat
+
+
+class _SerializedCache:
+    """Serialized fields of a Coqpit, reused until the fields change.
+
+    Assigning or deleting a field marks it as dirty. Mutable values are checked on
+    every use instead, see `_SerializedField`. The version is incremented every time
+    a field is serialized again, so that parents can check whether their cached copy
+    of this Coqpit is still valid.
+    """
+
+    __slots__ = ("canonical", "checked", "data", "digest", "dirty", "entries", "json", "version")
+
+    def __init__(self) -> None:
+        self.entries: dict[str, _SerializedField] = {}
+        self.checked: list[str] = []
+        self.dirty: set[str] = set()
+        self.version = 0
+        self.data: dict[str, Any] | None = None
+        self.json: str | None = None
+        self.canonical: str | None = None
+        self.digest: str | None = None
+
+
+def _serialized_cache(obj: Coqpit) -> _SerializedCache:
+    """Return the serialization cache of `obj`, serializing again the fields that changed."""
+    instance_vars = vars(obj)
+    cache: _SerializedCache | None = instance_vars.get(_SERIALIZED_CACHE_KEY)
+    if cache is None:
+        cache = _SerializedCache()
+        for name in _class_plan(type(obj)).names:
+            cache.entries[name] = _serialize_field(obj, name)
+        cache.checked = [name for name, entry in cache.entries.items() if entry.kind != _IMMUTABLE]
+        instance_vars[_SERIALIZED_CACHE_KEY] = cache
+        return cache
+    entries = cache.entries
+    stale = {name for name in cache.dirty if name in entries} if cache.dirty else set()
+    for name in cache.checked:
+        if name not in stale and not _field_unchanged(obj, name, entries[name]):
+            stale.add(name)
+    if stale:
+        # invalidate first, parents must not reuse a partially updated cache
+        cache.version += 1
+        cache.data = cache.json = cache.canonical = cache.digest = None
+        for name in stale:
+            cache.entries[name] = _serialize_field(obj, name)
+        cache.checked = [name for name, entry in cache.entries.items() if entry.kind != _IMMUTABLE]
+    cache.dirty.clear()
+    return cache
+
+
+def _serialize_field(obj: Coqpit, name: str) -> _SerializedField:  # noqa: PLR0911
+    """Serialize the field `name` of `obj`, see `_serialize()`."""
+    value = vars(obj).get(name, _MISSING)
+    if value is _MISSING:
+        deferred = _deferred_fields(obj).get(name)
+        if isinstance(deferred, _LazyValue):
+            return _SerializedField(_LAZY, deferred, deferred.raw)
+        if isinstance(deferred, _SharedValue):
+            # unsharing the field marks it as dirty
+            value = deferred.value
+        else:
+            # MISSING fields raise here, like in `serialize()`
+            return _SerializedField(_VOLATILE, None, _serialize(getattr(obj, name)))
+    if value.__class__ in _PRIMITIVE_VALUE_TYPES:
+        return _SerializedField(_IMMUTABLE, value, value)
+    if isinstance(value, Path | enum.Enum):
+        return _SerializedField(_IMMUTABLE, value, _serialize(value))
+    if _is_cacheable_coqpit(value):
+        cache = _serialized_cache(value)
+        return _SerializedField(_CHILD, value, _serialized_data(cache), version=cache.version)
+    if value.__class__ is list or value.__class__ is dict:
+        data, snapshot = _serialize_container(value)
+        if snapshot is not None:
+            return _SerializedField(_CONTAINER, value, data, snapshot)
+        return _SerializedField(_VOLATILE, value, data)
+    return _SerializedField(_VOLATILE, value, _serialize(value))
+
+
+def _is_cacheable_coqpit(x: Any) -> TypeIs[Coqpit]:
+    """Check if `x` is a Coqpit that is serialized with the default `serialize()`."""
+    return isinstance(x, Coqpit) and type(x).serialize is Serializable.serialize
+
+
+def _serialize_container(x: Any) -> tuple[Any, _ContainerSnapshot | None]:
+    """Serialize a list or dict, returning its snapshot or None if it cannot be checked."""
+    values = x if x.__class__ is list else x.values()
+    if set(map(type, values)) <= _PRIMITIVE_VALUE_TYPES:
+        items = x.copy()
+        return items, _ContainerSnapshot(items, [], flat=True)
+    data: list[Any] = []
+    nested: list[tuple[Any, Any]] | None = []
+    keys = range(len(x)) if x.__class__ is list else x.keys()
+    for key, value in zip(keys, values, strict=True):
+        if value.__class__ in _PRIMITIVE_VALUE_TYPES:
+            data.append(value)
+        elif isinstance(value, Path | enum.Enum):
+            data.append(_serialize(value))
+        elif _is_cacheable_coqpit(value):
+            cache = _serialized_cache(value)
+            data.append(_serialized_data(cache))
+            if nested is not None:
+                nested.append((key, cache.version))
+        elif value.__class__ is list or value.__class__ is dict:
+            value_data, snapshot = _serialize_container(value)
+            data.append(value_data)
+            if nested is not None and snapshot is not None:
+                nested.append((key, snapshot))
+            else:
+                nested = None
+        else:
+            data.append(_serialize(value))
+            nested = None
+    serialized = data if x.__class__ is list else dict(zip(x.keys(), data, strict=True))
+    if nested is None:
+        return serialized, None
+    return serialized, _ContainerSnapshot(x.copy(), nested, flat=False)
+
+
+def _field_unchanged(obj: Coqpit, name: str, entry: _SerializedField) -> bool:
+    """Check if the cached serialized value of a field is still valid."""
+    if entry.kind == _CHILD:
+        return _serialized_cache(entry.value).version == entry.version
+    if entry.kind == _CONTAINER:
+        return _container_unchanged(entry.value, entry.snapshot)
+    if entry.kind == _LAZY:
+        return _deferred_fields(obj).get(name) is entry.value
+    return entry.kind == _IMMUTABLE
+
+
+def _container_unchanged(x: Any, snapshot: _ContainerSnapshot) -> bool:
+    """Check if a list or dict still holds the same items as when `snapshot` was taken."""
+    items = snapshot.items
+    if len(x) != len(items) or not all(map(operator.is_, x, items)):
+        return False
+    if x.__class__ is dict and not all(map(operator.is_, x.values(), items.values())):
+        return False
+    for key, nested in snapshot.nested:
+        if nested.__class__ is int:
+            if _serialized_cache(x[key]).version != nested:
+                return False
+        elif not _container_unchanged(x[key], nested):
+            return False
+    return True
+
+
+def _current_cache(obj: Coqpit) -> _SerializedCache:
+    """Return the cache of a nested Coqpit, which was just updated by `_serialized_cache()`."""
+    cache: _SerializedCache = vars(obj)[_SERIALIZED_CACHE_KEY]
+    return cache
+
+
+def _serialized_data(cache: _SerializedCache) -> dict[str, Any]:
+    """Return the serialized fields of a cache, which must not be modified."""
+    if cache.data is None:
+        cache.data = {name: entry.data for name, entry in cache.entries.items()}
+    return cache.data
+
+
+def _export_serialized(cache: _SerializedCache) -> dict[str, Any]:
+    """Return a copy of the serialized fields of a cache, that the caller can modify."""
+    o = dict(_serialized_data(cache))
+    for name in cache.checked:
+        entry = cache.entries[name]
+        if entry.kind == _CHILD:
+            o[name] = _export_serialized(_current_cache(entry.value))
+        elif entry.kind == _CONTAINER:
+            o[name] = _export_container(entry.value, entry.data, entry.snapshot)
+        else:
+            o[name] = _copy_serialized(entry.data)
+    return o
+
+
+def _export_container(x: Any, data: Any, snapshot: _ContainerSnapshot) -> Any:
+    """Return a copy of the serialized value of a list or dict, see `_export_serialized()`."""
+    o = data.copy()
+    for key, nested in snapshot.nested:
+        if nested.__class__ is int:
+            o[key] = _export_serialized(_current_cache(x[key]))
+        else:
+            o[key] = _export_container(x[key], data[key], nested)
+    return o
+
+
+def _container_json(x: Any, data: Any, snapshot: _ContainerSnapshot) -> str:
+    """Return the serialized value of a list or dict as JSON, reusing the JSON of nested Coqpits."""
+    if not snapshot.nested or (x.__class__ is dict and not all(key.__class__ is str for key in x)):
+        return json.dumps(data, indent=4)
+    nested = dict(snapshot.nested)
+    items = []
+    for key in range(len(x)) if x.__class__ is list else x:
+        item = nested.get(key, _MISSING)
+        if item is _MISSING:
+            item_json = json.dumps(data[key], indent=4)
+        elif item.__class__ is int:
+            item_json = _serialized_json(_current_cache(x[key]))
+        else:
+            item_json = _container_json(x[key], data[key], item)
+        items.append(item_json if x.__class__ is list else f"{json.dumps(key)}: {item_json}")
+    brackets = "[]" if x.__class__ is list else "{}"
+    return f"{brackets[0]}\n    " + ",\n".join(items).replace("\n", "\n    ") + f"\n{brackets[1]}"
+
+
+def _serialized_json(cache: _SerializedCache) -> str:
+    """Return the serialized fields of a cache as JSON, like ``json.dumps(data, indent=4)``."""
+    if cache.json is None:
+        if not cache.entries:
+            cache.json = "{}"
+            return cache.json
+        items = []
+        for name, entry in cache.entries.items():
+            if entry.json is None:
+                if entry.kind == _CHILD:
+                    entry.json = _serialized_json(_current_cache(entry.value))
+                elif entry.kind == _CONTAINER:
+                    entry.json = _container_json(entry.value, entry.data, entry.snapshot)
+                else:
+                    entry.json = json.dumps(entry.data, indent=4)
+            items.append(f"{json.dumps(name)}: {entry.json}")
+        # nested values are indented by one more level
+        cache.json = "{\n    " + ",\n".join(items).replace("\n", "\n    ") + "\n}"
+    return cache.json
+
+
+def _canonical_key(key: Any) -> str:
+    """Convert a dict key to a string, like `json.dumps()` does."""
+    return key if key.__class__ is str else json.dumps(key)
+
+
+def _canonical_value(x: Any) -> Any:
+    """Normalize a serialized value: integral floats become ints and dict keys strings."""
+    if x.__class__ is float:
+        return int(x) if x.is_integer() else x
+    if isinstance(x, dict):
+        return {_canonical_key(k): _canonical_value(v) for k, v in x.items()}
+    if isinstance(x, list | tuple):
+        item_types = set(map(type, x))
+        if item_types <= _PRIMITIVE_VALUE_TYPES:
+            if float not in item_types:
+                return x
+            return [int(xi) if xi.__class__ is float and xi.is_integer() else xi for xi in x]
+        return [_canonical_value(xi) for xi in x]
+    return x
+
+
+_CANONICAL_ENCODER = json.JSONEncoder(sort_keys=True, separators=(",", ":"))
+
+
+def _canonical_json(x: Any) -> str:
+    """Return the canonical JSON encoding of a serialized value, with sorted keys."""
+    return _CANONICAL_ENCODER.encode(_canonical_value(x))
+
+
+def _canonical_text(obj: Coqpit, *, refresh: bool = False) -> str:
+    """Return the canonical JSON encoding of the fingerprinted fields of `obj`.
+
+    The encoding of each field and of each nested Coqpit is cached along with their
+    serialized value, see `_SerializedCache`. The cache of `obj` is updated first if
+    `refresh` is True, nested Coqpits are assumed to be up to date.
+    Lazy fields are deserialized first, so that the text does not depend on how
+    `obj` was loaded.
+    """
+    plan = _class_plan(type(obj))
+    cache = _serialized_cache(obj) if refresh else _current_cache(obj)
+    if cache.canonical is None:
+        lazy = [name for name, entry in cache.entries.items() if entry.kind == _LAZY]
+        if lazy:
+            for name in lazy:
+                getattr(obj, name)
+            cache = _serialized_cache(obj)
+        items = []
+        for name in plan.fingerprint_names:
+            entry = cache.entries[name]
+            if entry.canonical is None:
+                if entry.kind == _CHILD:
+                    entry.canonical = _canonical_text(entry.value)
+                elif entry.kind == _CONTAINER:
+                    entry.canonical = _container_canonical(entry.value, entry.data, entry.snapshot)
+                else:
+                    entry.canonical = _canonical_json(entry.data)
+            items.append(f"{_CANONICAL_ENCODER.encode(name)}:{entry.canonical}")
+        cache.canonical = "{" + ",".join(items) + "}"
+    return cache.canonical
+
+
+def _container_canonical(x: Any, data: Any, snapshot: _ContainerSnapshot) -> str:
+    """Return the canonical JSON encoding of a list or dict, see `_canonical_text()`."""
+    if not snapshot.nested:
+        return _canonical_json(data)
+    nested = dict(snapshot.nested)
+    items = {}
+    for key in range(len(x)) if x.__class__ is list else x:
+        item = nested.get(key, _MISSING)
+        if item is _MISSING:
+            items[key] = _canonical_json(data[key])
+        elif item.__class__ is int:
+            items[key] = _canonical_text(x[key])
+        else:
+            items[key] = _container_canonical(x[key], data[key], item)
+    if x.__class__ is list:
+        return "[" + ",".join(items.values()) + "]"
+    keys = {_canonical_key(key): key for key in items}
+    return "{" + ",".join(f"{_CANONICAL_ENCODER.encode(key)}:{items[keys[key]]}" for key in sorted(keys)) + "}"
+
+
+# ---------------------------------------------------------------------------- #
+#                             Round-trip validation                            #
+# ---------------------------------------------------------------------------- #
+
+
+# Error of a round trip check: ``"<dotted path relative to the checked value>: <reason>"``.
+# Every level prepends its own key, so paths are only formatted for the failing value.
+RoundTripChecker: TypeAlias = Callable[[Any], str | None]
+
+_ROUNDTRIP_CHECKERS: dict[Any, RoundTripChecker] = {}
+
+
+def _roundtrip_fields(obj: Serializable) -> str | None:
+    """Return the first field of `obj` that does not survive a JSON round trip, see `_compile_roundtrip_checker()`."""
+    values = vars(obj)
+    deferred = _deferred_fields(obj)
+    for name, check in _class_plan(type(obj)).roundtrip_checkers:
+        if name in values:
+            value = values[name]
+        elif (entry := deferred.get(name)) is None or isinstance(entry, _LazyValue):
+            value = getattr(obj, name)
+        elif entry.__class__ is str:
+            return f".{name}: MISSING value"
+        else:
+            value = entry.value
+        if value is None:
+            # None is never decoded
+            continue
+        if value.__class__ is str and value == MISSING:
+            return f".{name}: MISSING value"
+        error = check(value)
+        if error is not None:
+            return f".{name}{error}"
+    return None
+
+
+def _compile_roundtrip_checker(field_type: FieldType) -> RoundTripChecker:
+    """Return a function checking that values are unchanged by ``serialize()``, JSON and deserialization.
+
+    Like decoders, checkers are specialised to `field_type` and cached, see
+    `_compile_decoder()`. Nested
+    `Serializable` objects and lists of a single type are visited item by item, and
+    values that already have the exact primitive type are accepted directly. Dict
+    values are decoded as their own JSON type, so they must be plain JSON values.
+    Anything else is serialized and decoded, then compared with the original value.
+    """
+    if _uses_serializable(field_type):
+        return _build_roundtrip_checker(field_type)
+    try:
+        return _ROUNDTRIP_CHECKERS[field_type]
+    except KeyError:
+        checker = _ROUNDTRIP_CHECKERS[field_type] = _build_roundtrip_checker(field_type)
+        return checker
+    except TypeError:
+        # unhashable type hint, e.g. Literal with unhashable values
+        return _build_roundtrip_checker(field_type)
+
+
+def _build_roundtrip_checker(field_type: FieldType) -> RoundTripChecker:  # noqa: PLR0911
+    """Build the checker for `_compile_roundtrip_checker`."""
+    check_decoded = _decoded_roundtrip_checker(_compile_decoder(field_type))
+    base_type = field_type if isinstance(field_type, str) else _drop_none_type(field_type)
+    if _is_list(base_type):
+        return _compile_list_roundtrip_checker(base_type, check_decoded)
+    if _is_dict(base_type):
+        return lambda x: _json_error(x) if x.__class__ is dict else check_decoded(x)
+    if not isinstance(base_type, type):
+        return check_decoded
+    if issubclass(base_type, Serializable):
+        return lambda x: _roundtrip_fields(x) if x.__class__ is base_type else check_decoded(x)
+    if base_type is float:
+        # NaN is not equal to itself
+        return lambda x: None if x.__class__ is float and x == x else check_decoded(x)  # noqa: PLR0124
+    if _is_primitive_type(base_type):
+        return lambda x: None if x.__class__ is base_type else check_decoded(x)
+    return check_decoded
+
+
+def _decoded_roundtrip_checker(decode: Decoder) -> RoundTripChecker:
+    """Return a checker serializing values and decoding them with `decode`."""
+
+    def check_decoded(x: Any) -> str | None:
+        serialized = _serialize(x)
+        return _json_error(serialized) or _decode_error(x, serialized, decode)
+
+    return check_decoded
+
+
+def _compile_list_roundtrip_checker(field_type: FieldType, check_decoded: RoundTripChecker) -> RoundTripChecker:
+    """Compile the round trip checker of a `list[_T]` type, checking the items one by one."""
+    item_types = typing.get_args(field_type)
+    if len(item_types) != 1 or isinstance(item_types[0], TypeVar):
+        return check_decoded
+    check_item = _compile_roundtrip_checker(item_types[0])
+
+    def check_list(x: Any) -> str | None:
+        if x.__class__ is not list:
+            return check_decoded(x)
+        for idx, item in enumerate(x):
+            error = check_item(item)
+            if error is not None:
+                return f".{idx}{error}"
+        return None
+
+    return check_list
+
+
+def _decode_error(x: Any, serialized: Any, decode: Decoder) -> str | None:
+    """Return why decoding the serialized value of `x` does not give back an equal value."""
+    try:
+        decoded = decode(serialized)
+    except Exception as e:  # noqa: BLE001
+        return f": {e!r}"
+    if not _values_equal(decoded, x):
+        return f": {x!r} is decoded as {decoded!r}"
+    return None
+
+
+def _values_equal(a: Any, b: Any) -> bool:  # noqa: PLR0911
+    """Compare values with ``==``, except NumPy arrays which are compared by dtype, shape and items.
+
+    Once NumPy is imported, dataclasses, lists and dicts are compared item by item to
+    find the arrays, whose ``==`` is elementwise. NaN items of arrays are equal.
+    """
+    if _ndarray_type() is None:
+        return bool(a == b)
+    if _is_ndarray(a) or _is_ndarray(b):
+        return (
+            _is_ndarray(a)
+            and _is_ndarray(b)
+            and a.dtype == b.dtype
+            and a.shape == b.shape
+            and bool(sys.modules["numpy"].array_equal(a, b, equal_nan=a.dtype.kind in "fc"))
+        )
+    if a.__class__ is not b.__class__:
+        return bool(a == b)
+    if isinstance(a, Serializable) and is_dataclass(a):
+        return all(_values_equal(getattr(a, name), getattr(b, name)) for name in _class_plan(type(a)).names)
+    if isinstance(a, list | tuple):
+        return len(a) == len(b) and all(map(_values_equal, a, b))
+    if isinstance(a, dict):
+        return a.keys() == b.keys() and all(_values_equal(v, b[k]) for k, v in a.items())
+    return bool(a == b)
+
+
+def _uses_ndarray(field_type: FieldType) -> bool:
+    """Check if a type hint uses `numpy.ndarray`, e.g. ``list[numpy.typing.NDArray[np.float32]]``."""
+    return _is_ndarray_type(field_type) or any(_uses_ndarray(arg) for arg in typing.get_args(field_type))
+
+
+def _use_fields_equal(cls: type) -> None:
+    """Replace the ``__eq__`` generated by the dataclass decorator for `cls` if it declares ndarray fields.
+
+    The generated ``__eq__`` compares tuples of field values, which raises for
+    NumPy arrays. The replacement compares the same fields with `_values_equal()`.
+    ``__eq__`` methods defined in the class body and the ones of other classes are
+    kept.
+    """
+    if "__eq__" not in cls.__dict__ or cls.__dict__.get("_custom_eq", True):
+        return
+    own_fields = fields(cls)
+    if not any(_uses_ndarray(field.type) for field in own_fields):
+        return
+    names = tuple(field.name for field in own_fields if field.compare)
+
+    def __eq__(self: Any, other: Any) -> Any:  # noqa: N807
+        if other.__class__ is not self.__class__:
+            return NotImplemented
+        return all(_values_equal(getattr(self, name), getattr(other, name)) for name in names)
+
+    __eq__.__qualname__ = f"{cls.__qualname__}.__eq__"
+    cls.__eq__ = __eq__  # type: ignore[method-assign, assignment]
+
+
+def _json_error(x: Any) -> str | None:  # noqa: PLR0911
+    """Return why `x` is not loaded back as an equal value from its JSON representation."""
+    if isinstance(x, float) and x != x:  # noqa: PLR0124
+        return ": NaN is not equal to itself"
+    if x is None or isinstance(x, str | int | float):
+        return None
+    if isinstance(x, list):
+        for idx, item in enumerate(x):
+            error = _json_error(item)
+            if error is not None:
+                return f".{idx}{error}"
+        return None
+    if isinstance(x, dict):
+        for key, value in x.items():
+            error = _json_error(value) if isinstance(key, str) else f": key {key!r} is not a string"
+            if error is not None:
+                return f".{key}{error}" if isinstance(key, str) else error
+        return None
+    return f": {type(x).__name__} value {x!r} is not a JSON type"
+
+
+def _getattribute_checking_missing(self: object, arg: str) -> Any:
+    """Check if the mandatory field is defined when accessing it."""
+    value = object.__getattribute__(self, arg)
+    if isinstance(value, str) and value == MISSING:
+        msg = f" [!] MISSING field {arg} must be defined."
+        raise AttributeError(msg)
+    return value
+
+
+CoqpitType: TypeAlias = MutableMapping[str, "CoqpitNestedValue"]
+CoqpitNestedValue: TypeAlias = Union["CoqpitValue", CoqpitType]
+CoqpitValue: TypeAlias = str | int | float | bool | None
+
+
+# TODO: It should be possible to get rid of the next 3 `type: ignore`. At
+# nested levels, the key can be `str | int` as well, not just `str`.
+def _rsetattr(obj: CoqpitType, keys: str, val: CoqpitValue) -> None:
+    """Recursive setattr (supports dotted key names)."""
+    pre, _, post = keys.rpartition(".")
+    target = _rgetattr(obj, pre) if pre else obj
+    if post.isnumeric():
+        operator.setitem(target, int(post), val)  # type: ignore[misc]
+    else:
+        setattr(target, post, val)
+
+
+def _rgetattr(obj: CoqpitType, keys: str) -> CoqpitType:
+    """Recursive getattr (supports dotted key names)."""
+    v = obj
+    for k in keys.split("."):
+        v = operator.getitem(v, int(k)) if k.isnumeric() else getattr(v, k)  # type: ignore[arg-type]
+    return v
+
+
+def _rsetitem(obj: CoqpitType, keys: str, value: CoqpitValue) -> None:
+    """Recursive setitem (supports dotted key names).
+
+    _rsetitem(a, "b.c", 1) => a["b"]["c"] = 1
+    """
+    pre, _, post = keys.rpartition(".")
+    operator.setitem(_rgetitem(obj, pre) if pre else obj, int(post) if post.isnumeric() else post, value)  # type: ignore[misc]
+
+
+def _rgetitem(obj: CoqpitType, keys: str) -> CoqpitType:
+    """Recursive getitem (supports dotted key names).
+
+    _rgetitem(a, "b.c") => a["b"]["c"]
+    """
+    v = obj
+    for k in keys.split("."):
+        v = operator.getitem(v, int(k) if k.isnumeric() else k)  # type: ignore[arg-type]
+    return v
+
+
+@dataclass
+class Serializable:
+    """Gives serialization ability to any inheriting dataclass."""
+
+    def __post_init__(self) -> None:
+        """Validate contracts, check required arguments are specified and convert array fields."""
+        self._validate_contracts()
+        for key, value in self.__dict__.items():
+            if value is no_default:
+                msg = f"__init__ missing 1 required argument: '{key}'"
+                raise TypeError(msg)
+        # Coqpit overrides this method and converts them on assignment instead
+        for name, decode in _class_plan(type(self)).array_decoders.items():
+            value = getattr(self, name)
+            if value.__class__ is list:
+                setattr(self, name, decode(value))
+
+    def _validate_contracts(self) -> None:
+        """Validate contracts specified in the dataclass.
+
+        Only the fields selected by `_contract_checks()` are visited.
+        """
+        for name, optional, contract in _class_plan(type(self)).contract_checks:
+            value = getattr(self, name)
+
+            if value is None:
+                if not optional:
+                    msg = f"{name} is not optional"
+                    raise TypeError(msg)
+            elif contract is not None and not contract(value):
+                msg = f"break the contract for {name}, {self.__class__.__name__}"
+                raise ValueError(msg)
+
+    def validate(self, *, single_pass: bool = False) -> None:
+        """Validate if object can serialize / deserialize correctly.
+
+        Args:
+            single_pass: instead of serializing, dumping, loading and deserializing
+                the whole object before comparing it, check in one pass over the
+                fields that every value is JSON-representable and decodes back to an
+                equal value of the declared type. The first failing field is reported
+                by its dotted path, e.g. ``datasets.0.path``. Nested objects are not
+                rebuilt, so their ``__post_init__()`` checks are not run again.
+
+        Raises:
+            ValueError: if the object is changed by the round trip.
+        """
+        self._validate_contracts()
+        if single_pass:
+            error = _roundtrip_fields(self)
+            if error is not None:
+                msg = f"could not be deserialized with same value, {error[1:]}"
+                raise ValueError(msg)
+        elif not _values_equal(self, self.__class__().deserialize(json.loads(json.dumps(self.serialize())))):
+            msg = "could not be deserialized with same value"
+            raise ValueError(msg)
+
+    def to_dict(self) -> dict[str, Any]:
+        """Transform serializable object to dict."""
+        cls_fields = fields(self)
+        o = {}
+        for cls_field in cls_fields:
+            o[cls_field.name] = getattr(self, cls_field.name)
+        return o
+
+    def serialize(self) -> dict[str, Any]:
+        """Serialize object to be json serializable representation."""
+        if not is_dataclass(self):
+            msg = "need to be decorated as dataclass"
+            raise TypeError(msg)
+
+        return _class_plan(type(self)).serializer(self)
+
+    def deserialize(self, data: dict[str, Any], *, lazy: bool = False) -> Self:  # noqa: C901
+        """Parse input dictionary and deserialize its fields to a dataclass.
+
+        Args:
+            data: serialized fields.
+            lazy: deserialize nested configs only when they are first accessed, see
+                ``Coqpit.new_from_dict()``. Only supported by `Coqpit`.
+
+        Returns:
+            self: deserialized `self`.
+        """
+        if not isinstance(data, dict):
+            raise TypeError
+        _check_lazy_support(type(self), lazy=lazy)
+        init_kwargs = {}
+        instance_vars = vars(self)
+        deferred = _deferred_fields(self)
+        for field_plan in _class_plan(type(self)).field_plans:
+            field = field_plan.field
+            if field.name not in data:
+                if field.name in instance_vars:
+                    init_kwargs[field.name] = instance_vars[field.name]
+                    continue
+                if field.name in deferred:
+                    init_kwargs[field.name] = deferred[field.name]
+                    continue
+                msg = f' [!] Missing required field "{field.name}"'
+                raise ValueError(msg)
+            value = data[field.name]
+            if value is None:
+                init_kwargs[field.name] = value
+                continue
+            if isinstance(value, str) and value == MISSING:
+                msg = f"deserialized with unknown value for {field.name} in {self.__class__.__name__}"
+                raise ValueError(msg)
+            if lazy and (lazy_value := field_plan.lazy_value(type(self), value)) is not None:
+                init_kwargs[field.name] = lazy_value
+                continue
+            try:
+                value = field_plan.decode(value)
+            except TypeError as e:
+                warnings.warn(
+                    (
+                        f"Type mismatch in {type(self).__name__}\n"
+                        f"Failed to deserialize field: {field.name} ({field.type}) = {value}\n"
+                        f"{e}\n"
+                        f"Replaced it with field's default value: {_default_value(field)}"
+                    ),
+                    stacklevel=2,
+                )
+                value = _default_value(field)
+            init_kwargs[field.name] = value
+        for k, v in init_kwargs.items():
+            setattr(self, k, v)
+        return self
+
+    @classmethod
+    def deserialize_immutable(cls, data: dict[str, Any], *, lazy: bool = False) -> Self:
+        """Parse input dictionary and deserialize its fields to a dataclass.
+
+        Args:
+            data: serialized fields.
+            lazy: deserialize nested configs only when they are first accessed, see
+                ``Coqpit.new_from_dict()``. Only supported by `Coqpit`.
+
+        Returns:
+            Newly created deserialized object.
+        """
+        if not isinstance(data, dict):
+            raise TypeError
+        _check_lazy_support(cls, lazy=lazy)
+        init_kwargs = {}
+        for field_plan in _class_plan(cls).field_plans:
+            name = field_plan.name
+            if name not in data:
+                if field_plan.has_class_value:
+                    init_kwargs[name] = field_plan.class_value
+                    continue
+                # if not in cls and the default value is not Missing use it
+                default_value = _default_value(field_plan.field)
+                if default_value is not _MISSING and not (isinstance(default_value, str) and default_value == MISSING):
+                    init_kwargs[name] = default_value
+                    continue
+                msg = f' [!] Missing required field "{name}"'
+                raise ValueError(msg)
+            value = data[name]
+            if value is None:
+                init_kwargs[name] = value
+                continue
+            if isinstance(value, str) and value == MISSING:
+                msg = f"Deserialized with unknown value for {name} in {cls.__name__}"
+                raise ValueError(msg)
+            if lazy and (lazy_value := field_plan.lazy_value(cls, value)) is not None:
+                init_kwargs[name] = lazy_value
+                continue
+            init_kwargs[name] = field_plan.decode(value)
+        return cls(**init_kwargs)
+
+    @classmethod
+    def invalidate_plan(cls) -> None:
+        """Drop the cached deserialization plan of this class.
+
+        Plans are built on first use from the dataclass fields. Call this after
+        modifying the fields or class attributes of an already used class. The
+        plans of the classes with fields using this class are dropped as well.
+        Calling it on `Serializable` (or `Coqpit`) drops the plans of all classes.
+        """
+        if cls is Serializable or cls is Coqpit:
+            for planned in list(_PLANNED_CLASSES):
+                delattr(planned, _PLAN_ATTRIBUTE)
+            _PLANNED_CLASSES.clear()
+            _DECODERS.clear()
+            _ROUNDTRIP_CHECKERS.clear()
+        else:
+            _drop_plan(cls)
+
+
+# ---------------------------------------------------------------------------- #
+#                               Binary snapshots                               #
+# ---------------------------------------------------------------------------- #
+
+# The binary format stores the same values as `Serializable.serialize()`, each
+# prefixed by a one byte tag. Lengths and counts are little-endian uint32.
+#
+#   N / T / F                    None / True / False
+#   i <int64>                    int
+#   I <len> <ascii digits>       int that does not fit in int64
+#   f <float64>                  float
+#   s <len> <utf8>               str, added to the string table
+#   r <index>                    str, reference to the string table
+#   l <count> <values>           list
+#   a <typecode> <count> <pad> <data>
+#                                list of only ints ("q") or only floats ("d"),
+#                                data is aligned to 8 bytes
+#   w <count> <len> <utf8>       list of only str, joined with NUL bytes
+#   d <keys> <values>            dict, keys and values are encoded as lists
+#   c <keys> <values>            nested Serializable, like a dict
+#   k <index>                    keys of a dict, reference to previous keys
+#   n <len> <dtype> <ndim> <shape> <pad> <data>
+#                                NumPy array of a numeric dtype, the dtype is an
+#                                ascii ``dtype.str`` with a one byte length, the
+#                                shape a uint32 per dimension and the C order data
+#                                is aligned to 8 bytes
+#
+# Lists of numbers and strings are decoded with a single call to `memoryview.cast`
+# or `str.split` on the underlying buffer, without per-item work in Python. NumPy
+# arrays are decoded as read-only views of the buffer, without copying them.
+
+_BINARY_MAGIC = b"COQPIT\x00\x01"
+_BINARY_MIN_ARRAY_LENGTH = 8
+_INT64_MIN = -(2**63)
+_INT64_MAX = 2**63 - 1
+_UINT32 = struct.Struct("<I")
+_UINT32_PAIR = struct.Struct("<II")
+_INT64 = struct.Struct("<q")
+_FLOAT64 = struct.Struct("<d")
+
+
+class _BinaryEncoder:
+    """Encode serializable values to the binary snapshot format."""
+
+    def __init__(self) -> None:
+        self.out = bytearray(_BINARY_MAGIC)
+        self.strings: dict[str, int] = {}
+        self.keys: dict[tuple[Any, ...], int] = {}
+
+    def encode(self, x: Any) -> None:  # noqa: C901, PLR0912
+        out = self.out
+        cls = x.__class__
+        if x is None:
+            out += b"N"
+        elif cls is bool:
+            out += b"T" if x else b"F"
+        elif cls is int:
+            if _INT64_MIN <= x <= _INT64_MAX:
+                out += b"i"
+                out += _INT64.pack(x)
+            else:
+                digits = str(x).encode("ascii")
+                out += b"I"
+                out += _UINT32.pack(len(digits))
+                out += digits
+        elif cls is float:
+            out += b"f"
+            out += _FLOAT64.pack(x)
+        elif cls is str:
+            self.encode_str(x)
+        elif isinstance(x, list | tuple):
+            self.encode_list(x)
+        elif isinstance(x, dict):
+            out += b"d"
+            self.encode_keys(tuple(x))
+            self.encode_list(list(x.values()))
+        elif isinstance(x, Serializable):
+            out += b"c"
+            self.encode_serializable(x)
+        elif isinstance(x, Path):
+            self.encode_str(str(x))
+        elif isinstance(x, array.array):
+            if x.typecode in "dq" and len(x) >= _BINARY_MIN_ARRAY_LENGTH:
+                self.encode_packed(x)
+            else:
+                self.encode_list(x.tolist())
+        elif isinstance(x, enum.Enum):
+            self.encode(x.value)
+        elif isinstance(x, type) and issubclass(x, Serializable):
+            out += b"c"
+            self.encode_serializable(x())
+        elif _is_ndarray(x):
+            self.encode_ndarray(x)
+        else:
+            msg = f"Object of type {cls.__name__} is not supported by the binary format"
+            raise TypeError(msg)
+
+    def encode_str(self, x: str) -> None:
+        out = self.out
+        index = self.strings.get(x)
+        if index is not None:
+            out += b"r"
+            out += _UINT32.pack(index)
+            return
+        self.strings[x] = len(self.strings)
+        data = x.encode("utf8")
+        out += b"s"
+        out += _UINT32.pack(len(data))
+        out += data
+
+    def encode_list(self, x: list[Any] | tuple[Any, ...]) -> None:
+        out = self.out
+        if len(x) >= _BINARY_MIN_ARRAY_LENGTH:
+            item_types = set(map(type, x))
+            if item_types == {str}:
+                joined = "\0".join(x)
+                if joined.count("\0") == len(x) - 1:
+                    data = joined.encode("utf8")
+                    out += b"w"
+                    out += _UINT32_PAIR.pack(len(x), len(data))
+                    out += data
+                    return
+            elif item_types == {float} or (item_types == {int} and min(x) >= _INT64_MIN and max(x) <= _INT64_MAX):
+                self.encode_packed(array.array("d" if item_types == {float} else "q", x))
+                return
+        out += b"l"
+        out += _UINT32.pack(len(x))
+        encode = self.encode
+        for xi in x:
+            encode(xi)
+
+    def encode_packed(self, items: array.array[Any]) -> None:
+        out = self.out
+        if sys.byteorder == "big":  # pragma: no cover
+            items = array.array(items.typecode, items)
+            items.byteswap()
+        out += b"a"
+        out += items.typecode.encode("ascii")
+        out += _UINT32.pack(len(items))
+        out += bytes(-len(out) % 8)
+        out += items.tobytes()
+
+    def encode_ndarray(self, x: Any) -> None:
+        if x.dtype.kind not in "biufc":
+            self.encode(x.tolist())
+            return
+        out = self.out
+        dtype = x.dtype.str.encode("ascii")
+        out += b"n"
+        out += bytes((len(dtype),))
+        out += dtype
+        out += _UINT32.pack(x.ndim)
+        out += struct.pack(f"<{x.ndim}I", *x.shape)
+        out += bytes(-len(out) % 8)
+        if x.size:
+            out += memoryview(x if x.flags.c_contiguous else x.copy(order="C")).cast("B")
+
+    def encode_keys(self, keys: tuple[Any, ...]) -> None:
+        out = self.out
+        index = self.keys.get(keys)
+        if index is not None:
+            out += b"k"
+            out += _UINT32.pack(index)
+            return
+        self.keys[keys] = len(self.keys)
+        self.encode_list(keys)
+
+    def encode_serializable(self, x: Serializable) -> None:
+        names = _class_plan(type(x)).names
+        deferred = _deferred_fields(x) if isinstance(x, Coqpit) else {}
+        values = []
+        for name in names:
+            value = deferred.get(name)
+            if isinstance(value, _LazyValue):
+                values.append(value.raw)
+            elif isinstance(value, _SharedValue):
+                values.append(value.value)
+            else:
+                values.append(getattr(x, name))
+        self.encode_keys(names)
+        self.encode_list(values)
+
+
+class _BinaryDecoder:
+    """Decode the binary snapshot format to the values returned by `Serializable.serialize()`."""
+
+    def __init__(self, data: bytes) -> None:
+        if data[: len(_BINARY_MAGIC)] != _BINARY_MAGIC:
+            msg = "Not a Coqpit binary snapshot"
+            raise ValueError(msg)
+        self.data = data
+        self.pos = len(_BINARY_MAGIC)
+        self.strings: list[str] = []
+        self.keys: list[list[Any]] = []
+
+    def decode(self) -> Any:  # noqa: PLR0911
+        data = self.data
+        pos = self.pos
+        tag = data[pos : pos + 1]
+        pos += 1
+        if tag == b"r":
+            self.pos = pos + 4
+            return self.strings[_UINT32.unpack_from(data, pos)[0]]
+        if tag == b"s":
+            (length,) = _UINT32.unpack_from(data, pos)
+            pos += 4
+            self.pos = pos + length
+            x = str(data[pos : pos + length], "utf8")
+            self.strings.append(x)
+            return x
+        if tag == b"i":
+            self.pos = pos + 8
+            return _INT64.unpack_from(data, pos)[0]
+        if tag == b"f":
+            self.pos = pos + 8
+            return _FLOAT64.unpack_from(data, pos)[0]
+        if tag in (b"N", b"T", b"F"):
+            self.pos = pos
+            return None if tag == b"N" else tag == b"T"
+        if tag in (b"l", b"a", b"w"):
+            return self.decode_list()
+        if tag in (b"d", b"c"):
+            self.pos = pos
+            keys = self.decode_keys()
+            return dict(zip(keys, self.decode_list(), strict=True))
+        if tag == b"I":
+            (length,) = _UINT32.unpack_from(data, pos)
+            self.pos = pos + 4 + length
+            return int(str(data[pos + 4 : pos + 4 + length], "ascii"))
+        if tag == b"n":
+            self.pos = pos
+            return self.decode_ndarray()
+        msg = f"Invalid tag {tag!r} at offset {pos - 1} of the binary snapshot"
+        raise ValueError(msg)
+
+    def decode_list(self) -> list[Any]:
+        data = self.data
+        pos = self.pos
+        tag = data[pos : pos + 1]
+        if tag == b"l":
+            (count,) = _UINT32.unpack_from(data, pos + 1)
+            self.pos = pos + 5
+            decode = self.decode
+            return [decode() for _ in range(count)]
+        if tag == b"a":
+            typecode = data[pos + 1 : pos + 2]
+            (count,) = _UINT32.unpack_from(data, pos + 2)
+            start = pos + 6
+            start += -start % 8
+            end = start + count * 8
+            self.pos = end
+            items = memoryview(data)[start:end]
+            if sys.byteorder == "big":  # pragma: no cover
+                swapped = array.array(typecode.decode("ascii"), items)
+                swapped.byteswap()
+                return swapped.tolist()
+            return items.cast("d").tolist() if typecode == b"d" else items.cast("q").tolist()
+        if tag == b"w":
+            (_, length) = _UINT32_PAIR.unpack_from(data, pos + 1)
+            start = pos + 9
+            self.pos = start + length
+            return str(data[start : start + length], "utf8").split("\0")
+        msg = f"Invalid list tag {tag!r} at offset {pos} of the binary snapshot"
+        raise ValueError(msg)
+
+    def decode_ndarray(self) -> Any:
+        numpy = importlib.import_module("numpy")
+        data = self.data
+        pos = self.pos
+        dtype = numpy.dtype(str(data[pos + 1 : pos + 1 + data[pos]], "ascii"))
+        pos += 1 + data[pos]
+        (ndim,) = _UINT32.unpack_from(data, pos)
+        shape = struct.unpack_from(f"<{ndim}I", data, pos + 4)
+        pos += 4 + 4 * ndim
+        pos += -pos % 8
+        count = functools.reduce(operator.mul, shape, 1)
+        self.pos = pos + count * dtype.itemsize
+        return numpy.frombuffer(data, dtype=dtype, count=count, offset=pos).reshape(shape)
+
+    def decode_keys(self) -> list[Any]:
+        pos = self.pos
+        if self.data[pos : pos + 1] == b"k":
+            self.pos = pos + 5
+            return self.keys[_UINT32.unpack_from(self.data, pos + 1)[0]]
+        keys = self.decode_list()
+        self.keys.append(keys)
+        return keys
+
+
+def _encode_binary(x: Any) -> bytes:
+    """Encode a value (usually a `Serializable`) to the binary snapshot format."""
+    encoder = _BinaryEncoder()
+    encoder.encode(x)
+    return bytes(encoder.out)
+
+
+def _decode_binary(data: bytes) -> Any:
+    """Decode a binary snapshot to the serialized form of the encoded value.
+
+    Raises:
+        ValueError: if `data` is not a valid binary snapshot.
+    """
+    decoder = _BinaryDecoder(data)
+    try:
+        x = decoder.decode()
+    except (struct.error, IndexError, TypeError) as e:
+        # reads past the end of the data or references to undefined strings and keys
+        msg = "Truncated/corrupt binary snapshot"
+        raise ValueError(msg) from e
+    if decoder.pos > len(data):
+        msg = "Truncated/corrupt binary snapshot"
+        raise ValueError(msg)
+    if decoder.pos != len(data):
+        msg = "Unexpected trailing data in the binary snapshot"
+        raise ValueError(msg)
+    return x
+
+
+# ---------------------------------------------------------------------------- #
+#                                  Load cache                                  #
+# ---------------------------------------------------------------------------- #
+
+_LOAD_CACHE_MAGIC = b"COQPIT-CACHE\x00\x01"
+
+
+def _schema_fingerprint(cls: type) -> str:
+    """Return a hash of the fields and field types of `cls` and of its nested dataclasses."""
+    parts: list[str] = []
+    seen: set[type] = set()
+
+    def visit(field_type: Any) -> None:
+        parts.append(repr(field_type))
+        if isinstance(field_type, type) and is_dataclass(field_type) and field_type not in seen:
+            seen.add(field_type)
+            for field in fields(field_type):
+                parts.append(field.name)
+                visit(field.type)
+        for arg in typing.get_args(field_type):
+            visit(arg)
+
+    visit(cls)
+    return hashlib.sha256("\n".join(parts).encode("utf8")).hexdigest()
+
+
+def _load_cache_path(file_path: Path, cache_dir: Path | None, schema: str) -> Path:
+    """Return the cache file of `file_path`, next to it or in `cache_dir`."""
+    if cache_dir is None:
+        return file_path.with_name(f".{file_path.name}.{schema[:16]}.coqpit-cache")
+    path_hash = hashlib.sha256(str(file_path.resolve()).encode("utf8")).hexdigest()
+    return cache_dir / f"{file_path.name}.{path_hash[:16]}.{schema[:16]}.coqpit-cache"
+
+
+def _read_load_cache(cache_path: Path, key: bytes) -> dict[str, Any] | None:
+    """Return the field values stored in `cache_path`, or None if it is missing or stale."""
+    try:
+        with cache_path.open("rb") as f:
+            if f.readline() != key:
+                return None
+            values: dict[str, Any] = pickle.load(f)  # noqa: S301
+    except FileNotFoundError:
+        return None
+    except Exception:  # noqa: BLE001
+        # corrupted or written by an incompatible version, it is rebuilt
+        return None
+    return values
+
+
+def _write_load_cache(cache_path: Path, key: bytes, values: dict[str, Any]) -> None:
+    """Store `values` in `cache_path`.
+
+    The file is written to a temporary file and then renamed, so that concurrent
+    readers and writers only ever see complete cache files. Failures are ignored,
+    e.g. for read-only directories or values that cannot be pickled.
+    """
+    tmp_path = None
+    try:
+        cache_path.parent.mkdir(parents=True, exist_ok=True)
+        with tempfile.NamedTemporaryFile("wb", dir=cache_path.parent, prefix=cache_path.name, delete=False) as f:
+            tmp_path = Path(f.name)
+            f.write(key)
+            pickle.dump(values, f, protocol=pickle.HIGHEST_PROTOCOL)
+        tmp_path.replace(cache_path)
+    except (OSError, pickle.PicklingError, TypeError, AttributeError):
+        if tmp_path is not None:
+            tmp_path.unlink(missing_ok=True)
+
+
+# ---------------------------------------------------------------------------- #
+#                        Argument Parsing from `argparse`                      #
+# ---------------------------------------------------------------------------- #
+
+
+def _get_help(field: Field[Any]) -> str:
+    try:
+        return str(field.metadata["help"])
+    except KeyError:
+        return ""
+
+
+def _parse_bool(x: str) -> bool:
+    if x not in ("true", "false"):
+        msg = f' [!] Value for boolean field must be either "true" or "false". Got "{x}".'
+        raise ValueError(msg)
+    return x == "true"
+
+
+def _add_argument(  # noqa: C901, PLR0913, PLR0912, PLR0915
+    parser: argparse.ArgumentParser,
+    field_name: str,
+    field_type: FieldType,
+    field_default: Any,
+    field_default_factory: Callable[[], Any] | Literal[_MISSING_TYPE.MISSING],
+    field_help: str,
+    arg_prefix: str = "",
+    help_prefix: str = "",
+    *,
+    relaxed_parser: bool = False,
+) -> argparse.ArgumentParser:
+    """Add a new argument to the argparse parser, matching the given field."""
+    if isinstance(field_type, str):
+        msg = "Strings as type hints are not supported."
+        raise NotImplementedError(msg)
+    base_type = _drop_none_type(field_type)
+    if _is_ndarray_type(base_type) or (_is_list(base_type) and any(map(_is_ndarray_type, typing.get_args(base_type)))):
+        # NumPy arrays cannot be set from the command line
+        return parser
+    default = None
+    has_default = False
+    if field_default:
+        has_default = True
+        default = field_default
+    elif field_default_factory is not None and field_default_factory is not _MISSING:
+        has_default = True
+        default = field_default_factory()
+
+    if (
+        not has_default
+        and not _is_primitive_type(_drop_none_type(field_type))
+        and not _is_list(_drop_none_type(field_type))
+        and _parse_list_union(_drop_none_type(field_type)) is None
+        and _field_choices(_drop_none_type(field_type)) is None
+    ):
+        # aggregate types (fields with a Coqpit subclass as type) are not
+        # supported without None
+        return parser
+    arg_prefix = field_name if arg_prefix == "" else f"{arg_prefix}.{field_name}"
+    help_prefix = field_help if help_prefix == "" else f"{help_prefix} - {field_help}"
+    if _is_dict(field_type):
+        # NOTE: accept any string in json format as input to dict field.
+        parser.add_argument(
+            f"--{arg_prefix}",
+            dest=arg_prefix,
+            default=json.dumps(field_default) if field_default else None,
+            type=json.loads,
+        )
+    elif _is_list(_drop_none_type(field_type)):
+        field_args = typing.get_args(_drop_none_type(field_type))
+        if len(field_args) > 1 and not relaxed_parser:
+            msg = "Coqpit does not support multi-type hinted 'List'"
+            raise ValueError(msg)
+        if len(field_args) == 0:
+            msg = "Coqpit does not support un-hinted 'List'"
+            raise ValueError(msg)
+        list_field_type = field_args[0]
+
+        # TODO: handle list of lists
+        if _is_list(list_field_type) and relaxed_parser:
+            return parser
+
+        if not has_default or default == []:
+            if (
+                not _is_primitive_type(list_field_type)
+                and _field_choices(list_field_type) is None
+                and not relaxed_parser
+            ):
+                msg = " [!] Empty list with non primitive inner type is currently not supported."
+                raise NotImplementedError(msg)
+
+            # If the list's default value is None, the user can specify the entire list by passing multiple parameters
+            parser.add_argument(
+                f"--{arg_prefix}",
+                nargs="*",
+                default=default,
+                **_argparse_item_options(list_field_type),
+                help=f"Coqpit Field: {help_prefix}",
+            )
+        else:
+            # If a default value is defined, just enable editing the values from argparse
+            # TODO: allow inserting a new value/obj to the end of the list.
+            if not isinstance(default, list | array.array):
+                msg = f"Default value must be a list, got {default}"
+                raise TypeError(msg)
+            for idx, fv in enumerate(default):
+                parser = _add_argument(
                     parser,
                     str(idx),
                     list_field_type,
@@ -648,85 +2845,650 @@ def _add_argument(  # noqa: C901, PLR0913, PLR0912, PLR0915
     # Fields matching: _T | list[_T] ( | None)
     elif (list_field_type := _parse_list_union(_drop_none_type(field_type))) is not None:
         if not has_default or default == []:
-            if not _is_primitive_type(list_field_type) and not relaxed_parser:
+            if (
+                not _is_primitive_type(list_field_type)
+                and _field_choices(list_field_type) is None
+                and not relaxed_parser
+            ):
                 msg = " [!] Empty list with non primitive inner type is currently not supported."
                 raise NotImplementedError(msg)
 
-            # If the list's default value is None, the user can specify the entire list by passing multiple parameters
-            parser.add_argument(
-                f"--{arg_prefix}",
-                nargs="*",
-                default=default,
-                type=list_field_type,
-                help=f"Coqpit Field: {help_prefix}",
-            )
-        # If a default value is defined, just enable editing the values from argparse
-        # TODO: allow inserting a new value/obj to the end of the list.
-        elif not isinstance(default, list):
-            parser.add_argument(
-                f"--{arg_prefix}",
-                default=default,
-                type=list_field_type,
-                help=f"Coqpit Field: {help_prefix}",
-            )
-        else:
-            for idx, fv in enumerate(default):
-                parser = _add_argument(
-                    parser,
-                    str(idx),
-                    list_field_type,
-                    fv,
-                    field_default_factory,
-                    field_help="",
-                    help_prefix=f"{help_prefix} (item {idx})",
-                    arg_prefix=f"{arg_prefix}",
-                    relaxed_parser=relaxed_parser,
-                )
-    elif _is_union_and_not_simple_optional(field_type):
-        # TODO: currently I don't know how to handle Union type on argparse
-        if not relaxed_parser:
-            msg = " [!] Parsing `Union` field from argparse is not yet implemented. Please create an issue."
-            raise NotImplementedError(msg)
-    elif not _is_union(field_type) and issubclass(field_type, Coqpit):
-        if not isinstance(default, Coqpit):
-            msg = f"Default value must be a Coqpit instance, got {default}"
-            raise TypeError(msg)
-        return default.init_argparse(
-            instance=default,
-            parser=parser,
-            arg_prefix=arg_prefix,
-            help_prefix=help_prefix,
-            relaxed_parser=relaxed_parser,
-        )
-    elif field_type is bool:
+            # If the list's default value is None, the user can specify the entire list by passing multiple parameters
+            parser.add_argument(
+                f"--{arg_prefix}",
+                nargs="*",
+                default=default,
+                **_argparse_item_options(list_field_type),
+                help=f"Coqpit Field: {help_prefix}",
+            )
+        # If a default value is defined, just enable editing the values from argparse
+        # TODO: allow inserting a new value/obj to the end of the list.
+        elif not isinstance(default, list):
+            parser.add_argument(
+                f"--{arg_prefix}",
+                default=default,
+                **_argparse_item_options(list_field_type),
+                help=f"Coqpit Field: {help_prefix}",
+            )
+        else:
+            for idx, fv in enumerate(default):
+                parser = _add_argument(
+                    parser,
+                    str(idx),
+                    list_field_type,
+                    fv,
+                    field_default_factory,
+                    field_help="",
+                    help_prefix=f"{help_prefix} (item {idx})",
+                    arg_prefix=f"{arg_prefix}",
+                    relaxed_parser=relaxed_parser,
+                )
+    elif _is_union_and_not_simple_optional(field_type):
+        # TODO: currently I don't know how to handle Union type on argparse
+        if not relaxed_parser:
+            msg = " [!] Parsing `Union` field from argparse is not yet implemented. Please create an issue."
+            raise NotImplementedError(msg)
+    elif _field_choices(_drop_none_type(field_type)) is not None:
+        parser.add_argument(
+            f"--{arg_prefix}",
+            default=field_default,
+            help=f"Coqpit Field: {help_prefix}",
+            **_argparse_item_options(_drop_none_type(field_type)),
+        )
+    elif not _is_union(field_type) and issubclass(field_type, Coqpit):
+        if not isinstance(default, Coqpit):
+            msg = f"Default value must be a Coqpit instance, got {default}"
+            raise TypeError(msg)
+        return default.init_argparse(
+            instance=default,
+            parser=parser,
+            arg_prefix=arg_prefix,
+            help_prefix=help_prefix,
+            relaxed_parser=relaxed_parser,
+        )
+    elif field_type is bool:
+        parser.add_argument(
+            f"--{arg_prefix}",
+            type=_parse_bool,
+            default=field_default,
+            help=f"Coqpit Field: {help_prefix}",
+            metavar="true/false",
+        )
+    elif _is_primitive_type(_drop_none_type(field_type)):
+        base_type = _drop_none_type(field_type)
+        if _is_union(base_type):
+            raise TypeError
+        parser.add_argument(
+            f"--{arg_prefix}",
+            default=field_default,
+            type=base_type,
+            help=f"Coqpit Field: {help_prefix}",
+        )
+    elif not relaxed_parser:
+        msg = f" [!] '{field_type}' is not supported by arg_parser. Please file a bug report."
+        raise NotImplementedError(msg)
+    return parser
+
+
+# Parsers built by `Coqpit.init_argparse()` are cached as templates, see `_ArgparseTemplate`.
+_MAX_ARGPARSE_TEMPLATES = 32
+_IMMUTABLE_DEFAULT_TYPES = (str, int, float, bool, type(None))
+
+
+class _ArgumentTemplateParser(argparse.ArgumentParser):
+    """Parser the argparse templates are built with.
+
+    `Coqpit.init_argparse()` adds arguments to it directly, without going through
+    the template cache.
+    """
+
+
+def _argparse_shape(x: Any) -> Any:
+    """Return the parts of a field value that determine which arguments `_add_argument` adds.
+
+    These are the types and truthiness of all values and the lengths of all lists.
+    """
+    if isinstance(x, Coqpit):
+        return (x.__class__, *(_argparse_shape(x[name]) for name in _class_plan(type(x)).names))
+    if isinstance(x, list | array.array):
+        return (list, *(_argparse_shape(xi) for xi in x))
+    if _is_ndarray(x):
+        return (x.__class__,)
+    return (x.__class__, bool(x))
+
+
+class _ArgparseTemplate:
+    """The arguments added by `Coqpit.init_argparse()`, to add them to new parsers cheaply.
+
+    Arguments are stored as built `argparse.Action` objects together with where
+    their default value comes from, so that adding them to a parser only copies
+    the actions and sets the defaults from the current instance.
+    """
+
+    _VALUE = 0  # the value of the field
+    _JSON = 1  # the json encoded value of the field
+    _CONSTANT = 2  # a value independent of the instance
+
+    def __init__(self, parser: argparse.ArgumentParser, instance: Coqpit | None, arg_prefix: str) -> None:
+        # (action, kind, field path for _VALUE and _JSON or default value for _CONSTANT)
+        self.actions: list[tuple[argparse.Action, int, Any]] = []
+        for action in parser._actions:  # noqa: SLF001
+            if instance is not None:
+                dest = action.dest.removeprefix(f"{arg_prefix}.") if arg_prefix else action.dest
+                path = tuple(int(k) if k.isnumeric() else k for k in dest.split("."))
+                found, value = self._field_value(instance, path)
+                if found and action.default is value:
+                    self.actions.append((action, self._VALUE, path))
+                    continue
+                if found and isinstance(value, dict) and action.default == json.dumps(value):
+                    self.actions.append((action, self._JSON, path))
+                    continue
+            self.actions.append((action, self._CONSTANT, action.default))
+
+    @staticmethod
+    def _field_value(instance: Coqpit, path: tuple[str | int, ...]) -> tuple[bool, Any]:
+        value: Any = instance
+        try:
+            for k in path:
+                value = value[k]
+        except (KeyError, IndexError, TypeError):
+            return False, None
+        return True, value
+
+    def add_to(self, parser: argparse.ArgumentParser, instance: Coqpit | None) -> None:
+        """Add the arguments to `parser`, with defaults from `instance`."""
+        for action, kind, payload in self.actions:
+            if kind == self._CONSTANT or instance is None:
+                default = payload
+                if not isinstance(default, _IMMUTABLE_DEFAULT_TYPES):
+                    default = copy.deepcopy(default)
+            else:
+                default = self._field_value(instance, payload)[1]
+                if kind == self._JSON:
+                    default = json.dumps(default)
+            action_copy = object.__new__(type(action))
+            action_copy.__dict__.update(vars(action))
+            action_copy.default = default
+            parser._add_action(action_copy)  # noqa: SLF001
+
+
+# Command-line overrides without argparse, see `Coqpit.parse_overrides()`.
+_NEGATIVE_NUMBER = re.compile(r"^-\d+$|^-\d*\.\d+$")
+
+
+@dataclass(frozen=True)
+class _CliOverride:
+    """How the command-line values of a field are coerced, following `_add_argument`."""
+
+    parse_item: Callable[[str], Any]
+    # number of values: a single one, a list of them, or a single one unless the
+    # current value is a list (for `_T | list[_T]` fields)
+    nargs: Literal["one", "many", "one_or_many"]
+
+    def parse(self, values: list[str], current: Any) -> tuple[Any, list[str]]:
+        """Return the coerced value and the unused values."""
+        if self.nargs == "many" or (self.nargs == "one_or_many" and isinstance(current, list)):
+            return [self.parse_item(v) for v in values], []
+        if not values:
+            msg = "expected one argument"
+            raise ValueError(msg)
+        return self.parse_item(values[0]), values[1:]
+
+
+def _cli_item_parser(field_type: Any) -> Callable[[str], Any] | None:
+    """Return the parser of a single command-line value, as used by `_add_argument`."""
+    if field_type is bool:
+        return _parse_bool
+    if _is_primitive_type(field_type):
+        return field_type
+    if _field_choices(field_type) is not None:
+        return _choice_parser(field_type)
+    return None
+
+
+def _field_choices(field_type: Any) -> tuple[Any, ...] | None:
+    """Return the values allowed by a Literal or `enum.Enum` type, None for other types."""
+    if _is_literal_type(field_type):
+        return typing.get_args(field_type)
+    if _is_enum_type(field_type):
+        return tuple(field_type)
+    return None
+
+
+def _choice_parser(field_type: Any) -> Callable[[str], Any]:
+    """Return the parser of a command-line value of a Literal or `enum.Enum` type.
+
+    Literal values are matched by their string form. Enum members are matched by
+    name or by the string form of their value.
+    """
+    if _is_enum_type(field_type):
+        name = field_type.__name__
+        lookup = {str(member.value): member for member in field_type} | dict(field_type.__members__)
+    else:
+        name = "Literal"
+        lookup = {}
+        for value in typing.get_args(field_type):
+            lookup.setdefault(str(value), value)
+
+    def parse_choice(x: str) -> Any:
+        try:
+            return lookup[x]
+        except KeyError:
+            msg = f"{x!r} is not one of {', '.join(lookup)}"
+            raise ValueError(msg) from None
+
+    # shown by argparse in its error messages
+    parse_choice.__name__ = name
+    return parse_choice
+
+
+def _argparse_item_options(field_type: Any) -> dict[str, Any]:
+    """Return the ``type`` and ``choices`` options of the argparse arguments of `field_type` values."""
+    choices = _field_choices(field_type)
+    if choices is None:
+        return {"type": field_type}
+    options = {"type": _choice_parser(field_type), "choices": choices}
+    if _is_enum_type(field_type):
+        options["metavar"] = "{" + ",".join(field_type.__members__) + "}"
+    return options
+
+
+def _compile_cli_override(field_type: FieldType) -> _CliOverride | None:  # noqa: PLR0911
+    """Return how to override a field of type `field_type`, None if it cannot be overridden."""
+    base_type = _drop_none_type(field_type)
+    if _is_dict(field_type):
+        return _CliOverride(json.loads, "one")
+    if _is_list(base_type):
+        field_args = typing.get_args(base_type)
+        if len(field_args) == 1 and (parse_item := _cli_item_parser(field_args[0])) is not None:
+            return _CliOverride(parse_item, "many")
+        return None
+    if (list_field_type := _parse_list_union(base_type)) is not None:
+        if (parse_item := _cli_item_parser(list_field_type)) is not None:
+            return _CliOverride(parse_item, "one_or_many")
+        return None
+    if (parse_item := _cli_item_parser(base_type)) is not None:
+        return _CliOverride(parse_item, "one")
+    return None
+
+
+def _build_cli_override_index(cls: type) -> dict[str, _CliOverride]:
+    """Map the dotted paths of all overridable fields of `cls` to their `_CliOverride`.
+
+    List indices are replaced by ``#`` in the paths, e.g. ``"datasets.#.path"``.
+    """
+    index: dict[str, _CliOverride] = {}
+
+    def visit(path: str, field_type: FieldType, seen: frozenset[type]) -> None:
+        base_type = _drop_none_type(field_type)
+        if not _is_union(base_type) and isinstance(base_type, type) and issubclass(base_type, Coqpit):
+            if base_type not in seen:
+                for field in fields(base_type):
+                    visit(f"{path}.{field.name}" if path else field.name, field.type, seen | {base_type})
+            return
+        override = _compile_cli_override(field_type)
+        if override is not None:
+            index[path] = override
+        if _is_list(base_type) and len(typing.get_args(base_type)) == 1:
+            visit(f"{path}.#", typing.get_args(base_type)[0], seen)
+        elif (list_field_type := _parse_list_union(base_type)) is not None:
+            visit(f"{path}.#", list_field_type, seen)
+
+    visit("", cls, frozenset())
+    return index
+
+
+def _split_cli_args(args: list[str]) -> Iterator[tuple[str, list[str]]]:
+    """Split command-line arguments into options and their values, like argparse."""
+    i = 0
+    while i < len(args):
+        token = args[i]
+        i += 1
+        if token.startswith("--") and "=" in token:
+            option, value = token.split("=", 1)
+            yield option, [value]
+            continue
+        values = []
+        while i < len(args) and (not args[i].startswith("-") or _NEGATIVE_NUMBER.match(args[i])):
+            values.append(args[i])
+            i += 1
+        yield token, values
+
+
+def _override_target(config: Coqpit, key: str) -> tuple[Any, str | int, Any] | None:
+    """Return the object, attribute name or index and current value of the dotted `key`.
+
+    Returns None if `key` does not exist in `config`, e.g. for an out of range
+    list index or a nested config that is None.
+    """
+    obj: Any = config
+    *parents, last = key.split(".")
+    try:
+        for k in parents:
+            obj = obj[int(k)] if k.isnumeric() else getattr(obj, k)
+        if last.isnumeric():
+            return obj, int(last), obj[int(last)]
+        if not isinstance(obj, Coqpit):
+            return None
+        return obj, last, obj[last]
+    except (AttributeError, IndexError, KeyError, TypeError):
+        return None
+
+
+def _diff_values(a: Any, b: Any, path: str, changes: list[tuple[str, Any, Any]]) -> None:
+    """Append the differences between `a` and `b` to `changes`, see ``Coqpit.diff()``."""
+    if a is b:
+        return
+    if isinstance(a, Coqpit) and a.__class__ is b.__class__:
+        a_vars = vars(a)
+        b_vars = vars(b)
+        a_deferred = _deferred_fields(a)
+        b_deferred = _deferred_fields(b)
+        for name in _class_plan(type(a)).names:
+            a_lazy = a_deferred.get(name)
+            b_lazy = b_deferred.get(name)
+            a_value = a_lazy.value if isinstance(a_lazy, _SharedValue) else a_vars.get(name, _MISSING)
+            b_value = b_lazy.value if isinstance(b_lazy, _SharedValue) else b_vars.get(name, _MISSING)
+            if a_value is b_value and a_value is not _MISSING:
+                # the same value, e.g. shared by copy-on-write copies, compared without cloning it
+                continue
+            if isinstance(a_lazy, _LazyValue) and isinstance(b_lazy, _LazyValue) and a_lazy.raw == b_lazy.raw:
+                # same serialized value, compare without deserializing it
+                continue
+            _diff_values(a[name], b[name], f"{path}.{name}" if path else name, changes)
+        return
+    if isinstance(a, list) and isinstance(b, list) and len(a) == len(b):
+        for i, (ai, bi) in enumerate(zip(a, b, strict=True)):
+            _diff_values(ai, bi, f"{path}.{i}", changes)
+        return
+    if a.__class__ is b.__class__ and _values_equal(a, b):
+        return
+    changes.append((path, _serialize(a), _serialize(b)))
+
+
+def _list_item_type(field_type: Any) -> Any:
+    """Return the item type of a `list[_T]` or `_T | list[_T]` type, `Any` if unknown."""
+    if _is_list(field_type):
+        args = typing.get_args(field_type)
+        return args[0] if len(args) == 1 else Any
+    list_field_type = _parse_list_union(field_type)
+    return Any if list_field_type is None else list_field_type
+
+
+def _patch_target(config: Coqpit, path: str) -> tuple[Any, str | int, Any, _FieldPlan]:
+    """Return the object, attribute name or index and field type of the dotted `path` in `config`.
+
+    Also returns the plan of the last field of the path, which holds the value or
+    the list holding the value.
+    """
+    obj: Any = None
+    key: str | int = ""
+    value: Any = config
+    field_type: Any = type(config)
+    field_plan: Any = None
+    try:
+        for k in path.split("."):
+            obj = value
+            if isinstance(obj, list) and k.isnumeric():
+                key = int(k)
+                field_type = _list_item_type(_drop_none_type(field_type))
+            elif isinstance(obj, Coqpit) and k in (field_plans := _class_plan(type(obj)).field_plans_by_name):
+                key = k
+                field_plan = field_plans[k]
+                field_type = field_plan.field.type
+            else:
+                raise KeyError(k)  # noqa: TRY301
+            value = obj[key]
+    except (KeyError, IndexError) as e:
+        msg = f" [!] '{path}' does not exist in {type(config).__name__}."
+        raise KeyError(msg) from e
+    return obj, key, field_type, field_plan
+
+
+def _patch_decoder(key: str | int, field_type: Any, field_plan: _FieldPlan) -> Decoder:
+    """Return the decoder of a value set by ``Coqpit.apply_patch()``, see `_patch_target()`.
+
+    Fields are decoded by the decoder of their plan, list items by the one of their
+    type, following the discriminator of their field.
+    """
+    if isinstance(key, str):
+        return field_plan.decode
+    discriminator = field_plan.field.metadata.get("discriminator")
+    if discriminator is not None:
+        return _compile_tagged_decoder(field_type, discriminator)
+    return _compile_decoder(field_type)
+
+
+# Exceptions from loading a single config in bulk loaders, which report them and continue.
+_LOAD_ERRORS = (ValueError, TypeError, KeyError, FileNotFoundError)
+
+
+def _read_json_file(path: Path) -> tuple[str | OSError, float]:
+    """Read a file for `Coqpit.load_json_files()`, return its content or the error and the time taken."""
+    start = time.perf_counter()
+    try:
+        text: str | OSError = path.read_text(encoding="utf8")
+    except OSError as e:
+        text = e
+    return text, time.perf_counter() - start
+
+
+def _load_json_batch(
+    cls: type[Coqpit],
+    data: list[str | OSError],
+    *,
+    lazy: bool,
+    collect: bool,
+) -> list[tuple[Any, float]]:
+    """Load a chunk of `Coqpit.load_json_files()`, return the configs (or errors) and the time taken."""
+    results: list[tuple[Any, float]] = []
+    for text in data:
+        start = time.perf_counter()
+        try:
+            if isinstance(text, OSError):
+                raise text
+            config = cls.new_from_dict(json.loads(text), lazy=lazy)
+            config.check_constraints()
+            config.check_values()
+        except (*_LOAD_ERRORS, OSError) as e:
+            if not collect:
+                raise
+            results.append((e, time.perf_counter() - start))
+        else:
+            results.append((config, time.perf_counter() - start))
+    return results
+
+
+def _map_chunks(
+    batch: Callable[[list[Any]], list[Any]],
+    items: list[Any],
+    *,
+    workers: int | None,
+    executor: Literal["thread", "process"],
+    chunk_size: int | None,
+) -> Iterator[list[Any]]:
+    """Apply `batch` to chunks of `items` in a thread or process pool, yield the results in order.
+
+    See ``Coqpit.new_from_dicts()`` for the arguments.
+    """
+    if executor not in ("thread", "process"):
+        msg = f"Unknown executor {executor!r}, expected 'thread' or 'process'"
+        raise ValueError(msg)
+    if workers is None:
+        workers = os.cpu_count() or 1
+    if workers <= 1 or len(items) <= 1:
+        yield batch(items)
+        return
+    if chunk_size is None:
+        chunk_size = -(-len(items) // (workers * 4))
+    chunks = [items[i : i + chunk_size] for i in range(0, len(items), chunk_size)]
+    pool_class = ThreadPoolExecutor if executor == "thread" else ProcessPoolExecutor
+    with pool_class(max_workers=workers) as pool:
+        yield from pool.map(batch, chunks)
+
+
+def _new_from_dict_batch(cls: type[Coqpit], data: list[dict[str, Any]], *, lazy: bool, collect: bool) -> list[Any]:
+    """Deserialize a chunk of `Coqpit.new_from_dicts()`, in the calling process or in a worker."""
+    results: list[Any] = []
+    for item in data:
+        try:
+            results.append(cls.new_from_dict(item, lazy=lazy))
+        except _LOAD_ERRORS as e:  # noqa: PERF203
+            if not collect:
+                raise
+            results.append(e)
+    return results
+
+
+# ---------------------------------------------------------------------------- #
+#                                 Frozen configs                               #
+# ---------------------------------------------------------------------------- #
+
+
+class _FrozenDict(dict[Any, Any]):
+    """Immutable and hashable dict, used for dict values of frozen configs."""
+
+    __slots__ = ()
+
+    def _immutable(self, *_args: Any, **_kwargs: Any) -> typing.NoReturn:
+        msg = f"'{type(self).__name__}' object is immutable"
+        raise TypeError(msg)
+
+    __setitem__ = __delitem__ = __ior__ = _immutable
+    clear = pop = popitem = setdefault = update = _immutable
+
+    def __hash__(self) -> int:  # type: ignore[override]
+        return hash(frozenset(self.items()))
+
+    def __reduce__(self) -> tuple[Any, ...]:
+        return (_FrozenDict, (dict(self),))
+
+
+class FrozenCoqpit(Mapping[str, Any]):
+    """Base class of the frozen twins of Coqpit classes, see ``Coqpit.frozen()``.
+
+    Frozen configs store their fields in ``__slots__``, cannot be modified and are
+    hashable. Nested configs are frozen as well, lists are converted to tuples, dicts
+    to immutable dicts and sets to frozensets. NumPy arrays are copied to read-only
+    arrays, which are not hashable. They provide the read-only `dict` API and the
+    serialization methods of `Coqpit`.
+    """
+
+    __slots__ = ()
 
-        def parse_bool(x: str) -> bool:
-            if x not in ("true", "false"):
-                msg = f' [!] Value for boolean field must be either "true" or "false". Got "{x}".'
-                raise ValueError(msg)
-            return x == "true"
+    _coqpit_class: ClassVar[type[Serializable]]
+    _field_names: ClassVar[tuple[str, ...]]
 
-        parser.add_argument(
-            f"--{arg_prefix}",
-            type=parse_bool,
-            default=field_default,
-            help=f"Coqpit Field: {help_prefix}",
-            metavar="true/false",
-        )
-    elif _is_primitive_type(_drop_none_type(field_type)):
-        base_type = _drop_none_type(field_type)
-        if _is_union(base_type):
-            raise TypeError
-        parser.add_argument(
-            f"--{arg_prefix}",
-            default=field_default,
-            type=base_type,
-            help=f"Coqpit Field: {help_prefix}",
+    if TYPE_CHECKING:
+        # fields are only known to the generated twin classes
+
+        def __getattr__(self, name: str) -> Any:
+            """Read a field."""
+
+    def __getitem__(self, arg: str) -> Any:
+        """Access fields with ``[arg]``."""
+        if arg not in self._coqpit_class.__dataclass_fields__:
+            raise KeyError(arg)
+        return getattr(self, arg)
+
+    def __iter__(self) -> Iterator[str]:
+        """Return iterator over the field names."""
+        return iter(self._field_names)
+
+    def __len__(self) -> int:
+        """Return the number of fields."""
+        return len(self._field_names)
+
+    def __contains__(self, arg: object) -> bool:
+        """Check whether the config has a field with the given name."""
+        return arg in self._coqpit_class.__dataclass_fields__
+
+    def __reduce__(self) -> tuple[Any, ...]:
+        """Pickle the config as a mutable config, since twin classes are generated."""
+        return (_freeze, (self.thaw(),))
+
+    def serialize(self) -> dict[str, Any]:
+        """Serialize the config to a json serializable representation."""
+        return {name: _serialize_frozen(getattr(self, name)) for name in self._field_names}
+
+    def to_dict(self) -> dict[str, Any]:
+        """Convert the config to a dictionary, serializing any values."""
+        return self.serialize()
+
+    def to_json(self) -> str:
+        """Return a JSON string representation."""
+        return json.dumps(self.serialize(), indent=4)
+
+    def save_json(self, file_name: str | os.PathLike[Any]) -> None:
+        """Save the config to a json file."""
+        with Path(file_name).open("w", encoding="utf8") as f:
+            json.dump(self.serialize(), f, indent=4)
+
+    def thaw(self) -> Any:
+        """Return a mutable instance of the original class with the same values."""
+        return self._coqpit_class.deserialize_immutable(self.serialize())
+
+
+def _frozen_class(cls: type[Serializable]) -> type[FrozenCoqpit]:
+    """Generate the frozen twin of a dataclass, see ``Coqpit.frozen()``."""
+    twin = make_dataclass(
+        f"Frozen{cls.__name__}",
+        [(field.name, field.type, _frozen_field(field)) for field in fields(cls)],
+        bases=(FrozenCoqpit,),
+        namespace={"__module__": cls.__module__, "_coqpit_class": cls, "_field_names": _class_plan(cls).names},
+        frozen=True,
+        slots=True,
+    )
+    twin.__qualname__ = f"{cls.__qualname__}.frozen()"
+    return typing.cast("type[FrozenCoqpit]", twin)
+
+
+def _frozen_field(field: Field[Any]) -> Any:
+    """Return the field of a frozen twin, with the frozen default value of `field`."""
+    default_factory = field.default_factory
+    if default_factory is not _MISSING:
+        return dataclasses.field(
+            default_factory=lambda: _freeze(default_factory()),
+            kw_only=field.kw_only,
+            metadata=field.metadata,
         )
-    elif not relaxed_parser:
-        msg = f" [!] '{field_type}' is not supported by arg_parser. Please file a bug report."
-        raise NotImplementedError(msg)
-    return parser
+    default = field.default if field.default is _MISSING else _freeze(field.default)
+    return dataclasses.field(default=default, kw_only=field.kw_only, metadata=field.metadata)
+
+
+def _freeze(x: Any) -> Any:  # noqa: PLR0911
+    """Return an immutable version of a field value, see `FrozenCoqpit`."""
+    if x.__class__ in _PRIMITIVE_VALUE_TYPES or isinstance(x, Path | enum.Enum | FrozenCoqpit):
+        return x
+    if isinstance(x, Serializable):
+        plan = _class_plan(type(x))
+        return plan.frozen_class(**{name: _freeze(getattr(x, name)) for name in plan.names})
+    if isinstance(x, list | tuple | array.array):
+        if set(map(type, x)) <= _PRIMITIVE_VALUE_TYPES:
+            return tuple(x)
+        return tuple(_freeze(xi) for xi in x)
+    if isinstance(x, dict):
+        return _FrozenDict({k: _freeze(v) for k, v in x.items()})
+    if isinstance(x, set):
+        return frozenset(x)
+    if _is_ndarray(x):
+        frozen = x.copy()
+        frozen.flags.writeable = False
+        return frozen
+    return x
+
+
+def _serialize_frozen(x: Any) -> Any:
+    """Serialize a value of a frozen config, like `_serialize()` for mutable ones."""
+    if x.__class__ in _PRIMITIVE_VALUE_TYPES:
+        return x
+    if isinstance(x, FrozenCoqpit):
+        return x.serialize()
+    if isinstance(x, tuple):
+        return [_serialize_frozen(xi) for xi in x]
+    if isinstance(x, dict):
+        return {k: _serialize_frozen(v) for k, v in x.items()}
+    return _serialize(x)
 
 
 # ---------------------------------------------------------------------------- #
@@ -746,6 +3508,49 @@ class Coqpit(Serializable, CoqpitType):
     """
 
     _initialized = False
+    _custom_eq: ClassVar[bool] = True
+    _track_missing: ClassVar[bool] = True
+    _cache_serialized: ClassVar[bool] = False
+
+    def __init_subclass__(
+        cls,
+        *,
+        missing_check: Literal["assign", "access"] | None = None,
+        cache_serialized: bool | None = None,
+        **kwargs: Any,
+    ) -> None:
+        """Configure how MISSING fields are enforced and whether serialization is cached.
+
+        By default (``missing_check="assign"``) fields set to MISSING are tracked when
+        they are assigned, so that reading fields costs nothing extra. Only dataclass
+        fields are checked in this mode. With ``missing_check="access"`` every attribute
+        read is checked for the MISSING value instead, which is slower.
+
+        With ``cache_serialized=True``, ``to_dict()``, ``to_json()`` and ``save_json()``
+        keep the serialized value of every field, including nested Coqpits, and only
+        serialize again the fields that were assigned since. Lists and dicts modified
+        in place are detected by comparing their items with the cached ones. Values of
+        any other mutable type are serialized every time.
+
+        Example:
+            >>> @dataclass
+            ... class MyConfig(Coqpit, missing_check="access"):
+            ...     val_k: int = MISSING
+        """
+        super().__init_subclass__(**kwargs)
+        # the dataclass decorator, applied afterwards, only generates __eq__ if the body does not define it
+        cls._custom_eq = "__eq__" in cls.__dict__
+        if cache_serialized is not None:
+            cls._cache_serialized = cache_serialized
+        if missing_check == "access":
+            cls._track_missing = False
+            cls.__getattribute__ = _getattribute_checking_missing  # type: ignore[method-assign]
+        elif missing_check == "assign":
+            cls._track_missing = True
+            cls.__getattribute__ = object.__getattribute__  # type: ignore[method-assign]
+        elif missing_check is not None:
+            msg = f"Unknown missing_check mode: {missing_check}"
+            raise ValueError(msg)
 
     def _is_initialized(self) -> bool:
         """Check if Coqpit is initialized.
@@ -756,20 +3561,30 @@ class Coqpit(Serializable, CoqpitType):
         return "_initialized" in vars(self) and self._initialized
 
     def __post_init__(self) -> None:
-        """Check values if a check_values() method is defined."""
+        """Convert array fields, check the field constraints and the values if a check_values() method is defined."""
         self._initialized = True
+        plan = _class_plan(type(self))
+        # assigning again converts lists now that the instance is initialized
+        for name in plan.array_decoders:
+            value = getattr(self, name)
+            if value.__class__ is list:
+                setattr(self, name, value)
+        if plan.has_constraints:
+            errors: list[str] = []
+            plan.constraint_checker(self, "", errors, False)  # noqa: FBT003
+            _raise_constraint_errors(errors)
         with contextlib.suppress(AttributeError):
             self.check_values()
 
     ## `dict` API functions
 
     def __iter__(self) -> Iterator[str]:
-        """Return iterator over the Coqpit."""
-        return iter(asdict(self))
+        """Return iterator over the field names of the Coqpit."""
+        return iter(_class_plan(type(self)).names)
 
     def __len__(self) -> int:
         """Return the number of fields in the Coqpit."""
-        return len(fields(self))
+        return len(_class_plan(type(self)).names)
 
     def __setitem__(self, arg: str, value: Any) -> None:
         """Set the value for the given attribute."""
@@ -777,7 +3592,14 @@ class Coqpit(Serializable, CoqpitType):
 
     def __getitem__(self, arg: str) -> Any:
         """Access class attributes with ``[arg]``."""
-        return self.__dict__[arg]
+        try:
+            return self.__dict__[arg]
+        except KeyError:
+            if arg in _missing_fields(self):
+                return MISSING
+            if arg in _deferred_fields(self):
+                return getattr(self, arg)
+            raise
 
     def __delitem__(self, arg: str) -> None:
         """Remove an attribute."""
@@ -788,17 +3610,75 @@ class Coqpit(Serializable, CoqpitType):
 
     ## end `dict` API functions
 
-    def __getattribute__(self, arg: str) -> Any:
-        """Check if the mandatory field is defined when accessing it."""
-        value = super().__getattribute__(arg)
-        if isinstance(value, str) and value == "???":
-            msg = f" [!] MISSING field {arg} must be defined."
-            raise AttributeError(msg)
-        return value
+    if not TYPE_CHECKING:
+        # hidden from type checkers, which would otherwise accept assigning any attribute
+
+        def __setattr__(self, arg: str, value: Any) -> None:
+            """Set an attribute, keeping track of fields set to MISSING and converting lists of array fields."""
+            # array fields are converted by __post_init__ during construction
+            if (
+                (value.__class__ is list or value.__class__ is array.array)
+                and "_initialized" in self.__dict__
+                and arg in (array_decoders := _class_plan(type(self)).array_decoders)
+            ):
+                value = array_decoders[arg](value)
+            cache = self.__dict__.get(_SERIALIZED_CACHE_KEY)
+            if cache is not None:
+                cache.dirty.add(arg)
+            deferred = self.__dict__.get(_DEFERRED_FIELDS_KEY)
+            if deferred:
+                previous = deferred.pop(arg, None)
+                if previous.__class__ is _SharedValue:
+                    previous.owners -= 1
+            if value.__class__ is _SharedValue:
+                value.owners += 1
+            if (
+                value.__class__ is _LazyValue
+                or value.__class__ is _SharedValue
+                or (
+                    value.__class__ is str
+                    and value == MISSING
+                    and self._track_missing
+                    and arg in _class_plan(type(self)).field_names
+                )
+            ):
+                _defer(self, arg, value)
+                return
+            object.__setattr__(self, arg, value)
+
+        def __delattr__(self, arg: str) -> None:
+            """Delete an attribute."""
+            cache = self.__dict__.get(_SERIALIZED_CACHE_KEY)
+            if cache is not None:
+                cache.dirty.add(arg)
+            deferred = self.__dict__.get(_DEFERRED_FIELDS_KEY)
+            if deferred and arg in deferred:
+                previous = deferred.pop(arg)
+                if previous.__class__ is _SharedValue:
+                    previous.owners -= 1
+                return
+            object.__delattr__(self, arg)
+
+    def __getstate__(self) -> dict[str, Any]:
+        """Return the state to pickle or copy, without the serialization cache."""
+        if _SERIALIZED_CACHE_KEY in self.__dict__:
+            return {k: v for k, v in self.__dict__.items() if k != _SERIALIZED_CACHE_KEY}
+        return self.__dict__
+
+    def __setstate__(self, state: dict[str, Any]) -> None:
+        """Restore the instance from a pickled or copied state."""
+        self.__dict__.update(state)
+        if _DEFERRED_FIELDS_KEY in state:
+            # shallow copies must not share the deferred fields
+            self.__dict__[_DEFERRED_FIELDS_KEY] = deferred = dict(state[_DEFERRED_FIELDS_KEY])
+            for name, value in deferred.items():
+                _install_field_guard(type(self), name)
+                if value.__class__ is _SharedValue:
+                    value.owners += 1
 
     def __contains__(self, arg: object) -> bool:
-        """Check whether the Coqpit contains the given attribute."""
-        return arg in self.to_dict()
+        """Check whether the Coqpit has a field with the given name."""
+        return arg in _class_plan(type(self)).field_names
 
     def get(self, key: str, default: Any = None) -> Any:
         """Return value of the given attribute if present, otherwise the default."""
@@ -807,8 +3687,16 @@ class Coqpit(Serializable, CoqpitType):
         return default
 
     def items(self) -> ItemsView[str, Any]:
-        """Return (key, value) items of the Coqpit."""
-        return asdict(self).items()
+        """Return (key, value) items of the Coqpit.
+
+        Values are not copied, nested Coqpits are returned as they are. Use
+        ``asdict().items()`` for deep copies with nested Coqpits converted to dicts.
+        """
+        return ItemsView(self)
+
+    def asdict(self) -> dict[str, Any]:
+        """Return a deep copy of the fields as a dict, see `dataclasses.asdict()`."""
+        return asdict(self)
 
     def check_values(self) -> None:
         """Perform data validation after initialization.
@@ -816,14 +3704,89 @@ class Coqpit(Serializable, CoqpitType):
         Can be implemented in subclasses.
         """
 
+    def check_constraints(self) -> None:
+        """Check the constraints declared in the metadata of the fields, in nested Coqpits too.
+
+        Constraints are named like the arguments of ``check_argument()``: ``min_val``,
+        ``max_val``, ``enum_list``, ``is_path``, ``prerequest``, ``alternative``,
+        ``allow_none`` and ``restricted``. They are compiled into a single function
+        per class, which runs after construction, only for the fields of the new
+        Coqpit, and in nested Coqpits as well after ``load_json()``, ``parse_args()``
+        and the other methods updating the fields in place.
+
+        Raises:
+            ValueError: listing all the violations, one per line.
+
+        Example:
+            >>> @dataclass
+            ... class MyConfig(Coqpit):
+            ...     num_mels: int = field(default=80, metadata={"min_val": 10, "max_val": 2056})
+            ...     mode: str = field(default="mel", metadata={"enum_list": ["mel", "linear"]})
+        """
+        errors: list[str] = []
+        _class_plan(type(self)).constraint_checker(self, "", errors, True)  # noqa: FBT003
+        _raise_constraint_errors(errors)
+
     def has(self, arg: str) -> bool:
-        """Check whether the Coqpit has the given attribute."""
-        return any(field.name == arg for field in fields(self))
+        """Check whether the Coqpit has a field with the given name."""
+        return arg in _class_plan(type(self)).field_names
+
+    def copy(self, *, copy_on_write: bool = False) -> Self:
+        """Return a copy of the Coqpit.
 
-    def copy(self) -> Self:
-        """Return a copy of the Coqpit."""
+        By default, the copy is shallow: nested Coqpits, lists and dicts are shared
+        with the original.
+
+        Args:
+            copy_on_write: if True, nested Coqpits, lists and dicts are still shared
+                initially, but the copy clones them the first time it reads them, so
+                that changing the copy never changes the original. The original is
+                left as it is. Nested Coqpits are cloned the same way, so that only
+                the values read through the copy are cloned. Serializing or diffing
+                the Coqpits does not clone anything. Changes made in place through
+                the original are not isolated: the copy sees them if they are made
+                before it reads the field, so modify the copies rather than the
+                original.
+        """
+        if copy_on_write:
+            return typing.cast("Self", _copy_on_write(self))
         return replace(self)
 
+    def materialize(self) -> None:
+        """Deserialize all the lazy fields, including the ones of nested Coqpits.
+
+        The serialized value of untouched lazy fields is their raw input, see
+        ``new_from_dict(lazy=True)``. Once materialized, the Coqpit is serialized
+        like after an eager load: with defaults filled in, without unknown keys and
+        with coerced values. Values are validated like on first access.
+        """
+        _materialize_all(self)
+
+    @classmethod
+    def frozen(cls) -> type[FrozenCoqpit]:
+        """Return the frozen twin of the class.
+
+        The twin is a frozen dataclass with the same fields, stored in ``__slots__``.
+        Its instances, created with ``freeze()``, use less memory, are faster to read
+        and are hashable. The class is generated once per Coqpit class.
+
+        Example:
+            >>> config = MyConfig().freeze()
+            >>> isinstance(config, MyConfig.frozen())
+            True
+        """
+        return _class_plan(cls).frozen_class
+
+    def freeze(self) -> FrozenCoqpit:
+        """Return an immutable copy of the Coqpit, see ``frozen()``.
+
+        Nested Coqpits are frozen as well, lists are converted to tuples, dicts to
+        immutable dicts and sets to frozensets. ``thaw()`` converts the copy back to a
+        mutable Coqpit.
+        """
+        frozen: FrozenCoqpit = _freeze(self)
+        return frozen
+
     @overload
     def update(self, other: SupportsKeysAndGetItem[str, CoqpitNestedValue], /, **kwargs: CoqpitNestedValue) -> None: ...
     @overload
@@ -849,12 +3812,68 @@ class Coqpit(Serializable, CoqpitType):
         for key, value in kwargs.items():
             setattr(self, key, value)
 
+    def diff(self, other: Self) -> list[tuple[str, Any, Any]]:
+        """Return the differences between this Coqpit and `other`.
+
+        Both configs are compared field by field. Nested configs and lists of the
+        same length are compared item by item, other values (including dicts) as a
+        whole. Values that are the same object in both configs are skipped without
+        looking into them.
+
+        Args:
+            other: Coqpit of the same class.
+
+        Returns:
+            List of ``(path, value, other_value)`` tuples, where `path` is a dotted
+            path like ``"datasets.0.path"`` and the values are serialized like in
+            ``to_dict()``. Pass it to ``apply_patch()`` to apply the changes.
+        """
+        if type(other) is not type(self):
+            msg = f"Cannot diff {type(self).__name__} with {type(other).__name__}"
+            raise TypeError(msg)
+        changes: list[tuple[str, Any, Any]] = []
+        _diff_values(self, other, "", changes)
+        return changes
+
+    def apply_patch(self, changes: Iterable[tuple[str, Any, Any]] | Mapping[str, Any]) -> None:
+        """Set the values of dotted paths, e.g. the changes returned by ``diff()``.
+
+        Values are deserialized to the type of their field like in ``deserialize()``,
+        following the ``discriminator`` and ``array`` keys of the field metadata.
+        All values are converted before any of them is set, and ``check_values()`` is
+        called once at the end.
+
+        Args:
+            changes: ``(path, old_value, new_value)`` tuples as returned by ``diff()``,
+                or a mapping of paths to new values.
+
+        Raises:
+            KeyError: if a path does not exist.
+        """
+        items = changes.items() if isinstance(changes, Mapping) else ((path, new) for path, _, new in changes)
+        updates = []
+        for path, serialized in items:
+            obj, key, field_type, field_plan = _patch_target(self, path)
+            value = serialized
+            if value is not None and field_type is not Any and not isinstance(field_type, TypeVar):
+                value = _patch_decoder(key, field_type, field_plan)(value)
+            updates.append((obj, key, value))
+        for obj, key, value in updates:
+            if isinstance(key, int):
+                obj[key] = value
+            else:
+                setattr(obj, key, value)
+        self.check_constraints()
+        self.check_values()
+
     def pprint(self) -> None:
         """Print Coqpit fields in a format."""
         pprint(asdict(self))  # noqa: T203
 
     def to_dict(self) -> dict[str, Any]:
         """Convert the Coqpit to a dictionary, serializing any values."""
+        if self._cache_serialized and _is_cacheable_coqpit(self):
+            return _export_serialized(_serialized_cache(self))
         return self.serialize()
 
     def from_dict(self, data: dict[str, Any]) -> None:
@@ -862,14 +3881,206 @@ class Coqpit(Serializable, CoqpitType):
         self.deserialize(data)
 
     @classmethod
-    def new_from_dict(cls, data: dict[str, Any]) -> Self:
-        """Create a new Coqpit from a dictionary."""
+    def new_from_dict(cls, data: dict[str, Any], *, lazy: bool = False) -> Self:
+        """Create a new Coqpit from a dictionary.
+
+        Args:
+            data: dictionary of serialized fields, e.g. from ``to_dict()``.
+            lazy: if True, fields holding nested configs (or lists of them) keep
+                their serialized value and are only deserialized and validated when
+                they are first accessed. Serializing the config copies the
+                serialized value of untouched fields without deserializing them,
+                see ``materialize()``.
+        """
+        if lazy:
+            return cls.deserialize_immutable(data, lazy=True)
         return cls.deserialize_immutable(data)
 
+    @overload
+    @classmethod
+    def new_from_dicts(
+        cls,
+        data: Iterable[dict[str, Any]],
+        *,
+        workers: int | None = ...,
+        executor: Literal["thread", "process"] = ...,
+        chunk_size: int | None = ...,
+        lazy: bool = ...,
+        errors: Literal["raise"] = ...,
+    ) -> list[Self]: ...
+
+    @overload
+    @classmethod
+    def new_from_dicts(
+        cls,
+        data: Iterable[dict[str, Any]],
+        *,
+        workers: int | None = ...,
+        executor: Literal["thread", "process"] = ...,
+        chunk_size: int | None = ...,
+        lazy: bool = ...,
+        errors: Literal["collect"],
+    ) -> list[Self | Exception]: ...
+
+    @classmethod
+    def new_from_dicts(  # noqa: PLR0913
+        cls,
+        data: Iterable[dict[str, Any]],
+        *,
+        workers: int | None = 1,
+        executor: Literal["thread", "process"] = "thread",
+        chunk_size: int | None = None,
+        lazy: bool = False,
+        errors: Literal["raise", "collect"] = "raise",
+    ) -> list[Self] | list[Self | Exception]:
+        """Create new Coqpits from many dictionaries, see ``new_from_dict()``.
+
+        The input is split into chunks that are deserialized by a pool of `workers`
+        threads or processes. Each worker builds the deserialization plan of the
+        class once and reuses it for all its chunks. With processes, the class must
+        be importable by the workers and the results are pickled back to the caller.
+
+        Args:
+            data: dictionaries of serialized fields.
+            workers: number of threads or processes. Defaults to 1, where the
+                dictionaries are deserialized in the calling thread. None uses
+                ``os.cpu_count()`` workers.
+            executor: ``"thread"`` or ``"process"`` pool.
+            chunk_size: number of dictionaries sent to a worker at once. By default
+                the input is split into 4 chunks per worker.
+            lazy: deserialize nested configs lazily, see ``new_from_dict()``.
+            errors: ``"raise"`` to raise the first error, ``"collect"`` to return
+                the exception in place of each config that cannot be loaded.
+
+        Returns:
+            The new Coqpits (or exceptions), in the order of `data`.
+        """
+        batch = functools.partial(_new_from_dict_batch, cls, lazy=lazy, collect=errors == "collect")
+        chunks = _map_chunks(batch, list(data), workers=workers, executor=executor, chunk_size=chunk_size)
+        return [config for chunk in chunks for config in chunk]
+
+    @overload
+    @classmethod
+    def load_json_files(
+        cls,
+        source: str | os.PathLike[Any],
+        *,
+        pattern: str = ...,
+        io_workers: int = ...,
+        workers: int | None = ...,
+        executor: Literal["thread", "process"] = ...,
+        lazy: bool = ...,
+        errors: Literal["raise"] = ...,
+        progress: Callable[[Path, float, float], None] | None = ...,
+    ) -> dict[Path, Self]: ...
+
+    @overload
+    @classmethod
+    def load_json_files(
+        cls,
+        source: str | os.PathLike[Any],
+        *,
+        pattern: str = ...,
+        io_workers: int = ...,
+        workers: int | None = ...,
+        executor: Literal["thread", "process"] = ...,
+        lazy: bool = ...,
+        errors: Literal["collect"],
+        progress: Callable[[Path, float, float], None] | None = ...,
+    ) -> dict[Path, Self | Exception]: ...
+
+    @classmethod
+    def load_json_files(  # noqa: PLR0913
+        cls,
+        source: str | os.PathLike[Any],
+        *,
+        pattern: str = "**/config.json",
+        io_workers: int = 16,
+        workers: int | None = 1,
+        executor: Literal["thread", "process"] = "thread",
+        lazy: bool = False,
+        errors: Literal["raise", "collect"] = "raise",
+        progress: Callable[[Path, float, float], None] | None = None,
+    ) -> dict[Path, Self] | dict[Path, Self | Exception]:
+        """Load many json files, e.g. all the configs of a directory tree.
+
+        Files are read concurrently by `io_workers` threads, then parsed and
+        deserialized in chunks like in ``new_from_dicts()``. Each config is
+        validated with ``check_constraints()`` and ``check_values()``, like in
+        ``load_json()``.
+
+        Args:
+            source: a directory, searched with `pattern`, or a glob pattern like
+                ``"runs/*/config.json"``. ``**`` matches any number of directories.
+            pattern: glob pattern of the files to load in a `source` directory.
+            io_workers: number of threads reading the files.
+            workers: number of workers deserializing the files, see ``new_from_dicts()``.
+            executor: ``"thread"`` or ``"process"`` pool, see ``new_from_dicts()``.
+            lazy: deserialize nested configs lazily, see ``new_from_dict()``.
+            errors: ``"raise"`` to raise the first error, ``"collect"`` to return
+                the exception in place of each config that cannot be loaded.
+            progress: called for every file, in order, once it is loaded, with the
+                path, the seconds spent reading it and the seconds spent parsing,
+                deserializing and checking it.
+
+        Returns:
+            The new Coqpits (or exceptions), by path, sorted by path.
+        """
+        source_path = Path(source)
+        if source_path.is_dir():
+            paths = sorted(source_path.glob(pattern))
+        else:
+            paths = sorted(Path(p) for p in glob.glob(str(source), recursive=True))  # noqa: PTH207
+        paths = [p for p in paths if not p.is_dir()]
+        with ThreadPoolExecutor(max_workers=max(io_workers, 1)) as pool:
+            reads = list(pool.map(_read_json_file, paths))
+        batch = functools.partial(_load_json_batch, cls, lazy=lazy, collect=errors == "collect")
+        texts = [text for text, _ in reads]
+        chunks = _map_chunks(batch, texts, workers=workers, executor=executor, chunk_size=None)
+        results = {}
+        loaded = ((config, seconds) for chunk in chunks for config, seconds in chunk)
+        for path, (_, read_seconds), (config, load_seconds) in zip(paths, reads, loaded, strict=True):
+            results[path] = config
+            if progress is not None:
+                progress(path, read_seconds, load_seconds)
+        return results
+
     def to_json(self) -> str:
         """Return a JSON string representation."""
+        if self._cache_serialized and _is_cacheable_coqpit(self):
+            return _serialized_json(_serialized_cache(self))
         return json.dumps(self.to_dict(), indent=4)
 
+    def fingerprint(self) -> str:
+        """Return a stable hash of the field values.
+
+        The hash is the SHA-256 hex digest of a canonical JSON encoding of the
+        serialized fields: keys are sorted, floats with an integral value are encoded
+        as ints and paths as strings. Fields declared with
+        ``field(metadata={"fingerprint": False})``, e.g. output paths, are left out.
+
+        The encoding of every nested Coqpit is cached and only computed again when
+        one of its fields changes, like the cache enabled by ``cache_serialized=True``.
+        Lazy fields are deserialized first, like with ``materialize()``, so that the
+        hash does not depend on how the Coqpit was loaded.
+
+        Example:
+            >>> @dataclass
+            ... class MyConfig(Coqpit):
+            ...     lr: float = 0.1
+            ...     output_path: str = field(default="out", metadata={"fingerprint": False})
+            >>> MyConfig().fingerprint() == MyConfig(output_path="other").fingerprint()
+            True
+        """
+        if not _is_cacheable_coqpit(self):
+            _materialize_all(self)
+            return hashlib.sha256(_canonical_json(self.serialize()).encode()).hexdigest()
+        text = _canonical_text(self, refresh=True)
+        cache = _current_cache(self)
+        if cache.digest is None:
+            cache.digest = hashlib.sha256(text.encode()).hexdigest()
+        return cache.digest
+
     def save_json(self, file_name: str | os.PathLike[Any]) -> None:
         """Save Coqpit to a json file.
 
@@ -877,25 +4088,199 @@ class Coqpit(Serializable, CoqpitType):
             file_name (str): path to the output json file.
         """
         with Path(file_name).open("w", encoding="utf8") as f:
-            json.dump(self.to_dict(), f, indent=4)
+            if self._cache_serialized and _is_cacheable_coqpit(self):
+                f.write(_serialized_json(_serialized_cache(self)))
+            else:
+                json.dump(self.to_dict(), f, indent=4)
 
-    def load_json(self, file_name: str | os.PathLike[Any]) -> None:
+    def load_json(
+        self,
+        file_name: str | os.PathLike[Any],
+        *,
+        lazy: bool = False,
+        cache: bool | str | os.PathLike[Any] = False,
+    ) -> None:
         """Load a json file and update matching config fields with type checking.
 
         Non-matching parameters in the json file are ignored.
 
         Args:
             file_name (str): path to the json file.
+            lazy (bool): deserialize nested configs only when they are first
+                accessed, see ``new_from_dict()``.
+            cache (bool | str | os.PathLike): if True, store the deserialized and
+                validated fields in a hidden file next to the json file, if a path,
+                store them in that directory. Later loads of the same file read the
+                cache instead of parsing and deserializing the json file. Cache files
+                are keyed on the size, modification time and content hash of the
+                json file and on the fields and field types of the class, and are
+                rebuilt automatically when any of them changes. Cache files are
+                loaded with pickle, so the cache location must not be writable by
+                untrusted users.
 
         Returns:
             Coqpit: new Coqpit with updated config fields.
         """
+        if cache is not False:
+            cache_dir = None if isinstance(cache, bool) else Path(cache)
+            self._load_json_cached(Path(file_name), cache_dir, lazy=lazy)
+            return
         with Path(file_name).open(encoding="utf8") as f:
             input_str = f.read()
             dump_dict = json.loads(input_str)
-        self.deserialize(dump_dict)
+        if lazy:
+            self.deserialize(dump_dict, lazy=True)
+        else:
+            self.deserialize(dump_dict)
+        self.check_constraints()
         self.check_values()
 
+    def _load_json_cached(self, file_path: Path, cache_dir: Path | None, *, lazy: bool) -> None:
+        """Implement ``load_json()`` with a cache of the deserialized fields."""
+        data = file_path.read_bytes()
+        schema = _class_plan(type(self)).schema_fingerprint
+        key = {
+            "size": len(data),
+            "mtime_ns": file_path.stat().st_mtime_ns,
+            "sha256": hashlib.sha256(data).hexdigest(),
+            "schema": schema,
+            "lazy": lazy,
+        }
+        key_line = _LOAD_CACHE_MAGIC + json.dumps(key, sort_keys=True).encode("utf8") + b"\n"
+        cache_path = _load_cache_path(file_path, cache_dir, schema)
+        values = _read_load_cache(cache_path, key_line)
+        if values is not None:
+            for k, v in values.items():
+                setattr(self, k, v)
+            self.check_constraints()
+            self.check_values()
+            return
+
+        dump_dict = json.loads(data)
+        self.deserialize(dump_dict, lazy=lazy)
+        self.check_constraints()
+        self.check_values()
+        deferred = _deferred_fields(self)
+        instance_vars = vars(self)
+        values = {
+            name: deferred[name] if name in deferred else instance_vars[name]
+            for name in _class_plan(type(self)).names
+            if name in dump_dict
+        }
+        _write_load_cache(cache_path, key_line, values)
+
+    def to_binary(self) -> bytes:
+        """Return a compact binary representation.
+
+        The snapshot holds the same values as ``to_dict()``. Long lists of numbers or
+        strings are stored as packed arrays and repeated strings and dict keys are
+        stored only once, which makes it smaller and faster to load than JSON.
+        """
+        return _encode_binary(self)
+
+    @classmethod
+    def new_from_binary(cls, data: bytes, *, lazy: bool = False) -> Self:
+        """Create a new Coqpit from a binary representation returned by ``to_binary()``.
+
+        NumPy arrays are not copied: they are read-only views of `data`.
+
+        Args:
+            data: binary snapshot.
+            lazy: deserialize nested configs lazily, see ``new_from_dict()``.
+        """
+        return cls.new_from_dict(_decode_binary(data), lazy=lazy)
+
+    def save_binary(self, file_name: str | os.PathLike[Any]) -> None:
+        """Save Coqpit to a binary snapshot file, see ``to_binary()``.
+
+        Args:
+            file_name (str): path to the output file.
+        """
+        Path(file_name).write_bytes(self.to_binary())
+
+    def load_binary(self, file_name: str | os.PathLike[Any], *, lazy: bool = False) -> None:
+        """Load a binary snapshot file and update matching config fields with type checking.
+
+        This is the binary counterpart of ``load_json()``.
+
+        Args:
+            file_name (str): path to a file written by ``save_binary()``.
+            lazy (bool): deserialize nested configs only when they are first
+                accessed, see ``new_from_dict()``.
+        """
+        dump_dict = _decode_binary(Path(file_name).read_bytes())
+        if lazy:
+            self.deserialize(dump_dict, lazy=True)
+        else:
+            self.deserialize(dump_dict)
+        self.check_constraints()
+        self.check_values()
+
+    @classmethod
+    def iter_from_jsonl(
+        cls,
+        file_name: str | os.PathLike[Any],
+        *,
+        lazy: bool = False,
+        on_error: Callable[[int, Exception], None] | None = None,
+    ) -> Iterator[Self]:
+        """Create new Coqpits from a JSON Lines file, one per line.
+
+        The file is read line by line, so memory use does not grow with the file size.
+        Empty lines are skipped.
+
+        Args:
+            file_name: path to the file, with one ``to_dict()`` payload per line.
+            lazy: deserialize nested configs lazily, see ``new_from_dict()``.
+            on_error: called with the (1-based) line number and the exception for
+                every line that cannot be loaded, after which the line is skipped.
+                By default a warning is emitted instead.
+
+        Yields:
+            A new Coqpit for every line that could be loaded.
+        """
+        with Path(file_name).open(encoding="utf8") as f:
+            for line_number, line in enumerate(f, start=1):
+                if not line.strip():
+                    continue
+                try:
+                    config = cls.new_from_dict(json.loads(line), lazy=lazy)
+                except _LOAD_ERRORS as e:
+                    if on_error is None:
+                        warnings.warn(f"Failed to load line {line_number} of {file_name}: {e}", stacklevel=2)
+                    else:
+                        on_error(line_number, e)
+                    continue
+                yield config
+
+    @classmethod
+    def write_jsonl(
+        cls,
+        file_name: str | os.PathLike[Any],
+        configs: Iterable[Coqpit],
+        *,
+        append: bool = False,
+    ) -> int:
+        """Write Coqpits to a JSON Lines file, one ``to_dict()`` payload per line.
+
+        Configs are serialized and written one at a time, so `configs` can be a generator.
+
+        Args:
+            file_name: path to the output file.
+            configs: configs to write.
+            append: append to the file instead of overwriting it.
+
+        Returns:
+            Number of written configs.
+        """
+        count = 0
+        with Path(file_name).open("a" if append else "w", encoding="utf8") as f:
+            for config in configs:
+                f.write(json.dumps(config.to_dict()))
+                f.write("\n")
+                count += 1
+        return count
+
     @classmethod
     def init_from_argparse(
         cls,
@@ -987,6 +4372,7 @@ class Coqpit(Serializable, CoqpitType):
 
             _rsetattr(self, k, v)
 
+        self.check_constraints()
         self.check_values()
 
     def parse_known_args(
@@ -1027,6 +4413,59 @@ class Coqpit(Serializable, CoqpitType):
         self.parse_args(args, arg_prefix=arg_prefix)
         return unknown
 
+    def parse_overrides(self, args: list[str] | None = None, arg_prefix: str = "coqpit") -> list[str]:
+        """Update config values from ``--coqpit.a.b.0.c value`` command-line arguments.
+
+        This is a fast alternative to ``parse_known_args()`` that does not build an
+        argparse parser. Keys are looked up in an index of the field paths of the
+        class and values are converted like in ``init_argparse()``: booleans must be
+        ``true`` or ``false``, dicts are parsed as json and list fields take all the
+        following values. ``check_values()`` is called once, after all values are set.
+
+        Args:
+            args (list of str, optional): command line parameters. Defaults to
+              ``sys.argv[1:]``.
+            arg_prefix: prefix of the CLI parameters.
+
+        Returns:
+            List of unknown parameters, with their values, like ``parse_known_args()``.
+
+        Raises:
+            ValueError: if a value cannot be converted to the type of its field.
+        """
+        if args is None:
+            args = sys.argv[1:]
+        option_prefix = f"--{arg_prefix}." if arg_prefix else "--"
+        index = _class_plan(type(self)).cli_overrides
+        updates: list[tuple[Any, str | int, Any]] = []
+        unknown: list[str] = []
+        for option, values in _split_cli_args(args):
+            key = option.removeprefix(option_prefix)
+            override = None
+            if option.startswith(option_prefix):
+                override = index.get(".".join("#" if k.isnumeric() else k for k in key.split(".")))
+            target = _override_target(self, key) if override is not None else None
+            if override is None or target is None:
+                unknown.append(option)
+                unknown.extend(values)
+                continue
+            obj, name, current = target
+            try:
+                value, extra = override.parse(values, current)
+            except ValueError as e:
+                msg = f" [!] Invalid value for '{key}': {values}. {e}"
+                raise ValueError(msg) from e
+            updates.append((obj, name, value))
+            unknown.extend(extra)
+        for obj, name, value in updates:
+            if isinstance(name, int):
+                obj[name] = value
+            else:
+                setattr(obj, name, value)
+        self.check_constraints()
+        self.check_values()
+        return unknown
+
     @classmethod
     def init_argparse(
         cls,
@@ -1041,6 +4480,12 @@ class Coqpit(Serializable, CoqpitType):
 
         This allows to edit values through command-line.
 
+        The arguments are built once per class, `arg_prefix`, `help_prefix` and
+        `relaxed_parser` and reused afterwards. With an `instance`, they are also
+        built once per number of list items, and only the default values are
+        taken from the instance on later calls. Call ``invalidate_plan()`` after
+        changing the class attributes of a class to rebuild them.
+
         Args:
             instance (Coqpit, optional): instance of the given Coqpit class
                                          to initialize any default values.
@@ -1056,14 +4501,42 @@ class Coqpit(Serializable, CoqpitType):
         Returns:
             argparse.ArgumentParser: parser instance with the new arguments.
         """
+        if isinstance(parser, _ArgumentTemplateParser):
+            return cls._add_arguments(parser, instance, arg_prefix, help_prefix, relaxed_parser=relaxed_parser)
         if not parser:
             parser = argparse.ArgumentParser()
+        shape = None if instance is None else _argparse_shape(instance)
+        key = (arg_prefix, help_prefix, relaxed_parser, shape)
+        templates = _class_plan(cls).argparse_templates
+        template = templates.get(key)
+        if template is None:
+            template_parser = _ArgumentTemplateParser(add_help=False)
+            cls._add_arguments(template_parser, instance, arg_prefix, help_prefix, relaxed_parser=relaxed_parser)
+            template = _ArgparseTemplate(template_parser, instance, arg_prefix)
+            if len(templates) >= _MAX_ARGPARSE_TEMPLATES:
+                templates.clear()
+            templates[key] = template
+        template.add_to(parser, instance)
+        return parser
+
+    @classmethod
+    def _add_arguments(
+        cls,
+        parser: argparse.ArgumentParser,
+        instance: Self | None,
+        arg_prefix: str,
+        help_prefix: str,
+        *,
+        relaxed_parser: bool,
+    ) -> argparse.ArgumentParser:
+        """Add the arguments of all fields to `parser`, see ``init_argparse()``."""
         cls_or_instance = cls if instance is None else instance
         class_fields = fields(cls_or_instance)
+        current_values = _raw_vars(cls_or_instance)
         for field in class_fields:
             # use the current value of the field to prevent dropping the current value,
             # else use the default value of the field
-            field_default = vars(cls_or_instance).get(
+            field_default = current_values.get(
                 field.name,
                 field.default if field.default is not _MISSING else None,
             )
@@ -1086,11 +4559,11 @@ class Coqpit(Serializable, CoqpitType):
 
 def check_argument(  # noqa: C901, PLR0913
     name: str,
-    c: dict[str, Any],
+    c: Mapping[str, Any],
     *,
     is_path: bool = False,
     prerequest: list[str] | str | None = None,
-    enum_list: list[Any] | None = None,
+    enum_list: Collection[Any] | None = None,
     max_val: float | None = None,
     min_val: float | None = None,
     restricted: bool = False,
@@ -1103,11 +4576,12 @@ def check_argument(  # noqa: C901, PLR0913
 
     Args:
         name (str): name of the field to be checked.
-        c (dict): config dictionary.
+        c (dict): config dictionary or Coqpit.
         is_path (bool, optional): if ```True``` check if the path is exist. Defaults to False.
         prerequest (list or str, optional): a list of field name that are prerequestedby the target field name.
             Defaults to ```[]```.
-        enum_list (list, optional): list of possible values for the target field. Defaults to None.
+        enum_list (collection, optional): possible values for the target field, compared with its
+            lowercased value. Pass a set for constant-time lookups in large lists. Defaults to None.
         max_val (float, optional): maximum possible value for the target field. Defaults to None.
         min_val (float, optional): minimum possible value for the target field. Defaults to None.
         restricted (bool, optional): if ```True``` the target field has to be defined. Defaults to False.
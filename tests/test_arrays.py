@@ -0,0 +1,104 @@
+import array
+import copy
+import json
+import pickle
+from dataclasses import dataclass, field
+
+import pytest
+
+from coqpit import Coqpit
+from coqpit.coqpit import _decode_binary, _encode_binary
+
+
+@dataclass
+class FeatureConfig(Coqpit):
+    mean: list[float] = field(default_factory=lambda: [0.5, 1.5], metadata={"array": True})
+    counts: list[int] | None = field(default=None, metadata={"array": "i"})
+    names: list[str] = field(default_factory=list)
+
+
+def test_arrays_are_decoded_and_serialized() -> None:
+    mean = [i / 3 for i in range(100)]
+    data = {"mean": mean, "counts": list(range(100)), "names": ["a"]}
+    config = FeatureConfig.new_from_dict(data)
+    assert config.mean == array.array("d", mean)
+    assert config.counts == array.array("i", range(100))
+    assert config.to_dict() == data
+    assert json.loads(config.to_json()) == data
+    assert FeatureConfig.new_from_dict(config.to_dict()) == config
+    assert FeatureConfig.new_from_dict({"counts": None}).counts is None
+
+    # defaults and values given to the constructor are converted too
+    assert FeatureConfig().mean == array.array("d", [0.5, 1.5])
+    assert FeatureConfig(counts=[1]).counts == array.array("i", [1])
+    assert FeatureConfig() == FeatureConfig.new_from_dict({})
+    assert FeatureConfig.new_from_dict(data).freeze().mean == tuple(mean)
+
+    config.validate()
+    config.validate(single_pass=True)
+    for config_copy in (copy.copy(config), copy.deepcopy(config), pickle.loads(pickle.dumps(config))):  # noqa: S301
+        assert config_copy == config
+    assert FeatureConfig.new_from_binary(config.to_binary()) == config
+    assert _decode_binary(_encode_binary(array.array("d", [1.5] * 3))) == [1.5] * 3
+    assert _decode_binary(_encode_binary(array.array("b", [1] * 30))) == [1] * 30
+
+
+def test_array_errors() -> None:
+    with pytest.raises(TypeError, match="must be real number"):
+        FeatureConfig.new_from_dict({"mean": ["a"]})
+    with pytest.raises(TypeError, match="greater than maximum"):
+        FeatureConfig.new_from_dict({"counts": [2**40]})
+    with pytest.raises(TypeError, match="cannot be interpreted as an integer"):
+        FeatureConfig.new_from_dict({"counts": [1.5]})
+
+    @dataclass
+    class NamesConfig(Coqpit):
+        names: list[str] = field(default_factory=list, metadata={"array": True})
+
+    with pytest.raises(TypeError, match="only supported for list"):
+        NamesConfig.new_from_dict({})
+
+    @dataclass
+    class TypecodeConfig(Coqpit):
+        mean: list[float] = field(default_factory=list, metadata={"array": "q"})
+
+    with pytest.raises(TypeError, match="typecode 'q' does not match"):
+        TypecodeConfig.new_from_dict({})
+
+
+def test_arrays_with_argparse() -> None:
+    config = FeatureConfig.new_from_dict({"mean": [1.0, 2.0], "counts": [1, 2]})
+    config.parse_args(["--coqpit.mean.0", "3", "--coqpit.counts.1", "5"])
+    assert config.mean == array.array("d", [3.0, 2.0])
+    assert config.counts == array.array("i", [1, 5])
+
+
+def _assert_arrays(config: FeatureConfig) -> None:
+    assert isinstance(config.mean, array.array)
+    assert config.mean.typecode == "d"
+    assert isinstance(config.counts, array.array)
+    assert config.counts.typecode == "i"
+
+
+def test_array_storage_after_updates() -> None:
+    config = FeatureConfig(counts=[1, 2])
+    _assert_arrays(config)
+    config.validate()
+    config.validate(single_pass=True)
+    assert FeatureConfig.new_from_dict(config.to_dict()) == config
+
+    config.mean = [3.0]
+    config.counts = array.array("q", [3])  # type: ignore[assignment]
+    _assert_arrays(config)
+    config.apply_patch({"mean": [1.0, 2.0], "counts": [4]})
+    _assert_arrays(config)
+    assert config.parse_overrides(["--coqpit.mean", "5", "6", "--coqpit.counts", "7"]) == []
+    assert list(config.mean) == [5.0, 6.0]
+    _assert_arrays(config)
+    config.parse_known_args(["--coqpit.mean.0", "8", "--coqpit.counts.0", "9"])
+    assert list(config.mean) == [8.0, 6.0]
+    _assert_arrays(config)
+    config = FeatureConfig.init_from_argparse(["--coqpit.mean.1", "4", "--coqpit.counts", "1", "2"])
+    assert list(config.mean) == [0.5, 4.0]
+    _assert_arrays(config)
+    config.validate()
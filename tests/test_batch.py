@@ -0,0 +1,96 @@
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Literal
+
+import pytest
+
+from coqpit import Coqpit
+
+
+@dataclass
+class Person(Coqpit):
+    name: str = "Eren"
+    age: int = 11
+
+
+@dataclass
+class Group(Coqpit):
+    size: int = 3
+    people: list[Person] = field(default_factory=lambda: [Person()])
+
+
+def _data(n: int) -> list[dict[str, object]]:
+    return [{"size": i, "people": [{"age": i}]} for i in range(n)]
+
+
+@pytest.mark.parametrize(("workers", "executor"), [(1, "thread"), (3, "thread"), (2, "process")])
+def test_new_from_dicts(workers: int, executor: Literal["thread", "process"]) -> None:
+    data = _data(50)
+    configs = Group.new_from_dicts(iter(data), workers=workers, executor=executor)
+    assert configs == [Group.new_from_dict(d) for d in data]
+    assert Group.new_from_dicts(data, workers=workers, executor=executor, chunk_size=7) == configs
+    lazy_configs = Group.new_from_dicts(data, workers=workers, executor=executor, lazy=True)
+    assert [c.to_dict() for c in lazy_configs] == data
+
+
+@pytest.mark.parametrize(("workers", "executor"), [(1, "thread"), (2, "thread"), (2, "process")])
+def test_new_from_dicts_errors(workers: int, executor: Literal["thread", "process"]) -> None:
+    data = _data(10)
+    data[3] = {"size": "a"}
+    data[7] = {"people": 1}
+    with pytest.raises(TypeError):
+        Group.new_from_dicts(data, workers=workers, executor=executor)
+
+    results = Group.new_from_dicts(data, workers=workers, executor=executor, errors="collect")
+    assert len(results) == 10
+    assert [i for i, r in enumerate(results) if isinstance(r, Exception)] == [3, 7]
+    assert results[0] == Group(size=0, people=[Person(age=0)])
+
+
+def test_new_from_dicts_invalid_executor() -> None:
+    with pytest.raises(ValueError, match="Unknown executor"):
+        Group.new_from_dicts([], executor="fork")  # type: ignore[call-overload]
+
+
+def _write_tree(root: Path) -> list[Path]:
+    paths = []
+    for i in range(6):
+        path = root / f"run_{i}" / "config.json"
+        path.parent.mkdir(parents=True)
+        Group(size=i).save_json(path)
+        paths.append(path)
+    return paths
+
+
+@pytest.mark.parametrize(("workers", "executor"), [(1, "thread"), (2, "thread"), (2, "process")])
+def test_load_json_files(tmp_path: Path, workers: int, executor: Literal["thread", "process"]) -> None:
+    paths = _write_tree(tmp_path)
+    (tmp_path / "run_0" / "other.json").write_text("{}")
+    timings: list[tuple[Path, float, float]] = []
+    configs = Group.load_json_files(
+        tmp_path,
+        workers=workers,
+        executor=executor,
+        progress=lambda path, read, load: timings.append((path, read, load)),
+    )
+    assert configs == {path: Group(size=i) for i, path in enumerate(paths)}
+    assert [path for path, _, _ in timings] == paths
+    assert all(read >= 0 and load >= 0 for _, read, load in timings)
+
+    configs = Group.load_json_files(f"{tmp_path}/run_[12]/*.json", workers=workers, executor=executor)
+    assert list(configs) == paths[1:3]
+    assert len(Group.load_json_files(tmp_path, pattern="*/*.json")) == 7
+
+
+def test_load_json_files_errors(tmp_path: Path) -> None:
+    paths = _write_tree(tmp_path)
+    paths[1].write_text("not json")
+    paths[2].write_text('{"size": 0, "people": 1}')
+    with pytest.raises(ValueError, match="Expecting value"):
+        Group.load_json_files(tmp_path)
+
+    configs = Group.load_json_files(tmp_path, errors="collect", workers=2)
+    assert [path for path, config in configs.items() if isinstance(config, Exception)] == paths[1:3]
+    assert isinstance(configs[paths[1]], ValueError)
+    assert isinstance(configs[paths[2]], TypeError)
+    assert configs[paths[0]] == Group(size=0)
@@ -0,0 +1,87 @@
+from dataclasses import dataclass, field
+from pathlib import Path
+
+import pytest
+
+from coqpit import MISSING, Coqpit
+from coqpit.coqpit import _decode_binary, _deferred_fields, _encode_binary
+
+
+@dataclass
+class Person(Coqpit):
+    name: str = "Eren"
+    age: int = 11
+
+
+@dataclass
+class Group(Coqpit):
+    size: int = 3
+    lead: Person | None = field(default_factory=Person)
+    people: list[Person] = field(default_factory=lambda: [Person(age=i) for i in range(3)])
+    tokens: list[str] = field(default_factory=lambda: [f"t{i}" for i in range(10)])
+    weights: list[float] = field(default_factory=lambda: [i / 3 for i in range(10)])
+    ids: list[int] = field(default_factory=lambda: list(range(-5, 5)))
+    speakers: dict[str, int] = field(default_factory=lambda: {"a": 1, "b": 2})
+    path: Path = field(default_factory=lambda: Path("data"))
+    val_k: int = MISSING
+
+
+@pytest.mark.parametrize(
+    "value",
+    [
+        None,
+        True,
+        [False] * 10,
+        -(2**63),
+        2**70,
+        [2**70] * 10,
+        1.5,
+        "é",
+        ["a\0b"] * 10,
+        ["x", "y"] * 5,
+        [1, 2.0] * 5,
+        {"a": {"a": 1}, "b": [{"a": 2}]},
+        {1: "a", None: "b"},
+    ],
+)
+def test_binary_values(value: object) -> None:
+    decoded = _decode_binary(_encode_binary(value))
+    assert decoded == value
+    assert type(decoded) is type(value)
+
+
+def test_binary_round_trip(tmp_path: Path) -> None:
+    group = Group(val_k=1, lead=None)
+    data = group.to_binary()
+    assert _decode_binary(data) == {**group.to_dict(), "path": "data"}
+    assert Group.new_from_binary(data) == group
+    assert len(data) < len(group.to_json())
+
+    file_path = tmp_path / "config.bin"
+    group.save_binary(file_path)
+    loaded = Group()
+    loaded.load_binary(file_path)
+    assert loaded == group
+
+    loaded = Group()
+    loaded.load_binary(file_path, lazy=True)
+    assert set(_deferred_fields(loaded)) == {"people"}
+    assert loaded.people[2].age == 2
+
+
+def test_binary_errors() -> None:
+    with pytest.raises(ValueError, match="Not a Coqpit binary snapshot"):
+        Group.new_from_binary(b"{}")
+    with pytest.raises(ValueError, match="trailing data"):
+        Group.new_from_binary(Group(val_k=1).to_binary() + b"N")
+    with pytest.raises(ValueError, match="Invalid tag"):
+        _decode_binary(_encode_binary(None)[:-1] + b"?")
+    with pytest.raises(TypeError, match="not supported by the binary format"):
+        _encode_binary(object())
+
+
+def test_truncated_binary() -> None:
+    data = Group(val_k=1).to_binary()
+    for end in range(len(data)):
+        with pytest.raises(ValueError, match="binary snapshot"):
+            Group.new_from_binary(data[:end])
@@ -0,0 +1,80 @@
+from dataclasses import dataclass, field
+from pathlib import Path
+
+import pytest
+
+from coqpit import MISSING, Coqpit
+
+
+@dataclass
+class AudioConfig(Coqpit):
+    num_mels: int = field(default=80, metadata={"min_val": 10, "max_val": 2056})
+    mode: str = field(default="mel", metadata={"enum_list": ["mel", "linear"]})
+    stats_path: str | None = field(default=None, metadata={"is_path": True})
+
+
+@dataclass
+class ModelConfig(Coqpit):
+    lr: float = field(default=0.1, metadata={"min_val": 0, "allow_none": False})
+    lr_scheduler: str | None = None
+    lr_scheduler_params: dict[str, float] | None = field(default=None, metadata={"prerequest": "lr_scheduler"})
+    batch_size: int | None = field(default=None, metadata={"min_val": 1, "alternative": "batch_group_size"})
+    batch_group_size: int | None = None
+    run_name: str = field(default=MISSING, metadata={"restricted": True})
+    audio: AudioConfig = field(default_factory=AudioConfig)
+    datasets: list[AudioConfig] = field(default_factory=list)
+
+
+def test_constraints_after_construction() -> None:
+    ModelConfig(audio=AudioConfig(mode="LINEAR"), lr_scheduler="step", lr_scheduler_params={"gamma": 0.1})
+    ModelConfig(batch_size=0, batch_group_size=2)
+
+    with pytest.raises(ValueError, match="num_mels is smaller than min value 10") as error:
+        AudioConfig(num_mels=1, mode="stft", stats_path="/does/not/exist")
+    assert str(error.value).splitlines() == [
+        " [!] num_mels is smaller than min value 10",
+        " [!] mode is not a valid value: 'stft'",
+        ' [!] path for stats_path ("/does/not/exist") does not exist.',
+    ]
+    with pytest.raises(ValueError, match="None value is not allowed for lr") as error:
+        ModelConfig(lr=None, lr_scheduler_params={}, batch_size=0)  # type: ignore[arg-type]
+    assert len(str(error.value).splitlines()) == 3
+
+
+def test_constraints_after_updates(tmp_path: Path) -> None:
+    config = ModelConfig()
+    with pytest.raises(ValueError, match="MISSING field run_name must be defined"):
+        config.check_constraints()
+    config.run_name = "run"
+    config.check_constraints()
+
+    config.audio.num_mels = 5000
+    config.datasets.append(AudioConfig())
+    config.datasets[0].mode = "stft"
+    with pytest.raises(ValueError, match=r"audio\.num_mels is larger than max value 2056") as error:
+        config.check_constraints()
+    assert str(error.value).splitlines()[1] == " [!] datasets.0.mode is not a valid value: 'stft'"
+
+    with pytest.raises(ValueError, match=r"audio\.num_mels"):
+        config.parse_overrides(["--coqpit.lr", "0.5"])
+    config.audio.num_mels = 80
+    config.datasets[0].mode = "mel"
+    with pytest.raises(ValueError, match="lr is smaller than min value 0"):
+        config.parse_overrides(["--coqpit.lr", "-1"])
+    config.lr = 0.1
+
+    file_path = tmp_path / "config.json"
+    config.save_json(file_path)
+    config.load_json(file_path)
+    file_path.write_text(file_path.read_text().replace('"mel"', '"stft"'))
+    with pytest.raises(ValueError, match="mode is not a valid value"):
+        config.load_json(file_path)
+
+    # restricted fields are only checked after loading, not at construction
+    file_path.write_text('{"lr": 0.5}')
+    with pytest.raises(ValueError, match="MISSING field run_name must be defined"):
+        ModelConfig().load_json(file_path)
+    with pytest.raises(ValueError, match="MISSING field run_name must be defined"):
+        ModelConfig.load_json_files(tmp_path)
+    configs = ModelConfig.load_json_files(tmp_path, errors="collect")
+    assert isinstance(configs[file_path], ValueError)
@@ -0,0 +1,45 @@
+from dataclasses import dataclass, field
+
+import pytest
+
+from coqpit.coqpit import NoDefaultVar, Serializable, no_default
+
+
+@dataclass
+class Layer(Serializable):
+    size: int = field(default=1, metadata={"contract": lambda x: x > 0})
+    name: NoDefaultVar[str] = no_default
+    activation: str | None = None
+
+
+@dataclass
+class Network(Serializable):
+    layers: list[Layer] = field(default_factory=list)
+    head: Layer | None = None
+
+
+def test_contracts() -> None:
+    layer = Layer(name="a")
+    Network(layers=[layer], head=Layer(size=2, name="b"))
+    with pytest.raises(ValueError, match="break the contract for size, Layer"):
+        Layer(size=0, name="a")
+    with pytest.raises(TypeError, match="size is not optional"):
+        Layer(size=None, name="a")  # type: ignore[arg-type]
+    with pytest.raises(TypeError, match="layers is not optional"):
+        Network(layers=None)  # type: ignore[arg-type]
+
+    layer.size = -1
+    with pytest.raises(ValueError, match="break the contract"):
+        layer.validate()
+
+
+def test_no_default() -> None:
+    with pytest.raises(TypeError, match="missing 1 required argument: 'name'"):
+        Layer()
+    with pytest.raises(TypeError, match="missing 1 required argument: 'name'"):
+        Layer(name=no_default)
+    # also for fields that do not default to no_default
+    with pytest.raises(TypeError, match="missing 1 required argument: 'activation'"):
+        Layer(name="a", activation=no_default)  # type: ignore[arg-type]
+    with pytest.raises(TypeError, match="missing 1 required argument: 'head'"):
+        Network(head=no_default)  # type: ignore[arg-type]
@@ -1,7 +1,7 @@
 import copy
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 
-from coqpit.coqpit import Coqpit
+from coqpit.coqpit import Coqpit, _deferred_fields
 
 
 @dataclass
@@ -23,3 +23,89 @@ def test_copying() -> None:
     config_new = copy.deepcopy(config)
     config_new.val_a = 4321
     assert config.val_a != config_new.val_a
+
+
+@dataclass
+class NestedConfig(Coqpit):
+    val_b: int = 1
+    numbers: list[int] = field(default_factory=lambda: [1, 2])
+    simple: SimpleConfig = field(default_factory=SimpleConfig)
+
+
+@dataclass
+class ParentConfig(Coqpit):
+    nested: NestedConfig = field(default_factory=NestedConfig)
+    nested_list: list[NestedConfig] = field(default_factory=lambda: [NestedConfig(), NestedConfig(val_b=2)])
+    options: dict[str, list[int]] = field(default_factory=lambda: {"a": [1]})
+
+
+def test_copy_on_write() -> None:
+    config = ParentConfig()
+    reference = copy.deepcopy(config)
+    config_new = config.copy(copy_on_write=True)
+    assert not _deferred_fields(config)
+    assert set(_deferred_fields(config_new)) == {"nested", "nested_list", "options"}
+    assert config_new.to_dict() == reference.to_dict()
+    assert config_new.diff(config) == []
+    assert set(_deferred_fields(config_new)) == {"nested", "nested_list", "options"}
+
+    # only the values read through the copy are cloned
+    config_new.nested.simple.val_a = 1234
+    assert set(_deferred_fields(config_new)) == {"nested_list", "options"}
+    assert set(_deferred_fields(config_new.nested)) == {"numbers"}
+    config_new.nested_list[1].numbers.append(3)
+    config_new.options["a"].append(2)
+    assert config == reference
+    assert config_new.diff(config) == [
+        ("nested.simple.val_a", 1234, 10),
+        ("nested_list.1.numbers", [1, 2, 3], [1, 2]),
+        ("options", {"a": [1, 2]}, {"a": [1]}),
+    ]
+
+    # assigning fields of the original does not change the copy
+    config.nested = NestedConfig(val_b=3)
+    config.nested_list[1].simple = SimpleConfig(val_a=4321)
+    assert config_new.nested.val_b == 1
+    assert config_new.nested_list[1].simple.val_a == 10
+
+    # copies of copies
+    config_copies = [config_new.copy(copy_on_write=True) for _ in range(3)]
+    config_copies.append(copy.copy(config_copies[0]))
+    for config_copy in config_copies:
+        config_copy.nested_list[1].numbers.append(4)
+        assert config_copy.nested_list[1].numbers == [1, 2, 3, 4]
+    assert config_new.nested_list[1].numbers == [1, 2, 3]
+    config_new.nested_list = []
+    assert config_copies[0].nested_list[1].numbers == [1, 2, 3, 4]
+
+
+def test_copy_on_write_keeps_original() -> None:
+    config = ParentConfig()
+    nested = config.nested
+    numbers = config.nested_list[0].numbers
+    config_new = config.copy(copy_on_write=True)
+    assert config.nested is nested
+    assert config.nested_list[0].numbers is numbers
+    assert config_new.nested is not nested
+    assert config_new.nested_list[0].numbers is not numbers
+
+    # references taken before the copy still point to the original
+    nested.val_b = 99
+    numbers.append(3)
+    assert config.nested.val_b == 99
+    assert config.nested_list[0].numbers == [1, 2, 3]
+    assert config_new.nested.val_b == 1
+    assert config_new.nested_list[0].numbers == [1, 2]
+    assert not _deferred_fields(config)
+
+
+def test_copy_on_write_serialization_cache() -> None:
+    config = ParentConfig()
+    config.fingerprint()
+    config_new = config.copy(copy_on_write=True)
+    assert config_new.fingerprint() == config.fingerprint()
+    config_new.nested.val_b = 3
+    assert config_new.fingerprint() == ParentConfig(nested=NestedConfig(val_b=3)).fingerprint()
+    config.options = {"a": [1, 2]}
+    assert config.fingerprint() == ParentConfig(options={"a": [1, 2]}).fingerprint()
+    assert config_new.fingerprint() == ParentConfig(nested=NestedConfig(val_b=3)).fingerprint()
@@ -0,0 +1,136 @@
+import gc
+import weakref
+from dataclasses import dataclass, field, make_dataclass
+from pathlib import Path
+from typing import Any, Literal
+
+import pytest
+
+from coqpit.coqpit import (
+    _PLANNED_CLASSES,
+    Coqpit,
+    FieldType,
+    _class_plan,
+    _compile_decoder,
+    _deserialize,
+)
+
+
+@dataclass
+class Person(Coqpit):
+    name: str | None = None
+    age: int | None = None
+
+
+@dataclass
+class Group(Coqpit):
+    name: str = "group"
+    path: Path | None = None
+    people: list[Person] = field(default_factory=list)
+    lead: Person | None = None
+    scores: dict[str, Any] = field(default_factory=dict)
+    mode: Literal["a", "b"] = "a"
+
+
+@pytest.mark.parametrize(
+    ("value", "field_type"),
+    [
+        (1, int),
+        (1, float),
+        (1.5, float | None),
+        (None, int | None),
+        (float("inf"), int),
+        ("a", str),
+        (True, bool),
+        ("a/b", Path),
+        (None, Path | None),
+        ([1, 2], list[int]),
+        ([[1], [2, 3]], list[list[float]]),
+        ([1, "a"], list),
+        ({"a": [1, 2], "b": None}, dict[str, Any]),
+        ("a", int | str),
+        ([1, 2], str | list[int]),
+        ("b", Literal["a", "b"]),
+        ({"name": "Eren", "age": 3}, Person),
+        ({"people": [{"name": "Eren"}], "lead": {"age": 3}}, Group),
+    ],
+)
+def test_compiled_decoder_matches_deserialize(value: Any, field_type: FieldType) -> None:
+    assert _compile_decoder(field_type)(value) == _deserialize(value, field_type)
+
+
+@pytest.mark.parametrize(
+    ("value", "field_type", "error"),
+    [
+        ("1", int, TypeError),
+        (True, int, TypeError),
+        (1, str, TypeError),
+        (1, list[int], TypeError),
+        (["a"], list[int], TypeError),
+        ([1], list[int, str], ValueError),  # type: ignore[misc]
+        ("c", Literal["a", "b"], TypeError),
+        (1, dict[str, int], TypeError),
+        (1, "int", NotImplementedError),
+    ],
+)
+def test_compiled_decoder_errors(value: Any, field_type: FieldType, error: type[Exception]) -> None:
+    with pytest.raises(error):
+        _deserialize(value, field_type)
+    with pytest.raises(error):
+        _compile_decoder(field_type)(value)
+
+
+def test_plan_is_reused_and_invalidated() -> None:
+    data = {"name": "g", "people": [{"name": "Eren", "age": 11}], "lead": {"name": "Ceren"}, "mode": "b"}
+    group = Group.new_from_dict(data)
+    assert group.people == [Person(name="Eren", age=11)]
+    assert group.lead == Person(name="Ceren")
+    assert group.mode == "b"
+
+    plan = _class_plan(Group)
+    assert Group in _PLANNED_CLASSES
+    assert Person in _PLANNED_CLASSES
+    Group.new_from_dict(data)
+    assert _class_plan(Group) is plan
+
+    Group.invalidate_plan()
+    assert Group not in _PLANNED_CLASSES
+    assert Person in _PLANNED_CLASSES
+    assert Group.new_from_dict(data) == group
+    assert _class_plan(Group) is not plan
+
+    # the plan of Group depends on the fields of Person
+    Person.invalidate_plan()
+    assert Person not in _PLANNED_CLASSES
+    assert Group not in _PLANNED_CLASSES
+
+    Group.new_from_dict(data)
+    Coqpit.invalidate_plan()
+    assert len(_PLANNED_CLASSES) == 0
+
+
+def test_plans_are_freed_with_their_class() -> None:
+    def use_classes() -> tuple[weakref.ref[type], weakref.ref[type]]:
+        leaf = make_dataclass("Leaf", [("x", int, field(default=1))], bases=(Coqpit,))
+        other = make_dataclass("Other", [("y", int, field(default=1))], bases=(Coqpit,))
+        tree: type[Coqpit] = make_dataclass(
+            "Tree",
+            [("leaves", list[leaf], field(default_factory=list)), ("node", leaf | other | None, None)],  # type: ignore[valid-type]
+            bases=(Coqpit,),
+        )
+        config = tree.new_from_dict({"leaves": [{"x": 2}], "node": {"y": 3}})
+        config.validate(single_pass=True)
+        config.to_dict()
+        return weakref.ref(leaf), weakref.ref(tree)
+
+    refs = use_classes()
+    gc.collect()
+    assert [ref() for ref in refs] == [None, None]
+
+
+def test_plan_used_by_deserialize() -> None:
+    group = Group(name="old", people=[Person(name="Geren")])
+    with pytest.warns(UserWarning, match="Type mismatch"):
+        group.deserialize({"name": 3, "people": [{"name": "Eren", "age": 11}]})
+    assert group.name == "group"
+    assert group.people == [Person(name="Eren", age=11)]
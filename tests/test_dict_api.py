@@ -0,0 +1,56 @@
+from dataclasses import dataclass, field
+
+from coqpit import MISSING, Coqpit, check_argument
+
+
+@dataclass
+class Person(Coqpit):
+    name: str = "Eren"
+    age: int = 11
+
+
+@dataclass
+class Group(Coqpit):
+    size: int = 3
+    lead: Person = field(default_factory=Person)
+    people: list[Person] = field(default_factory=lambda: [Person(), Person(name="Ceren")])
+    val_k: int = MISSING
+
+    def check_values(self) -> None:
+        check_argument("size", self, restricted=True, min_val=1, prerequest=["lead"])
+
+
+def test_field_index() -> None:
+    group = Group()
+    group.non_member = 1  # type: ignore[attr-defined]
+    assert "size" in group
+    assert "val_k" in group
+    assert "non_member" not in group
+    assert "check_values" not in group
+    assert group.has("people")
+    assert not group.has("non_member")
+    assert group.get("size") == 3
+    assert group.get("non_member", -1) == -1
+    assert len(group) == 4
+    assert list(group) == ["size", "lead", "people", "val_k"]
+    assert list(group.keys()) == ["size", "lead", "people", "val_k"]
+
+
+def test_shallow_items() -> None:
+    group = Group(val_k=1)
+    items = dict(group.items())
+    assert items["lead"] is group.lead
+    assert items["people"] is group.people
+    assert dict(**group) == items
+    assert list(group.values()) == list(items.values())
+
+    deep = group.asdict()
+    assert deep["lead"] == {"name": "Eren", "age": 11}
+    assert deep["people"] is not group.people
+    assert deep["people"][1] == {"name": "Ceren", "age": 11}
+
+
+def test_missing_fields_in_mapping() -> None:
+    group = Group()
+    assert dict(group.items())["val_k"] == MISSING
+    assert group.get("val_k") == MISSING
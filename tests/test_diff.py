@@ -0,0 +1,95 @@
+from dataclasses import dataclass, field
+from pathlib import Path
+
+import pytest
+
+from coqpit import Coqpit
+
+
+@dataclass
+class AudioConfig(Coqpit):
+    sample_rate: int = 22050
+    stats_path: Path | None = None
+
+    def check_values(self) -> None:
+        if self.sample_rate <= 0:
+            msg = "sample_rate must be positive"
+            raise ValueError(msg)
+
+
+@dataclass
+class DatasetConfig(Coqpit):
+    path: str = "data"
+    weights: list[float] = field(default_factory=lambda: [1.0, 1.0])
+
+
+@dataclass
+class RunConfig(Coqpit):
+    lr: float = 1e-3
+    audio: AudioConfig = field(default_factory=AudioConfig)
+    datasets: list[DatasetConfig] = field(default_factory=lambda: [DatasetConfig(), DatasetConfig(path="b")])
+    characters: dict[str, str] = field(default_factory=lambda: {"pad": "<PAD>"})
+    model_args: AudioConfig | None = None
+
+    def check_values(self) -> None:
+        self.audio.check_values()
+
+
+def test_diff_and_patch() -> None:
+    config = RunConfig()
+    other = RunConfig(lr=0.1)
+    other.audio.stats_path = Path("stats.npy")
+    other.datasets[1].weights[0] = 0.5
+    other.characters["eos"] = "<EOS>"
+    other.model_args = AudioConfig(sample_rate=16000)
+
+    changes = config.diff(other)
+    assert changes == [
+        ("lr", 1e-3, 0.1),
+        ("audio.stats_path", None, "stats.npy"),
+        ("datasets.1.weights.0", 1.0, 0.5),
+        ("characters", {"pad": "<PAD>"}, {"pad": "<PAD>", "eos": "<EOS>"}),
+        ("model_args", None, {"sample_rate": 16000, "stats_path": None}),
+    ]
+    assert config.diff(config) == []
+    assert other.diff(config) == [(path, new, old) for path, old, new in changes]
+
+    config.apply_patch(changes)
+    assert config == other
+    assert config.audio.stats_path == Path("stats.npy")
+    assert isinstance(config.model_args, AudioConfig)
+    assert config.diff(other) == []
+
+
+def test_diff_skips_shared_subtrees() -> None:
+    config = RunConfig()
+    other = config.copy()
+    assert other.datasets is config.datasets
+    other.datasets.append(DatasetConfig(path="c"))
+    assert config.diff(other) == []
+    other.datasets = [*other.datasets, DatasetConfig()]
+    assert [path for path, _, _ in config.diff(other)] == ["datasets"]
+
+    lazy = RunConfig.new_from_dict(config.to_dict(), lazy=True)
+    assert lazy.diff(RunConfig.new_from_dict(config.to_dict(), lazy=True)) == []
+    with pytest.raises(TypeError, match="Cannot diff"):
+        config.diff(AudioConfig())  # type: ignore[arg-type]
+
+
+def test_apply_patch_errors() -> None:
+    config = RunConfig()
+    with pytest.raises(KeyError, match=r"'datasets\.2\.path' does not exist"):
+        config.apply_patch({"lr": 0.5, "datasets.2.path": "a"})
+    with pytest.raises(KeyError, match=r"'audio\.unknown' does not exist"):
+        config.apply_patch({"audio.unknown": 1})
+    with pytest.raises(TypeError):
+        config.apply_patch({"lr": 0.5, "datasets.0.weights": "a"})
+    assert config == RunConfig()
+
+    # values are checked once, after all of them are set
+    with pytest.raises(ValueError, match="sample_rate must be positive"):
+        config.apply_patch({"audio.sample_rate": -1, "datasets.0.path": "x"})
+    assert config.datasets[0].path == "x"
+    config.apply_patch({"audio.sample_rate": 16000, "audio.stats_path": "a.npy", "characters": {"a": "b"}})
+    assert config.audio.sample_rate == 16000
+    assert config.audio.stats_path == Path("a.npy")
@@ -0,0 +1,79 @@
+import argparse
+import enum
+from dataclasses import dataclass, field
+from typing import Literal
+
+import pytest
+
+from coqpit import Coqpit
+
+Language = Literal["en", "de", "fr", "tr"]
+
+
+class Mode(enum.Enum):
+    MEL = "mel"
+    LINEAR = "linear"
+
+
+class Level(enum.IntEnum):
+    LOW = 0
+    HIGH = 1
+
+
+@dataclass
+class AudioConfig(Coqpit, cache_serialized=True):
+    mode: Mode = Mode.MEL
+    level: Level = Level.LOW
+    language: Language = "en"
+    languages: list[Language] = field(default_factory=lambda: ["en"])
+    modes: list[Mode] = field(default_factory=list)
+    fallback_mode: Mode | None = None
+
+
+def test_serialization() -> None:
+    config = AudioConfig(modes=[Mode.LINEAR])
+    data = {
+        "mode": "mel",
+        "level": 0,
+        "language": "en",
+        "languages": ["en"],
+        "modes": ["linear"],
+        "fallback_mode": None,
+    }
+    assert config.to_dict() == data
+    assert AudioConfig.new_from_dict(data) == config
+    assert AudioConfig.new_from_binary(config.to_binary()) == config
+    assert config.freeze().to_dict() == data
+    config.validate(single_pass=True)
+
+    # members are decoded from their value or name
+    config = AudioConfig.new_from_dict({"mode": "LINEAR", "level": "HIGH", "modes": ["mel", "MEL"]})
+    assert (config.mode, config.level, config.modes) == (Mode.LINEAR, Level.HIGH, [Mode.MEL, Mode.MEL])
+    config.modes.append(Mode.LINEAR)
+    assert config.to_dict()["modes"] == ["mel", "mel", "linear"]
+    with pytest.raises(TypeError, match="not a value or name of `Mode`"):
+        AudioConfig.new_from_dict({"mode": "stft"})
+    with pytest.raises(TypeError, match="not valid for Literal"):
+        AudioConfig.new_from_dict({"languages": ["en", "xx"]})
+
+
+def test_argparse_choices() -> None:
+    config = AudioConfig()
+    parser = config.init_argparse()
+    choices = {action.dest: action.choices for action in parser._actions}
+    assert choices["coqpit.mode"] == (Mode.MEL, Mode.LINEAR)
+    assert choices["coqpit.language"] == ("en", "de", "fr", "tr")
+    assert choices["coqpit.languages.0"] == ("en", "de", "fr", "tr")
+
+    config.parse_args(["--coqpit.mode", "linear", "--coqpit.level", "HIGH", "--coqpit.languages.0", "tr"])
+    assert (config.mode, config.level, config.languages) == (Mode.LINEAR, Level.HIGH, ["tr"])
+    config.parse_args(["--coqpit.modes", "MEL", "linear", "--coqpit.fallback_mode", "mel"])
+    assert (config.modes, config.fallback_mode) == ([Mode.MEL, Mode.LINEAR], Mode.MEL)
+    parser = config.init_argparse(parser=argparse.ArgumentParser(exit_on_error=False))
+    with pytest.raises(argparse.ArgumentError, match="invalid Literal value: 'xx'"):
+        parser.parse_args(["--coqpit.language", "xx"])
+
+    config.parse_overrides(["--coqpit.mode", "MEL", "--coqpit.language", "fr"])
+    assert (config.mode, config.language) == (Mode.MEL, "fr")
+    with pytest.raises(ValueError, match="'xx' is not one of en, de, fr, tr"):
+        config.parse_overrides(["--coqpit.language", "xx"])
@@ -0,0 +1,88 @@
+import hashlib
+import json
+from dataclasses import dataclass, field
+from pathlib import Path
+
+from coqpit.coqpit import Coqpit, _deferred_fields
+
+
+@dataclass
+class AudioConfig(Coqpit):
+    sample_rate: int = 22050
+    fmin: float = 0.0
+    stats_path: Path | None = None
+
+
+@dataclass
+class DatasetConfig(Coqpit):
+    name: str = "ljspeech"
+    cache_path: str = field(default="cache", metadata={"fingerprint": False})
+
+
+@dataclass
+class TrainConfig(Coqpit):
+    lr: float = 0.001
+    audio: AudioConfig = field(default_factory=AudioConfig)
+    datasets: list[DatasetConfig] = field(default_factory=lambda: [DatasetConfig()])
+    options: dict[str, list[float]] = field(default_factory=lambda: {"betas": [0.9, 0.99]})
+    output_path: str = field(default="output", metadata={"fingerprint": False})
+
+
+def test_fingerprint_is_canonical() -> None:
+    config = TrainConfig()
+    expected = {
+        "audio": {"fmin": 0, "sample_rate": 22050, "stats_path": None},
+        "datasets": [{"name": "ljspeech"}],
+        "lr": 0.001,
+        "options": {"betas": [0.9, 0.99]},
+    }
+    text = json.dumps(expected, sort_keys=True, separators=(",", ":"))
+    assert config.fingerprint() == hashlib.sha256(text.encode()).hexdigest()
+    assert config.fingerprint() == TrainConfig(audio=AudioConfig(fmin=0)).fingerprint()
+    assert config.fingerprint() == TrainConfig(output_path="other").fingerprint()
+    assert config.fingerprint() == TrainConfig(datasets=[DatasetConfig(cache_path="other")]).fingerprint()
+    assert config.fingerprint() != TrainConfig(lr=0.002).fingerprint()
+    assert config.audio.fingerprint() == AudioConfig().fingerprint()
+
+    path_config = TrainConfig(audio=AudioConfig(stats_path=Path("stats.npy")))
+    assert path_config.fingerprint() == TrainConfig(audio=AudioConfig(stats_path="stats.npy")).fingerprint()  # type: ignore[arg-type]
+
+
+def test_fingerprint_is_updated() -> None:
+    config = TrainConfig()
+    reference = config.fingerprint()
+    config.audio.sample_rate = 16000
+    assert config.fingerprint() == TrainConfig(audio=AudioConfig(sample_rate=16000)).fingerprint()
+    config.audio.sample_rate = 22050
+    assert config.fingerprint() == reference
+
+    config.options["betas"].append(0.5)
+    assert config.fingerprint() != reference
+    config.options["betas"].pop()
+    assert config.fingerprint() == reference
+
+    config.datasets.append(DatasetConfig(name="vctk"))
+    changed = config.fingerprint()
+    assert changed != reference
+    config.datasets[1].name = "libritts"
+    assert config.fingerprint() not in {reference, changed}
+    config.datasets[1].cache_path = "other"
+    config.output_path = "other"
+    assert config.fingerprint() == TrainConfig(datasets=[DatasetConfig(), DatasetConfig(name="libritts")]).fingerprint()
+
+
+def test_fingerprint_of_lazy_config() -> None:
+    config = TrainConfig(datasets=[DatasetConfig(cache_path="other")])
+    lazy = TrainConfig.new_from_dict(config.to_dict(), lazy=True)
+    assert "audio" in _deferred_fields(lazy)
+    assert lazy.fingerprint() == config.fingerprint()
+    # lazy fields are deserialized to be hashed like the fields of an eager load
+    assert not _deferred_fields(lazy)
+
+
+def test_fingerprint_of_lazy_and_eager_loads() -> None:
+    data = {"audio": {"sample_rate": 16000.0, "unknown": 1}, "datasets": [{"name": "vctk", "unknown": 2}]}
+    config = TrainConfig.new_from_dict(data)
+    lazy = TrainConfig.new_from_dict(data, lazy=True)
+    assert lazy == config
+    assert lazy.fingerprint() == config.fingerprint()
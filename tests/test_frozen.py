@@ -0,0 +1,100 @@
+import copy
+import dataclasses
+import json
+import pickle
+from dataclasses import KW_ONLY, dataclass, field
+from pathlib import Path
+from typing import Any
+
+import pytest
+
+from coqpit import Coqpit, FrozenCoqpit
+
+
+@dataclass
+class SpeakerConfig(Coqpit):
+    name: str = "eren"
+    stats: list[float] = field(default_factory=lambda: [0.5, 1.5])
+
+
+@dataclass
+class DatasetConfig(Coqpit):
+    path: Path = Path("data")
+    speakers: list[SpeakerConfig] = field(default_factory=lambda: [SpeakerConfig()])
+    options: dict[str, list[int]] = field(default_factory=lambda: {"a": [1]})
+    main_speaker: SpeakerConfig | None = None
+
+
+def test_freeze() -> None:
+    config = DatasetConfig(main_speaker=SpeakerConfig(name="ceren"))
+    frozen = config.freeze()
+    assert isinstance(frozen, DatasetConfig.frozen())
+    assert isinstance(frozen, FrozenCoqpit)
+    assert DatasetConfig.frozen() is DatasetConfig.frozen()
+    assert not hasattr(frozen, "__dict__")
+
+    # read API
+    assert frozen.path == Path("data")
+    assert frozen.main_speaker.name == "ceren"
+    assert frozen["speakers"][0].stats == (0.5, 1.5)
+    assert frozen.get("options") == {"a": (1,)}
+    assert frozen.get("other", 1) == 1
+    assert "path" in frozen
+    assert "serialize" not in frozen
+    assert list(frozen) == ["path", "speakers", "options", "main_speaker"]
+    assert len(frozen) == 4
+    with pytest.raises(KeyError):
+        frozen["serialize"]
+
+    # serialization
+    assert frozen.to_dict() == config.to_dict()
+    assert frozen.to_json() == config.to_json()
+    assert frozen.thaw() == config
+    assert config.freeze() == frozen
+    assert copy.deepcopy(frozen) == frozen
+    assert pickle.loads(pickle.dumps(frozen)) == frozen  # noqa: S301
+
+
+def test_frozen_class_defaults() -> None:
+    frozen_class: Any = DatasetConfig.frozen()
+    assert frozen_class() == DatasetConfig().freeze()
+    assert frozen_class(path=Path("other")) == DatasetConfig(path=Path("other")).freeze()
+    assert frozen_class().speakers[0].stats == (0.5, 1.5)
+    frozen_fields = dataclasses.fields(frozen_class)
+    assert [f.name for f in frozen_fields] == [f.name for f in dataclasses.fields(DatasetConfig)]
+    assert [f.default for f in frozen_fields] == [f.default for f in dataclasses.fields(DatasetConfig)]
+
+
+@dataclass(kw_only=True)
+class KwOnlyConfig(Coqpit):
+    name: str = "eren"
+    speaker: SpeakerConfig = field(default_factory=SpeakerConfig)
+
+
+@dataclass
+class PartlyKwOnlyConfig(Coqpit):
+    path: Path = Path("data")
+    _: KW_ONLY
+    size: int = 1
+    config: KwOnlyConfig = field(default_factory=KwOnlyConfig)
+
+
+def test_freeze_kw_only() -> None:
+    config = PartlyKwOnlyConfig(size=2, config=KwOnlyConfig(name="ceren"))
+    frozen = config.freeze()
+    assert frozen.size == 2
+    assert frozen.config.name == "ceren"
+    assert frozen.config.speaker.stats == (0.5, 1.5)
+    assert frozen.thaw() == config
+    assert KwOnlyConfig().freeze() == KwOnlyConfig.frozen()()
+
+
+def test_frozen_is_immutable_and_hashable() -> None:
+    frozen = DatasetConfig().freeze()
+    with pytest.raises(dataclasses.FrozenInstanceError):
+        frozen.path = Path("other")  # type: ignore[attr-defined]
+    with pytest.raises(TypeError, match="immutable"):
+        frozen.options["b"] = (2,)
+    assert hash(frozen) == hash(DatasetConfig().freeze())
+    assert len({frozen, DatasetConfig().freeze(), DatasetConfig(path=Path("other")).freeze()}) == 2
+    assert json.loads(json.dumps(frozen.options)) == {"a": [1]}
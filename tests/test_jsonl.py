@@ -0,0 +1,47 @@
+from dataclasses import dataclass, field
+from pathlib import Path
+
+import pytest
+
+from coqpit import Coqpit
+
+
+@dataclass
+class Person(Coqpit):
+    name: str = "Eren"
+    age: int = 11
+
+
+@dataclass
+class Group(Coqpit):
+    size: int = 3
+    people: list[Person] = field(default_factory=lambda: [Person()])
+
+
+def test_jsonl_round_trip(tmp_path: Path) -> None:
+    file_path = tmp_path / "configs.jsonl"
+    configs = [Group(size=i, people=[Person(age=i)]) for i in range(5)]
+    assert Group.write_jsonl(file_path, (c for c in configs)) == 5
+    assert Group.write_jsonl(file_path, [Group(size=10)], append=True) == 1
+    assert len(file_path.read_text().splitlines()) == 6
+
+    loaded = list(Group.iter_from_jsonl(file_path))
+    assert loaded == [*configs, Group(size=10)]
+    lazy_loaded = list(Group.iter_from_jsonl(file_path, lazy=True))
+    assert [c.to_dict() for c in lazy_loaded] == [c.to_dict() for c in loaded]
+
+
+def test_jsonl_errors(tmp_path: Path) -> None:
+    file_path = tmp_path / "configs.jsonl"
+    lines = ['{"size": 1}', "", "not json", '{"size": "a"}', "[1, 2]", '{"size": 2, "people": [{"age": 3}]}']
+    file_path.write_text("\n".join(lines))
+    errors: list[tuple[int, Exception]] = []
+    loaded = list(Group.iter_from_jsonl(file_path, on_error=lambda n, e: errors.append((n, e))))
+    assert loaded == [Group(size=1), Group(size=2, people=[Person(age=3)])]
+    assert [n for n, _ in errors] == [3, 4, 5]
+    assert isinstance(errors[0][1], ValueError)
+    assert isinstance(errors[1][1], TypeError)
+
+    with pytest.warns(UserWarning, match="Failed to load line") as record:
+        assert len(list(Group.iter_from_jsonl(file_path))) == 2
+    assert len(record) == 3
@@ -0,0 +1,179 @@
+import copy
+import pickle
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+
+import pytest
+
+from coqpit.coqpit import Coqpit, Serializable, _deferred_fields
+
+
+@dataclass
+class AudioConfig(Coqpit):
+    sample_rate: int = 22050
+    num_mels: int = 80
+
+    def check_values(self) -> None:
+        if self.num_mels <= 0:
+            msg = "num_mels must be positive"
+            raise ValueError(msg)
+
+
+@dataclass
+class ModelArgs(Coqpit):
+    hidden: int = 128
+    audio: AudioConfig = field(default_factory=AudioConfig)
+
+
+@dataclass
+class DatasetConfig(Coqpit):
+    path: str = "data"
+
+
+@dataclass
+class ModelConfig(Coqpit):
+    name: str = "model"
+    audio: AudioConfig = field(default_factory=AudioConfig)
+    model_args: ModelArgs | None = field(default_factory=ModelArgs)
+    datasets: list[DatasetConfig] = field(default_factory=lambda: [DatasetConfig()])
+
+
+@dataclass
+class Plain(Serializable):
+    audio: AudioConfig = field(default_factory=AudioConfig)
+
+
+def _data() -> dict[str, object]:
+    return {
+        "name": "lazy",
+        "audio": {"sample_rate": 16000, "num_mels": -1},
+        "model_args": {"hidden": 3, "audio": {"sample_rate": 8000, "num_mels": 40}},
+        "datasets": [{"path": "a"}, {"path": "b"}],
+    }
+
+
+def test_lazy_new_from_dict() -> None:
+    data = _data()
+    config = ModelConfig.new_from_dict(data, lazy=True)
+    assert config.name == "lazy"
+    assert set(_deferred_fields(config)) == {"audio", "model_args", "datasets"}
+
+    # untouched subtrees are serialized without deserializing them
+    assert config.to_dict() == data
+    assert set(_deferred_fields(config)) == {"audio", "model_args", "datasets"}
+    config.to_dict()["model_args"]["hidden"] = 5
+    assert config.to_dict() == data
+
+    # nested configs are deserialized (and lazy themselves) on first access
+    assert config.model_args is not None
+    assert config.model_args.hidden == 3
+    assert "model_args" in vars(config)
+    assert set(_deferred_fields(config.model_args)) == {"audio"}
+    assert config.model_args.audio == AudioConfig(sample_rate=8000, num_mels=40)
+    assert config.datasets == [DatasetConfig(path="a"), DatasetConfig(path="b")]
+    assert config.to_dict() == data
+
+    # values are validated on first access
+    with pytest.raises(ValueError, match="num_mels must be positive"):
+        _ = config.audio
+    with pytest.raises(ValueError, match="num_mels must be positive"):
+        ModelConfig.new_from_dict(data, lazy=True).materialize()
+    with pytest.raises(ValueError, match="num_mels must be positive"):
+        ModelConfig.new_from_dict(data)
+
+
+def test_lazy_materialize() -> None:
+    data = {
+        "audio": {"sample_rate": 16000.0, "unknown": 1},
+        "model_args": {"audio": {"num_mels": 40}},
+        "datasets": [{"path": "a", "unknown": 1}],
+    }
+    config = ModelConfig.new_from_dict(data)
+    expected = config.to_dict()
+    assert expected["audio"] == {"sample_rate": 16000, "num_mels": 80}
+
+    lazy = ModelConfig.new_from_dict(data, lazy=True)
+    assert lazy.to_dict()["audio"] == data["audio"]
+    lazy.materialize()
+    assert not _deferred_fields(lazy)
+    assert lazy.model_args is not None
+    assert not _deferred_fields(lazy.model_args)
+    assert lazy.to_dict() == expected
+    assert lazy.to_json() == config.to_json()
+    assert lazy.to_binary() == config.to_binary()
+
+
+def test_lazy_assignment_and_copies() -> None:
+    data = _data()
+    config = ModelConfig.new_from_dict(data, lazy=True)
+    config.audio = AudioConfig(num_mels=1)
+    assert config.audio.num_mels == 1
+    assert config.to_dict()["audio"] == {"sample_rate": 22050, "num_mels": 1}
+    assert config["datasets"] == [DatasetConfig(path="a"), DatasetConfig(path="b")]
+
+    data["audio"] = {"sample_rate": 16000, "num_mels": 20}
+    config = ModelConfig.new_from_dict(data, lazy=True)
+    for config_copy in (copy.copy(config), copy.deepcopy(config), pickle.loads(pickle.dumps(config))):  # noqa: S301
+        assert config_copy.to_dict() == data
+        assert config_copy.datasets[1].path == "b"
+    assert set(_deferred_fields(config)) == {"audio", "model_args", "datasets"}
+    assert config.copy().datasets[0].path == "a"
+    assert config == ModelConfig.new_from_dict(data)
+
+
+@dataclass
+class SlowConfig(Coqpit):
+    value: int = 0
+
+    def check_values(self) -> None:
+        # widen the window in which both threads deserialize the field
+        time.sleep(0.01)
+
+
+@dataclass
+class SlowParent(Coqpit):
+    sub: SlowConfig = field(default_factory=SlowConfig)
+
+
+def _read_sub(config: SlowParent, barrier: threading.Barrier) -> SlowConfig:
+    barrier.wait()
+    return config.sub
+
+
+def test_lazy_concurrent_first_access() -> None:
+    for _ in range(5):
+        config = SlowParent.new_from_dict({"sub": {"value": 1}}, lazy=True)
+        barrier = threading.Barrier(2)
+        with ThreadPoolExecutor(2) as executor:
+            futures = [executor.submit(_read_sub, config, barrier) for _ in range(2)]
+            first, second = (future.result() for future in futures)
+        assert first is second is config.sub
+        assert not _deferred_fields(config)
+
+
+def test_lazy_type_mismatch_is_eager() -> None:
+    with pytest.raises(TypeError):
+        ModelConfig.new_from_dict({"audio": 3}, lazy=True)
+    config = ModelConfig.new_from_dict({"model_args": None}, lazy=True)
+    assert config.model_args is None
+
+
+def test_lazy_load_json(tmp_path: Path) -> None:
+    file_path = tmp_path / "config.json"
+    data = _data()
+    data["audio"] = {"sample_rate": 16000, "num_mels": 20}
+    ModelConfig.new_from_dict(data).save_json(file_path)
+
+    config = ModelConfig()
+    config.load_json(file_path, lazy=True)
+    assert set(_deferred_fields(config)) == {"audio", "model_args", "datasets"}
+    assert config.audio.num_mels == 20
+    assert config.to_dict() == data
+
+
+def test_lazy_requires_coqpit() -> None:
+    with pytest.raises(TypeError, match="only supported by Coqpit"):
+        Plain.deserialize_immutable({"audio": {}}, lazy=True)
@@ -0,0 +1,127 @@
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+
+import pytest
+
+from coqpit import MISSING, Coqpit
+from coqpit.coqpit import _deferred_fields
+
+
+@dataclass
+class AudioConfig(Coqpit):
+    sample_rate: int = 22050
+    fft_size: int = 1024
+
+    def check_values(self) -> None:
+        if self.fft_size <= 0:
+            msg = "fft_size must be positive"
+            raise ValueError(msg)
+
+
+@dataclass
+class ModelConfig(Coqpit):
+    name: str = "model"
+    audio: AudioConfig = field(default_factory=AudioConfig)
+    datasets: list[str] = field(default_factory=list)
+    val_k: int = MISSING
+
+
+@dataclass
+class OtherConfig(Coqpit):
+    name: str = "other"
+    audio: dict[str, int] = field(default_factory=dict)
+
+
+def _write(file_path: Path, data: dict[str, object]) -> None:
+    file_path.write_text(json.dumps(data))
+
+
+def _fail(*_args: object) -> None:
+    msg = "should have been cached"
+    raise AssertionError(msg)
+
+
+def test_load_cache(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    file_path = tmp_path / "config.json"
+    _write(file_path, {"name": "cached", "audio": {"sample_rate": 16000}, "datasets": ["a"]})
+
+    config = ModelConfig(val_k=1)
+    config.load_json(file_path, cache=True)
+    cache_files = [p.name for p in tmp_path.iterdir() if p != file_path]
+    assert len(cache_files) == 1
+    assert cache_files[0].startswith(".config.json.")
+
+    with monkeypatch.context() as m:
+        m.setattr(json, "loads", _fail)
+        cached = ModelConfig(val_k=2)
+        cached.load_json(file_path, cache=True)
+    assert cached.to_dict() == {**config.to_dict(), "val_k": 2}
+    assert cached.audio is not config.audio
+
+    # fields absent from the file keep their current value, MISSING fields stay missing
+    cached = ModelConfig()
+    cached.load_json(file_path, cache=True)
+    assert cached["val_k"] == MISSING
+
+    # a different class uses a different cache file
+    other = OtherConfig()
+    other.load_json(file_path, cache=True)
+    assert other.audio == {"sample_rate": 16000}
+    assert len(list(tmp_path.iterdir())) == 3
+
+
+def test_load_cache_invalidation(tmp_path: Path) -> None:
+    file_path = tmp_path / "config.json"
+    cache_dir = tmp_path / "cache"
+    _write(file_path, {"name": "a"})
+    ModelConfig().load_json(file_path, cache=cache_dir)
+    (cache_file,) = cache_dir.iterdir()
+
+    _write(file_path, {"name": "b"})
+    stat = file_path.stat()
+    os.utime(file_path, ns=(stat.st_atime_ns, stat.st_mtime_ns - 10**9))
+    config = ModelConfig()
+    config.load_json(file_path, cache=cache_dir)
+    assert config.name == "b"
+
+    cache_file.write_bytes(b"garbage")
+    config.load_json(file_path, cache=cache_dir)
+    assert config.name == "b"
+    config = ModelConfig()
+    config.load_json(file_path, cache=cache_dir)
+    assert config.name == "b"
+
+    # values that fail validation are not cached
+    _write(file_path, {"audio": {"fft_size": 0}})
+    with pytest.raises(ValueError, match="fft_size must be positive"):
+        config.load_json(file_path, cache=cache_dir)
+    with pytest.raises(ValueError, match="fft_size must be positive"):
+        config.load_json(file_path, cache=cache_dir)
+
+
+def test_load_cache_lazy(tmp_path: Path) -> None:
+    file_path = tmp_path / "config.json"
+    _write(file_path, {"audio": {"sample_rate": 8000}})
+    for _ in range(2):
+        config = ModelConfig()
+        config.load_json(file_path, lazy=True, cache=True)
+        assert set(_deferred_fields(config)) == {"audio", "val_k"}
+        assert config.audio.sample_rate == 8000
+
+
+def test_load_cache_concurrent(tmp_path: Path) -> None:
+    file_path = tmp_path / "config.json"
+    _write(file_path, {"name": "concurrent", "datasets": [str(i) for i in range(1000)]})
+
+    def load(_: int) -> ModelConfig:
+        config = ModelConfig()
+        config.load_json(file_path, cache=True)
+        return config
+
+    with ThreadPoolExecutor(8) as executor:
+        configs = list(executor.map(load, range(32)))
+    assert all(config.datasets == configs[0].datasets for config in configs)
+    assert len(list(tmp_path.iterdir())) == 2
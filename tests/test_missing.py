@@ -0,0 +1,98 @@
+import copy
+import pickle
+from dataclasses import dataclass
+
+import pytest
+
+from coqpit.coqpit import MISSING, Coqpit
+
+
+@dataclass
+class MissingConfig(Coqpit):
+    val_a: int = 10
+    val_k: int = MISSING
+    val_s: str = "a"
+
+
+@dataclass
+class PickledConfig(Coqpit):
+    val_k: int = MISSING
+
+
+@dataclass
+class AccessCheckedConfig(Coqpit, missing_check="access"):
+    val_a: int = 10
+    val_k: int = MISSING
+
+
+@pytest.mark.parametrize("config_class", [MissingConfig, AccessCheckedConfig])
+def test_missing_field(config_class: type[MissingConfig]) -> None:
+    config = config_class()
+    with pytest.raises(AttributeError, match="MISSING field val_k"):
+        _ = config.val_k
+    assert config["val_k"] == MISSING
+    assert config.val_a == 10
+
+    config.val_k = 3
+    assert config.val_k == 3
+    assert config.to_dict()["val_k"] == 3
+
+    config.val_k = MISSING
+    with pytest.raises(AttributeError, match="MISSING field val_k"):
+        _ = config.val_k
+    with pytest.raises(AttributeError, match="MISSING field val_k"):
+        config.to_dict()
+
+    assert config_class(val_k=5).val_k == 5
+    assert config_class.val_k == MISSING
+
+
+def test_missing_field_tracking_per_instance() -> None:
+    config = MissingConfig(val_k=1)
+    other = MissingConfig(val_k=2)
+    config.val_s = MISSING
+    assert other.val_s == "a"
+    assert MissingConfig.val_s == "a"
+    with pytest.raises(AttributeError, match="MISSING field val_s"):
+        _ = config.val_s
+
+    # deleted fields fall back to the class attribute as before
+    del other.val_s
+    assert other.val_s == "a"
+
+    # non-field attributes are not tracked
+    config.non_member = MISSING  # type: ignore[attr-defined]
+    assert config.non_member == MISSING  # type: ignore[attr-defined]
+
+
+def test_missing_field_copy_and_pickle() -> None:
+    config = MissingConfig()
+    for config_copy in (copy.copy(config), copy.deepcopy(config), pickle.loads(pickle.dumps(config))):  # noqa: S301
+        with pytest.raises(AttributeError, match="MISSING field val_k"):
+            _ = config_copy.val_k
+        config_copy.val_k = 1
+        assert config_copy.val_k == 1
+    with pytest.raises(AttributeError, match="MISSING field val_k"):
+        _ = config.val_k
+
+    # the guards are reinstalled when unpickling in a process where the class has not been used yet
+    payload = pickle.dumps(PickledConfig())
+    PickledConfig.val_k = MISSING
+    with pytest.raises(AttributeError, match="MISSING field val_k"):
+        _ = pickle.loads(payload).val_k  # noqa: S301
+
+
+def test_missing_field_deserialize() -> None:
+    config = MissingConfig()
+    config.deserialize({"val_a": 3})
+    assert config.val_a == 3
+    assert config["val_k"] == MISSING
+    assert MissingConfig.new_from_dict({"val_a": 3})["val_k"] == MISSING
+    assert MissingConfig.new_from_dict({"val_k": 3}).val_k == 3
+
+
+def test_invalid_missing_check() -> None:
+    with pytest.raises(ValueError, match="Unknown missing_check mode"):
+
+        class InvalidConfig(Coqpit, missing_check="never"):  # type: ignore[arg-type]
+            pass
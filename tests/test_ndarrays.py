@@ -0,0 +1,153 @@
+import json
+import pickle
+from dataclasses import dataclass, field
+
+import pytest
+
+pytest.importorskip("numpy")
+
+import numpy as np
+import numpy.typing as npt
+
+from coqpit import Coqpit
+from coqpit.coqpit import _decode_binary, _encode_binary
+
+
+@dataclass
+class EmbeddingConfig(Coqpit):
+    embeddings: npt.NDArray[np.float32] = field(default_factory=lambda: np.ones((4, 3), dtype=np.float32))
+    stats: np.ndarray | None = None
+    tables: list[np.ndarray] = field(default_factory=list)
+    size: int = 3
+
+
+def _assert_same(a: np.ndarray, b: np.ndarray) -> None:
+    assert a.dtype == b.dtype
+    assert a.shape == b.shape
+    assert np.array_equal(a, b, equal_nan=True)
+
+
+def test_ndarray_serialization() -> None:
+    config = EmbeddingConfig(
+        stats=np.arange(6.0).reshape(2, 3),
+        tables=[np.arange(1000, dtype=np.int64).reshape(100, 10).T, np.array([], dtype=np.int8)],
+    )
+    data = config.to_dict()
+    assert data["stats"] == [[0.0, 1.0, 2.0], [3.0, 4.0, 5.0]]
+    assert data["embeddings"]["dtype"] == "<f4"
+    assert data["embeddings"]["shape"] == [4, 3]
+    assert data["tables"][0]["shape"] == [10, 100]
+
+    loaded = EmbeddingConfig.new_from_dict(json.loads(config.to_json()))
+    _assert_same(loaded.embeddings, config.embeddings)
+    assert loaded.stats is not None
+    _assert_same(loaded.stats, config.stats)  # type: ignore[arg-type]
+    for table, expected in zip(loaded.tables, config.tables, strict=True):
+        _assert_same(table, expected)
+    loaded.embeddings[0, 0] = 2
+    assert loaded.diff(config) == [("embeddings", loaded.to_dict()["embeddings"], data["embeddings"])]
+
+    # nested lists are converted to the declared dtype
+    assert EmbeddingConfig.new_from_dict({"embeddings": [[1, 2]]}).embeddings.dtype == np.float32
+    with pytest.raises(TypeError, match="does not match field type"):
+        EmbeddingConfig.new_from_dict({"embeddings": [[1, 2], [3]]})
+    with pytest.raises(TypeError, match="does not match field type"):
+        EmbeddingConfig.new_from_dict({"embeddings": {"dtype": "<f4", "shape": [2], "base64": "AAAA"}})
+
+
+def test_ndarray_validate() -> None:
+    config = EmbeddingConfig(stats=np.array([np.nan, 1.0]), tables=[np.zeros((2, 2), dtype=np.complex64)])
+    config.validate()
+    config.validate(single_pass=True)
+
+    config.embeddings = np.array([0.5])
+    with pytest.raises(ValueError, match="could not be deserialized"):
+        config.validate()
+    with pytest.raises(ValueError, match="embeddings: array"):
+        config.validate(single_pass=True)
+
+
+@dataclass
+class ParentConfig(Coqpit):
+    child: EmbeddingConfig = field(default_factory=EmbeddingConfig)
+    children: list[EmbeddingConfig] = field(default_factory=list)
+
+
+@dataclass
+class IdentityConfig(Coqpit):
+    embeddings: np.ndarray = field(default_factory=lambda: np.zeros(2))
+
+    def __eq__(self, other: object) -> bool:
+        return self is other
+
+    __hash__ = None  # type: ignore[assignment]
+
+
+@dataclass
+class BaseConfig(Coqpit):
+    size: int = 0
+
+
+@dataclass(eq=False)
+class NoEqConfig(BaseConfig):
+    embeddings: np.ndarray = field(default_factory=lambda: np.zeros(2))
+    other: int = 0
+
+
+# captured before any instance is created
+_GENERATED_EQ = {cls: cls.__eq__ for cls in (BaseConfig, ParentConfig, EmbeddingConfig)}
+
+
+def test_ndarray_equality() -> None:
+    config = EmbeddingConfig(stats=np.array([np.nan, 1.0]), tables=[np.arange(4)])
+    assert config == EmbeddingConfig(stats=np.array([np.nan, 1.0]), tables=[np.arange(4)])
+    assert config == EmbeddingConfig.new_from_binary(config.to_binary())
+    assert config != EmbeddingConfig(stats=np.array([np.nan, 2.0]), tables=[np.arange(4)])
+    assert config != EmbeddingConfig(stats=np.array([np.nan, 1.0]), tables=[np.arange(4, dtype=np.int8)])
+    assert config != EmbeddingConfig(tables=[np.arange(4)])
+    assert config != ParentConfig()
+
+    parent = ParentConfig(children=[EmbeddingConfig()])
+    assert parent == ParentConfig(children=[EmbeddingConfig()])
+    parent.child.embeddings[0, 0] = 2
+    assert parent != ParentConfig(children=[EmbeddingConfig()])
+
+    # __eq__ defined in the class body is kept
+    assert IdentityConfig() != IdentityConfig()
+
+    # only the generated __eq__ of classes declaring ndarray fields is replaced
+    assert NoEqConfig() == NoEqConfig(embeddings=np.ones(2), other=3)
+    assert NoEqConfig(size=1) != NoEqConfig()
+    assert "__eq__" not in vars(NoEqConfig)
+    assert BaseConfig.__eq__ is _GENERATED_EQ[BaseConfig]
+    assert ParentConfig.__eq__ is _GENERATED_EQ[ParentConfig]
+    assert EmbeddingConfig.__eq__ is not _GENERATED_EQ[EmbeddingConfig]
+
+
+def test_ndarray_binary_pickle_and_freeze() -> None:
+    config = EmbeddingConfig(stats=np.arange(3.0), tables=[np.arange(20, dtype=np.uint16).reshape(4, 5)[:, ::2]])
+    loaded = EmbeddingConfig.new_from_binary(config.to_binary())
+    _assert_same(loaded.tables[0], config.tables[0])
+    _assert_same(loaded.embeddings, config.embeddings)
+    # arrays are views of the snapshot
+    assert not loaded.embeddings.flags.writeable
+    _assert_same(_decode_binary(_encode_binary(np.array(1.5))), np.array(1.5))
+    assert _decode_binary(_encode_binary(np.array(["a", "b"]))) == ["a", "b"]
+
+    buffers: list[pickle.PickleBuffer] = []
+    data = pickle.dumps(config, protocol=5, buffer_callback=buffers.append)
+    # the non-contiguous table is pickled in band
+    assert len(buffers) == 2
+    _assert_same(pickle.loads(data, buffers=buffers).embeddings, config.embeddings)  # noqa: S301
+
+    frozen = config.freeze()
+    assert not frozen.embeddings.flags.writeable
+    assert config.embeddings.flags.writeable
+    _assert_same(frozen.thaw().embeddings, config.embeddings)
+
+
+def test_ndarray_fields_are_not_cli_arguments() -> None:
+    config = EmbeddingConfig()
+    config.parse_args(["--coqpit.size", "4"])
+    assert config.size == 4
+    assert config.parse_overrides(["--coqpit.embeddings", "1"]) == ["--coqpit.embeddings", "1"]
@@ -207,3 +207,48 @@ def test_init_argparse_list_and_nested() -> None:
 
     # check the parsed config with the reference config
     assert parsed == config_ref
+
+
+def test_init_argparse_cache() -> None:
+    config = SimpleConfig()
+    parser = SimpleConfig.init_argparse(instance=config)
+    parser.add_argument("--extra")
+    assert "--extra" not in SimpleConfig.init_argparse(instance=config).format_help()
+    assert SimpleConfig.init_argparse().format_help() == SimpleConfig.init_argparse().format_help()
+
+    # parsers built twice have independent actions and defaults
+    first = SimpleConfig.init_argparse(instance=config)
+    second = SimpleConfig.init_argparse(instance=config)
+    assert first.format_help() == second.format_help()
+    first.set_defaults(**{"coqpit.val_a": 99, "coqpit.int_list.0": 0})
+    assert vars(first.parse_args([]))["coqpit.val_a"] == 99
+    assert second.get_default("coqpit.val_a") == 10
+    assert vars(second.parse_args([]))["coqpit.int_list.0"] == 1
+    vars(first.parse_args([]))["coqpit.val_dict"]["val_a"] = 0
+    assert vars(second.parse_args([]))["coqpit.val_dict"]["val_a"] == 100
+
+    # current values of the instance are used as defaults
+    config.val_a = 20
+    config.val_dict = {"val_a": 1}
+    config.int_list[0] = 7
+    args = SimpleConfig.init_argparse(instance=config).parse_args([])
+    assert vars(args)["coqpit.val_a"] == 20
+    assert vars(args)["coqpit.val_dict"] == {"val_a": 1}
+    assert vars(args)["coqpit.int_list.0"] == 7
+
+    # a different number of list items adds different arguments
+    config.int_list.append(4)
+    args = SimpleConfig.init_argparse(instance=config).parse_args(["--coqpit.int_list.3", "5"])
+    assert vars(args)["coqpit.int_list.3"] == 5
+
+    # defaults that are not taken from the instance are not shared between parsers
+    config.list_with_default_factory = ["a"]
+    defaults = SimpleConfig.init_argparse().parse_args([])
+    vars(defaults)["coqpit.list_with_default_factory"].append("b")
+    assert vars(SimpleConfig.init_argparse().parse_args([]))["coqpit.list_with_default_factory"] == []
+
+
+def test_init_from_argparse_list_items() -> None:
+    config = SimpleConfig.init_from_argparse(["--coqpit.int_list.1", "5", "--coqpit.str_list.0", "x"])
+    assert config.int_list == [1, 5, 3]
+    assert config.str_list == ["x", "vidi", "vici"]
@@ -1,5 +1,7 @@
 from dataclasses import asdict, dataclass, field
 
+import pytest
+
 from coqpit.coqpit import Coqpit, check_argument
 
 
@@ -99,3 +101,79 @@ def test_parse_edited_argparse() -> None:
     # check the current config with the reference config
     assert config == config_ref
     assert unknown == unknown_args
+
+
+@dataclass
+class OverridesConfig(Coqpit):
+    flag: bool = False
+    options: dict[str, int] = field(default_factory=lambda: {"a": 1})
+    nested: SimpleConfig = field(default_factory=SimpleConfig)
+    weights: list[float] = field(default_factory=lambda: [0.5, 0.5])
+    str_or_list: str | list[str] = "a"
+    optional_nested: SimplerConfig | None = None
+
+    def check_values(self) -> None:
+        """Check config fields"""
+        self.nested.check_values()
+
+
+def test_parse_overrides() -> None:
+    args = [
+        "--coqpit.flag",
+        "true",
+        "--coqpit.options",
+        '{"b": 2}',
+        "--coqpit.nested.val_a=222",
+        "--coqpit.nested.mylist_with_default.1.val_a",
+        "-3",
+        "--coqpit.nested.int_list_empty_default",
+        "1",
+        "2",
+        "--other",
+        "x",
+        "--coqpit.weights.1",
+        "0.25",
+        "--coqpit.weights.2",
+        "1",
+        "--coqpit.str_or_list",
+        "b",
+        "c",
+        "--coqpit.optional_nested.val_a",
+        "1",
+    ]
+    config = OverridesConfig()
+    reference = OverridesConfig()
+    unknown = config.parse_overrides(args)
+    reference_unknown = reference.parse_known_args(args)
+    assert config == reference
+    assert unknown == reference_unknown
+    assert unknown == [
+        "--other",
+        "x",
+        "--coqpit.weights.2",
+        "1",
+        "c",
+        "--coqpit.optional_nested.val_a",
+        "1",
+    ]
+    assert config.flag is True
+    assert config.options == {"b": 2}
+    assert config.nested.mylist_with_default[1].val_a == -3
+    assert config.nested.int_list_empty_default == [1, 2]
+    assert config.weights == [0.5, 0.25]
+
+
+def test_parse_overrides_errors() -> None:
+    config = OverridesConfig()
+    with pytest.raises(ValueError, match="must be either"):
+        config.parse_overrides(["--coqpit.weights.0", "1", "--coqpit.flag", "yes"])
+    with pytest.raises(ValueError, match="expected one argument"):
+        config.parse_overrides(["--coqpit.nested.val_a"])
+    assert config == OverridesConfig()
+
+    # values are checked once, after all of them are set
+    with pytest.raises(ValueError):  # noqa: PT011
+        config.parse_overrides(["--coqpit.nested.val_a", "1", "--coqpit.flag", "true"])
+    assert config.flag is True
+    assert config.parse_overrides(["--my.nested.val_a", "20"], arg_prefix="my") == []
+    assert config.nested.val_a == 20
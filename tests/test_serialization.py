@@ -213,3 +213,32 @@ def test_deserialize_literal(value: Any, field_type: FieldType, expected: Any) -
 def test_deserialize_literal_mismatch(value: Any, field_type: FieldType) -> None:
     with pytest.raises(TypeError, match="not valid for Literal field type"):
         _deserialize_literal(value, field_type)
+
+
+@dataclass
+class Mixed(Coqpit):
+    size: int = 3
+    ratio: float | None = 0.5
+    mode: Literal["a", "b"] = "a"
+    path: Path = Path("a/b")
+    lead: Person = field(default_factory=lambda: Person(name="Eren", age=11))
+    people: list[Person] = field(default_factory=lambda: [Person(name="Geren")])
+
+
+def test_generated_serializer() -> None:
+    config = Mixed()
+    assert config.serialize() == {
+        "size": 3,
+        "ratio": 0.5,
+        "mode": "a",
+        "path": "a/b",
+        "lead": {"name": "Eren", "age": 11},
+        "people": [{"name": "Geren", "age": None}],
+    }
+
+    # values that do not match the annotation are still serialized
+    config.size = Path("c")  # type: ignore[assignment]
+    config.ratio = [Person(name="Ceren")]  # type: ignore[assignment]
+    serialized = config.serialize()
+    assert serialized["size"] == "c"
+    assert serialized["ratio"] == [{"name": "Ceren", "age": None}]
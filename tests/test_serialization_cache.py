@@ -0,0 +1,116 @@
+import copy
+import json
+import pickle
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any
+
+import pytest
+
+from coqpit.coqpit import MISSING, Coqpit
+
+
+@dataclass
+class AudioConfig(Coqpit):
+    sample_rate: int = 22050
+    path: Path = Path("audio")
+
+
+@dataclass
+class DatasetConfig(Coqpit):
+    name: str = "ljspeech"
+    speakers: list[str] = field(default_factory=lambda: ["a", "b"])
+
+
+@dataclass
+class TrainConfig(Coqpit, cache_serialized=True):
+    lr: float = 0.001
+    audio: AudioConfig = field(default_factory=AudioConfig)
+    datasets: list[DatasetConfig] = field(default_factory=lambda: [DatasetConfig()])
+    options: dict[str, Any] = field(default_factory=lambda: {"betas": [0.9, 0.99], "nested": {"eps": 1e-9}})
+    scheduler: AudioConfig | None = None
+    other: Any = None
+
+
+def _check(config: TrainConfig) -> None:
+    expected = config.serialize()
+    assert config.to_dict() == expected
+    assert config.to_json() == json.dumps(expected, indent=4)
+
+
+def test_cache_is_updated() -> None:
+    config = TrainConfig()
+    _check(config)
+    assert config.to_json() is config.to_json()
+    config.lr = 0.1
+    config.audio.sample_rate = 16000
+    _check(config)
+    config["scheduler"] = AudioConfig(path=Path("other"))
+    _check(config)
+    config.scheduler.sample_rate = 1  # type: ignore[union-attr]
+    _check(config)
+    config.update({"lr": 0.2})
+    _check(config)
+
+    # the returned dicts are copies
+    config.to_dict()["datasets"][0]["speakers"].append("c")
+    config.to_dict()["options"]["nested"]["eps"] = 0
+    _check(config)
+
+
+def test_in_place_modifications() -> None:
+    config = TrainConfig()
+    _check(config)
+    config.datasets[0].speakers.append("c")
+    _check(config)
+    config.datasets.append(DatasetConfig(name="vctk"))
+    _check(config)
+    config.datasets[1].name = "libritts"
+    _check(config)
+    config.options["betas"][1] = 0.999
+    _check(config)
+    config.options["nested"]["eps"] = 1e-8
+    _check(config)
+    del config.options["nested"]
+    _check(config)
+
+    # values of other types are serialized every time
+    config.other = {1, 2}
+    assert config.to_dict()["other"] == {1, 2}
+    config.other.add(3)
+    assert config.to_dict()["other"] == {1, 2, 3}
+
+
+def test_lazy_and_missing_fields() -> None:
+    data = TrainConfig(datasets=[DatasetConfig(name="x")]).to_dict()
+    config = TrainConfig.new_from_dict(data, lazy=True)
+    assert config.to_dict() == data
+    partial = {"audio": {"sample_rate": 8000.0, "unknown": 1}}
+    config_partial = TrainConfig.new_from_dict(partial, lazy=True)
+    assert config_partial.to_dict()["audio"] == partial["audio"]
+    config_partial.materialize()
+    assert config_partial.to_dict() == TrainConfig.new_from_dict(partial).to_dict()
+    config.datasets[0].name = "y"
+    _check(config)
+    assert config.to_dict()["datasets"][0]["name"] == "y"
+
+    config.lr = MISSING
+    with pytest.raises(AttributeError, match="MISSING field lr"):
+        config.to_dict()
+    config.lr = 0.5
+    _check(config)
+
+
+def test_cache_is_not_copied(tmp_path: Path) -> None:
+    config = TrainConfig()
+    config.to_json()
+    for config_copy in (copy.copy(config), copy.deepcopy(config), pickle.loads(pickle.dumps(config))):  # noqa: S301
+        assert "_coqpit_serialized" not in vars(config_copy)
+        config_copy.audio.sample_rate = 1
+        _check(config_copy)
+    assert config.to_dict()["audio"]["sample_rate"] == 1
+
+    file_path = tmp_path / "config.json"
+    config.save_json(file_path)
+    assert json.loads(file_path.read_text()) == config.serialize()
+    assert TrainConfig.new_from_dict(json.loads(file_path.read_text())) == config
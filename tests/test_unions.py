@@ -0,0 +1,143 @@
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Literal
+
+import pytest
+
+from coqpit import Coqpit
+from coqpit.coqpit import (
+    Serializable,
+    _compile_decoder,
+    _deserialize_primitive_types,
+    _deserialize_union,
+    _union_member_filter,
+)
+
+
+@dataclass
+class AdamConfig(Coqpit):
+    name: Literal["adam"] = "adam"
+    lr: float = 0.001
+    betas: list[float] = field(default_factory=lambda: [0.9, 0.999])
+
+
+@dataclass
+class SGDConfig(Coqpit):
+    name: Literal["sgd"] = "sgd"
+    lr: float = 0.01
+    momentum: float = 0.0
+
+
+@dataclass
+class GlowConfig(Coqpit):
+    model: str = "glow"
+    num_flows: int = 12
+
+
+@dataclass
+class VitsConfig(Coqpit):
+    model: str = "vits"
+    num_flows: int = 4
+
+
+@dataclass
+class RequiredConfig(Serializable):
+    path: str
+
+
+@dataclass
+class TrainConfig(Coqpit):
+    optimizer: AdamConfig | SGDConfig = field(default_factory=AdamConfig)
+    model: GlowConfig | VitsConfig | None = field(default=None, metadata={"discriminator": "model"})
+    models: list[GlowConfig | VitsConfig] = field(default_factory=list, metadata={"discriminator": "model"})
+
+
+def test_inferred_discriminator() -> None:
+    config = TrainConfig.new_from_dict({"optimizer": {"name": "sgd", "momentum": 0.9}})
+    assert config.optimizer == SGDConfig(momentum=0.9)
+    config = TrainConfig.new_from_dict({"optimizer": {"name": "adam", "lr": 0.1}})
+    assert config.optimizer == AdamConfig(lr=0.1)
+    # without a tag, the members are tried in order
+    config = TrainConfig.new_from_dict({"optimizer": {"momentum": 0.9}})
+    assert config.optimizer == AdamConfig()
+
+
+def test_explicit_discriminator() -> None:
+    data = {"model": {"model": "vits"}, "models": [{"model": "vits"}, {"model": "glow", "num_flows": 2}]}
+    config = TrainConfig.new_from_dict(data)
+    assert config.model == VitsConfig()
+    assert config.models == [VitsConfig(), GlowConfig(num_flows=2)]
+    assert TrainConfig.new_from_dict(config.to_dict()) == config
+    config.validate(single_pass=True)
+
+    with pytest.raises(TypeError, match="no valid discriminator `model`"):
+        TrainConfig.new_from_dict({"model": {"model": "tacotron"}})
+    with pytest.raises(TypeError, match="no valid discriminator `model`"):
+        TrainConfig.new_from_dict({"models": [{"num_flows": 2}]})
+
+
+def test_apply_patch_follows_discriminator() -> None:
+    config = TrainConfig()
+    config.apply_patch({"model": {"model": "vits", "num_flows": 3}, "models": [{"model": "vits"}]})
+    assert config.model == VitsConfig(num_flows=3)
+    assert config.models == [VitsConfig()]
+    config.apply_patch([("models.0", None, {"model": "glow"})])
+    assert config.models == [GlowConfig()]
+    with pytest.raises(TypeError, match="no valid discriminator `model`"):
+        config.apply_patch({"models.0": {"num_flows": 2}})
+
+
+def test_invalid_discriminator() -> None:
+    @dataclass
+    class OtherGlowConfig(Coqpit):
+        model: str = "glow"
+
+    @dataclass
+    class InvalidConfig(Coqpit):
+        model: GlowConfig | OtherGlowConfig = field(default_factory=GlowConfig, metadata={"discriminator": "model"})
+
+    with pytest.raises(ValueError, match="same value"):
+        InvalidConfig.new_from_dict({})
+
+    @dataclass
+    class NotUnionConfig(Coqpit):
+        model: GlowConfig = field(default_factory=GlowConfig, metadata={"discriminator": "model"})
+
+    with pytest.raises(TypeError, match="only supported for Union fields"):
+        NotUnionConfig.new_from_dict({})
+
+
+@pytest.mark.parametrize(
+    ("value", "field_type"),
+    [
+        ("a", int | str),
+        (1, str | int),
+        (1.5, str | int | float),
+        (True, int | bool),
+        ("a", Path | int),
+        (float("inf"), str | int),
+        ([1, 2], str | int | list[int]),
+        ([["a", "b"]], list[str] | list[list[str]]),
+        ({"a": 1}, list[int] | dict[str, int]),
+        ("b", Literal["a"] | list[str]),
+        ("a", Literal["a"] | list[str]),
+        ({"path": "a"}, int | RequiredConfig | GlowConfig),
+        ({}, RequiredConfig | GlowConfig),
+        ({"name": "sgd"}, AdamConfig | GlowConfig | SGDConfig),
+    ],
+)
+def test_untagged_union_is_unchanged(value: Any, field_type: Any) -> None:
+    assert _compile_decoder(field_type)(value) == _deserialize_union(value, field_type)
+
+
+@pytest.mark.parametrize("member", [str, bool, int, float])
+@pytest.mark.parametrize("value", ["a", True, 1, 1.5, float("inf"), float("-inf"), float("nan"), None, [1]])
+def test_primitive_member_filters(member: type, value: Any) -> None:
+    accepts = _union_member_filter(member)
+    assert accepts is not None
+    try:
+        _deserialize_primitive_types(value, member)
+    except (TypeError, ValueError):
+        return
+    # the filter never rejects a value accepted by the decoder
+    assert accepts(value)
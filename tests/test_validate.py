@@ -0,0 +1,57 @@
+import warnings
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Literal
+
+import pytest
+
+from coqpit import MISSING, Coqpit
+
+
+@dataclass
+class DatasetConfig(Coqpit):
+    path: Path = Path("data")
+    split: Literal["train", "test"] = "train"
+    weights: list[float] = field(default_factory=lambda: [1.0, 0.5])
+
+
+@dataclass
+class TrainConfig(Coqpit):
+    lr: float = 0.001
+    epochs: int = 10
+    run_name: str | None = None
+    datasets: list[DatasetConfig] = field(default_factory=lambda: [DatasetConfig()])
+    options: dict[str, Any] = field(default_factory=lambda: {"betas": [0.9, 0.99], "nested": {"eps": 1e-9}})
+    extra: DatasetConfig | int = 0
+
+
+def _validate_both(config: TrainConfig, error: str | None) -> None:
+    if error is None:
+        config.validate()
+        config.validate(single_pass=True)
+        return
+    with warnings.catch_warnings():
+        # type mismatches are replaced by the default value with a warning
+        warnings.simplefilter("ignore")
+        with pytest.raises(ValueError, match="could not be deserialized with same value"):
+            config.validate()
+    with pytest.raises(ValueError, match="could not be deserialized with same value") as e:
+        config.validate(single_pass=True)
+    assert str(e.value).split(", ", 1)[1].startswith(error)
+
+
+def test_validate() -> None:
+    config = TrainConfig(lr=1, extra=DatasetConfig(split="test"))  # int stored in a float field
+    _validate_both(config, None)
+    _validate_both(TrainConfig(datasets=[DatasetConfig(), DatasetConfig(path="x")]), "datasets.1.path: 'x'")  # type: ignore[arg-type]
+    _validate_both(TrainConfig(datasets=[DatasetConfig(weights=[1.0, float("nan")])]), "datasets.0.weights.1: NaN")
+    _validate_both(TrainConfig(options={"betas": (0.9, 0.99)}), "options.betas: tuple value")
+    _validate_both(TrainConfig(options={"paths": {1: "a"}}), "options.paths: key 1")
+    _validate_both(TrainConfig(epochs=True), "epochs: TypeError")
+    _validate_both(TrainConfig(datasets=[DatasetConfig(split="dev")]), "datasets.0.split: TypeError")  # type: ignore[arg-type]
+
+
+def test_validate_missing_and_lazy_fields() -> None:
+    with pytest.raises(ValueError, match="run_name: MISSING value"):
+        TrainConfig(run_name=MISSING).validate(single_pass=True)
+    TrainConfig.new_from_dict(TrainConfig().to_dict(), lazy=True).validate(single_pass=True)